@@ -1,24 +1,345 @@
-import os
-from PIL import Image
-
-def converter_imagens_para_pdf():
-    # Obtém a pasta atual do script
-    pasta_atual = os.getcwd()
-
-    # Itera sobre todos os arquivos na pasta atual
-    for arquivo in os.listdir(pasta_atual):
-        # Verifica se o arquivo é uma imagem (JPEG, PNG, etc.)
-        if arquivo.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff')):
-            nome_pdf = os.path.splitext(arquivo)[0] + '.pdf'  # Define o nome do PDF
-            
+'''
+Objetivo: Este script converte as imagens da pasta atual em PDF, sem perder
+qualidade, em um PDF por imagem ou em um único PDF com uma página por imagem.
+
+Funcionamento:
+    Fotos JPEG e JPEG 2000 são copiadas para dentro do PDF exatamente como estão
+    no arquivo, sem decodificar nem recomprimir (o PDF lê esses formatos
+    direto). PNG sem transparência também é copiado sem decodificar (os dados
+    compactados do PNG são os mesmos usados pelo PDF).
+
+    Só os formatos que o PDF não lê diretamente (PNG com transparência, GIF,
+    BMP, TIFF) são decodificados, e então gravados sem perdas (compactação zip),
+    com a transparência preservada como máscara.
+
+    O tamanho de cada página vem da resolução (DPI) gravada na própria imagem:
+    uma digitalização A4 a 300 DPI vira uma página A4. Imagens sem DPI usam
+    RESOLUCAO_PADRAO. A orientação da câmera (EXIF) é aplicada girando a página.
+
+    As imagens são processadas em paralelo por vários processos. Com
+    'arquivo_unico', todas as imagens da pasta (em ordem natural dos nomes)
+    viram páginas de um só PDF.
+'''
+
+import os  # Biblioteca para interagir com o sistema operacional.
+import re  # Biblioteca para a ordem natural dos nomes.
+import zlib  # Compactação sem perdas das imagens decodificadas.
+import struct  # Leitura dos blocos (chunks) do PNG.
+from collections import deque  # Fila das imagens em processamento.
+from concurrent.futures import ProcessPoolExecutor  # Processos em paralelo.
+from PIL import Image, ImageSequence  # Leitura das imagens (cabeçalho e, se preciso, pixels).
+
+# Extensões de imagem convertidas.
+EXTENSOES = ('.jpg', '.jpeg', '.jp2', '.j2k', '.jpx', '.jpf', '.png', '.bmp', '.gif', '.tif', '.tiff')
+
+# Resolução usada quando a imagem não informa o DPI (valor fixo usado antes).
+RESOLUCAO_PADRAO = 100.0
+
+# Giro da página (graus, sentido horário) para cada orientação EXIF da câmera.
+GIRO_ORIENTACAO_EXIF = {3: 180, 6: 90, 8: 270}
+
+# Espaço de cores do PDF para cada modo do Pillow.
+ESPACO_CORES = {'1': '/DeviceGray', 'L': '/DeviceGray', 'RGB': '/DeviceRGB', 'CMYK': '/DeviceCMYK'}
+
+def chave_ordem_natural(nome):
+    """
+    Função que gera a chave de ordenação em que 'foto2' vem antes de 'foto10'.
+    """
+    return [int(parte) if parte.isdigit() else parte.lower() for parte in re.split(r'(\d+)', nome)]
+
+def tamanho_pagina(imagem):
+    """
+    Função que calcula o tamanho da página em pontos (1/72 de polegada) a partir
+    do tamanho em pixels e do DPI da imagem.
+    """
+    dpi = imagem.info.get('dpi') or (RESOLUCAO_PADRAO, RESOLUCAO_PADRAO)
+    # DPI ausente ou absurdo (alguns programas gravam 0 ou 1): usa o padrão.
+    dpi_x, dpi_y = (float(valor) if valor and float(valor) >= 10 else RESOLUCAO_PADRAO for valor in dpi)
+    largura, altura = imagem.size
+    return largura * 72.0 / dpi_x, altura * 72.0 / dpi_y
+
+def giro_exif(imagem):
+    """
+    Função que retorna o giro da página conforme a orientação EXIF (0 se não houver).
+    """
+    try:
+        return GIRO_ORIENTACAO_EXIF.get(imagem.getexif().get(0x0112), 0)
+    except Exception:
+        return 0
+
+def blocos_png(caminho):
+    """
+    Função que lê os blocos de um PNG, retornando o cabeçalho (IHDR), a paleta,
+    se há transparência (tRNS) e os dados compactados (IDAT, juntos).
+    """
+    with open(caminho, 'rb') as arquivo:
+        dados = arquivo.read()
+    posicao = 8  # Pula a assinatura do PNG.
+    ihdr, paleta, transparencia, idat = None, None, False, []
+    while posicao + 8 <= len(dados):
+        tamanho, tipo = struct.unpack('>I4s', dados[posicao:posicao + 8])
+        conteudo = dados[posicao + 8:posicao + 8 + tamanho]
+        if tipo == b'IHDR':
+            ihdr = struct.unpack('>IIBBBBB', conteudo)
+        elif tipo == b'PLTE':
+            paleta = conteudo
+        elif tipo == b'tRNS':
+            transparencia = True
+        elif tipo == b'IDAT':
+            idat.append(conteudo)
+        elif tipo == b'IEND':
+            break
+        posicao += tamanho + 12  # Tamanho, tipo, conteúdo e CRC.
+    return ihdr, paleta, transparencia, b''.join(idat)
+
+def imagem_png_direta(caminho):
+    """
+    Função que monta a imagem do PDF com os dados do PNG sem decodificar.
+    Retorna None se o PNG precisar ser decodificado (transparência ou entrelaçado).
+    """
+    ihdr, paleta, transparencia, idat = blocos_png(caminho)
+    if ihdr is None:
+        return None
+    largura, altura, bits, tipo_cor, _, _, entrelacado = ihdr
+    if entrelacado or transparencia or tipo_cor not in (0, 2, 3) or (tipo_cor == 3 and not paleta):
+        return None
+
+    # Tipo de cor do PNG: 0 = cinza, 2 = RGB, 3 = paleta.
+    if tipo_cor == 3:
+        espaco = f'[/Indexed /DeviceRGB {len(paleta) // 3 - 1} <{paleta.hex()}>]'
+    else:
+        espaco = '/DeviceGray' if tipo_cor == 0 else '/DeviceRGB'
+    cores = 3 if tipo_cor == 2 else 1
+    dicionario = {
+        '/Width': largura, '/Height': altura, '/ColorSpace': espaco, '/BitsPerComponent': bits,
+        '/Filter': '/FlateDecode',
+        # Os dados do PNG têm um filtro por linha, que o PDF desfaz com o 'Predictor' 15.
+        '/DecodeParms': f'<< /Predictor 15 /Colors {cores} /BitsPerComponent {bits} /Columns {largura} >>',
+    }
+    return dicionario, idat
+
+def imagem_decodificada(quadro):
+    """
+    Função que grava os pixels de uma imagem sem perdas (compactação zip).
+    Retorna a imagem e a máscara de transparência (ou None) do PDF.
+    """
+    # Paleta com transparência e modos com alfa: separa a transparência em máscara.
+    if (quadro.mode == 'P' and 'transparency' in quadro.info) or quadro.mode in ('PA', 'RGBa', 'La'):
+        quadro = quadro.convert('RGBA')
+    mascara = None
+    if quadro.mode in ('RGBA', 'LA'):
+        alfa = quadro.getchannel('A')
+        if alfa.getextrema() != (255, 255):  # Alfa todo opaco não precisa de máscara.
+            mascara = ({'/Width': quadro.width, '/Height': quadro.height, '/ColorSpace': '/DeviceGray',
+                        '/BitsPerComponent': 8, '/Filter': '/FlateDecode'}, zlib.compress(alfa.tobytes(), 6))
+        quadro = quadro.convert('RGB' if quadro.mode == 'RGBA' else 'L')
+
+    # Paleta sem transparência fica indexada (1 byte por pixel).
+    if quadro.mode == 'P':
+        paleta = bytes(quadro.getpalette('RGB'))
+        espaco = f'[/Indexed /DeviceRGB {len(paleta) // 3 - 1} <{paleta.hex()}>]'
+    else:
+        if quadro.mode not in ESPACO_CORES:
+            quadro = quadro.convert('RGB')  # Outros modos (ex.: 16 bits, HSV).
+        espaco = ESPACO_CORES[quadro.mode]
+    dicionario = {'/Width': quadro.width, '/Height': quadro.height, '/ColorSpace': espaco,
+                  '/BitsPerComponent': 1 if quadro.mode == '1' else 8, '/Filter': '/FlateDecode'}
+    return (dicionario, zlib.compress(quadro.tobytes(), 6)), mascara
+
+def descrever_imagem(caminho):
+    """
+    Função que prepara as páginas de um arquivo de imagem (TIFF pode ter várias).
+    Cada página é um dicionário com tamanho, giro, imagem, máscara e se a
+    imagem foi copiada sem decodificar ('direta').
+    """
+    with Image.open(caminho) as imagem:  # Só lê o cabeçalho; os pixels ficam no arquivo.
+        largura, altura = tamanho_pagina(imagem)
+        pagina = {'largura': largura, 'altura': altura, 'giro': giro_exif(imagem), 'mascara': None, 'direta': True}
+
+        if imagem.format == 'JPEG':
+            # JPEG: os dados do arquivo vão para o PDF como estão.
+            with open(caminho, 'rb') as arquivo:
+                dados = arquivo.read()
+            dicionario = {'/Width': imagem.width, '/Height': imagem.height,
+                          '/ColorSpace': ESPACO_CORES.get(imagem.mode, '/DeviceRGB'),
+                          '/BitsPerComponent': 8, '/Filter': '/DCTDecode'}
+            if imagem.mode == 'CMYK' and 'adobe' in imagem.info:
+                dicionario['/Decode'] = '[1 0 1 0 1 0 1 0]'  # CMYK do Photoshop é gravado invertido.
+            pagina['imagem'] = (dicionario, dados)
+            return [pagina]
+
+        if imagem.format == 'JPEG2000':
+            # JPEG 2000: idem (o espaço de cores vem de dentro dos dados).
+            with open(caminho, 'rb') as arquivo:
+                dados = arquivo.read()
+            pagina['imagem'] = ({'/Width': imagem.width, '/Height': imagem.height, '/Filter': '/JPXDecode'}, dados)
+            return [pagina]
+
+        if imagem.format == 'PNG':
+            direta = imagem_png_direta(caminho)
+            if direta is not None:
+                pagina['imagem'] = direta
+                return [pagina]
+
+        # Demais formatos: decodifica (TIFF com várias páginas vira várias páginas;
+        # GIF animado usa só o primeiro quadro).
+        quadros = ImageSequence.Iterator(imagem) if imagem.format == 'TIFF' else [imagem]
+        paginas = []
+        for quadro in quadros:
+            largura, altura = tamanho_pagina(quadro)
+            imagem_pdf, mascara = imagem_decodificada(quadro)
+            paginas.append({'largura': largura, 'altura': altura, 'giro': pagina['giro'],
+                            'imagem': imagem_pdf, 'mascara': mascara, 'direta': False})
+        return paginas
+
+class GravadorPdfImagens:
+    '''
+    Grava um PDF com uma imagem por página, objeto por objeto, à medida que as
+    páginas são adicionadas (só as posições dos objetos ficam em memória).
+    O arquivo só é criado na primeira página: sem páginas, nada é gravado.
+    '''
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.arquivo = None  # Aberto na primeira página.
+        self.posicoes = [None, None, None]  # Posição de cada objeto (1 = catálogo; 2 = páginas).
+        self.paginas = []  # Número do objeto de cada página.
+
+    def _gravar(self, dicionario, dados=None, numero=None):
+        '''Grava um objeto (dicionário e, se houver, dados de fluxo) e retorna o seu número.'''
+        if numero is None:
+            self.posicoes.append(None)
+            numero = len(self.posicoes) - 1
+        self.posicoes[numero] = self.arquivo.tell()
+        if dados is not None:
+            dicionario = {**dicionario, '/Length': len(dados)}
+        entradas = ' '.join(f'{chave} {valor}' for chave, valor in dicionario.items())
+        self.arquivo.write(f'{numero} 0 obj\n<< {entradas} >>\n'.encode('latin-1'))
+        if dados is not None:
+            self.arquivo.write(b'stream\n')
+            self.arquivo.write(dados)
+            self.arquivo.write(b'\nendstream\n')
+        self.arquivo.write(b'endobj\n')
+        return numero
+
+    def adicionar_pagina(self, pagina):
+        '''Grava a imagem (e a máscara), o conteúdo e a página.'''
+        if self.arquivo is None:
+            self.arquivo = open(self.caminho, 'wb')
+            self.arquivo.write(b'%PDF-1.5\n%\xe2\xe3\xcf\xd3\n')
+        dicionario, dados = pagina['imagem']
+        dicionario = {'/Type': '/XObject', '/Subtype': '/Image', **dicionario}
+        if pagina['mascara'] is not None:
+            dicionario_mascara, dados_mascara = pagina['mascara']
+            mascara = self._gravar({'/Type': '/XObject', '/Subtype': '/Image', **dicionario_mascara}, dados_mascara)
+            dicionario['/SMask'] = f'{mascara} 0 R'
+        imagem = self._gravar(dicionario, dados)
+
+        # A imagem ocupa a página inteira.
+        largura, altura = pagina['largura'], pagina['altura']
+        conteudo = self._gravar({}, f'q {largura:.4f} 0 0 {altura:.4f} 0 0 cm /Im0 Do Q'.encode('ascii'))
+        pagina_pdf = {'/Type': '/Page', '/Parent': '2 0 R', '/MediaBox': f'[0 0 {largura:.4f} {altura:.4f}]',
+                      '/Resources': f'<< /XObject << /Im0 {imagem} 0 R >> >>', '/Contents': f'{conteudo} 0 R'}
+        if pagina['giro']:
+            pagina_pdf['/Rotate'] = pagina['giro']
+        self.paginas.append(self._gravar(pagina_pdf))
+
+    def fechar(self):
+        '''Grava a árvore de páginas, o catálogo e a tabela xref, e fecha o arquivo.'''
+        if self.arquivo is None:
+            return  # Nenhuma página: o arquivo não é criado.
+        filhos = ' '.join(f'{numero} 0 R' for numero in self.paginas)
+        self._gravar({'/Type': '/Pages', '/Kids': f'[{filhos}]', '/Count': len(self.paginas)}, numero=2)
+        self._gravar({'/Type': '/Catalog', '/Pages': '2 0 R'}, numero=1)
+
+        inicio_xref = self.arquivo.tell()
+        self.arquivo.write(f'xref\n0 {len(self.posicoes)}\n0000000000 65535 f \n'.encode('ascii'))
+        for posicao in self.posicoes[1:]:
+            self.arquivo.write(f'{posicao:010d} 00000 n \n'.encode('ascii'))
+        self.arquivo.write(f'trailer\n<< /Size {len(self.posicoes)} /Root 1 0 R >>\n'
+                           f'startxref\n{inicio_xref}\n%%EOF\n'.encode('ascii'))
+        self.arquivo.close()
+
+def gravar_pdf(paginas, nome_pdf):
+    """
+    Função que grava as páginas preparadas em um arquivo PDF.
+    """
+    gravador = GravadorPdfImagens(nome_pdf)
+    try:
+        for pagina in paginas:
+            gravador.adicionar_pagina(pagina)
+    finally:
+        gravador.fechar()
+
+def converter_imagem(caminho, nome_pdf):
+    """
+    Função que converte uma imagem em um PDF (executada em paralelo).
+    Retorna se a imagem foi copiada sem decodificar.
+    """
+    paginas = descrever_imagem(caminho)
+    gravar_pdf(paginas, nome_pdf)
+    return all(pagina['direta'] for pagina in paginas)
+
+def em_ordem(executor, funcao, argumentos, limite):
+    """
+    Função que executa 'funcao' em paralelo e entrega os resultados na ordem
+    dos argumentos, com no máximo 'limite' tarefas em andamento (memória).
+    Cada resultado é (argumentos, futuro).
+    """
+    fila = deque()
+    for argumento in argumentos:
+        fila.append((argumento, executor.submit(funcao, *argumento)))
+        if len(fila) >= limite:
+            yield fila.popleft()
+    while fila:
+        yield fila.popleft()
+
+def converter_imagens_para_pdf(pasta=None, arquivo_unico=None, processos=None):
+    """
+    Função que converte as imagens da pasta (a atual, se não informada) em um
+    PDF por imagem ou, com 'arquivo_unico', em um só PDF com todas elas.
+    """
+    # Obtém a pasta e as imagens, em ordem natural dos nomes.
+    pasta = pasta or os.getcwd()
+    imagens = sorted((arquivo for arquivo in os.listdir(pasta) if arquivo.lower().endswith(EXTENSOES)),
+                     key=chave_ordem_natural)
+    diretas = 0
+    limite = 2 * (processos or os.cpu_count() or 1)  # Imagens em andamento ao mesmo tempo.
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        if arquivo_unico is None:
+            # Um PDF por imagem, com o mesmo nome da imagem.
+            tarefas = [(os.path.join(pasta, arquivo), os.path.join(pasta, os.path.splitext(arquivo)[0] + '.pdf'))
+                       for arquivo in imagens]
+            for (caminho, nome_pdf), futuro in em_ordem(executor, converter_imagem, tarefas, limite):
+                try:
+                    diretas += futuro.result()
+                    print(f'{os.path.basename(caminho)} -> {os.path.basename(nome_pdf)} convertido com sucesso!')
+                except Exception as e:
+                    print(f'Erro ao converter {os.path.basename(caminho)}: {e}')
+        else:
+            # Um só PDF: as imagens são preparadas em paralelo e gravadas na ordem.
+            gravador = GravadorPdfImagens(os.path.join(pasta, arquivo_unico))
             try:
-                # Abre a imagem e converte para RGB (para evitar problemas com PNG/transparência)
-                imagem = Image.open(arquivo).convert('RGB')
-                # Salva a imagem como PDF
-                imagem.save(nome_pdf, 'PDF', resolution=100.0)
-                print(f'{arquivo} -> {nome_pdf} convertido com sucesso!')
-            except Exception as e:
-                print(f'Erro ao converter {arquivo}: {e}')
+                tarefas = [(os.path.join(pasta, arquivo),) for arquivo in imagens]
+                for (caminho,), futuro in em_ordem(executor, descrever_imagem, tarefas, limite):
+                    try:
+                        paginas = futuro.result()
+                    except Exception as e:
+                        print(f'Erro ao converter {os.path.basename(caminho)}: {e}')
+                        continue
+                    for pagina in paginas:
+                        gravador.adicionar_pagina(pagina)
+                    diretas += all(pagina['direta'] for pagina in paginas)
+            finally:
+                gravador.fechar()
+            if gravador.paginas:
+                print(f'{len(gravador.paginas)} páginas gravadas em {arquivo_unico}.')
+            else:
+                print(f'Erro: nenhuma imagem foi convertida; {arquivo_unico} não foi gravado.')
+
+    print(f'{diretas} de {len(imagens)} imagens copiadas sem decodificar.')
 
 if __name__ == "__main__":
+    # Para juntar todas as imagens em um só PDF: converter_imagens_para_pdf(arquivo_unico='imagens.pdf')
     converter_imagens_para_pdf()
@@ -1,26 +1,402 @@
 '''
 Esse código faz a união de todos os arquivos PDF na pasta onde ele é executado,
 gerando um único PDF chamado pdf_combinado.pdf
+
+Funcionamento:
+    Por padrão os PDFs são unidos com o PdfMerger, que mantém os marcadores
+    (bookmarks) e os campos de formulário das páginas. Como o PdfMerger não
+    copia o formulário do documento (/AcroForm), ele é acrescentado ao final do
+    PDF combinado (atualização incremental) com os campos encontrados.
+
+    Para lotes muito grandes (milhares de cartões digitalizados) há o modo
+    incremental (INCREMENTAL = True), que copia apenas as páginas:
+        - Os PDFs são gravados no arquivo final um de cada vez, objeto por
+          objeto, assim que são lidos: só o PDF atual fica aberto e a memória
+          usada não cresce com a quantidade de arquivos unidos.
+        - Fontes, imagens e demais fluxos (streams) idênticos são gravados uma
+          única vez: cada fluxo é identificado pelo hash do seu conteúdo e, ao
+          reaparecer em outro PDF, passa a apontar para a cópia já gravada.
+        - Marcadores e o formulário do documento (/AcroForm) não são copiados.
+
+    A ordem dos arquivos é a do arquivo ordem.txt (um nome por linha), se ele
+    existir na pasta; caso contrário, a ordem natural dos nomes (cartao2.pdf
+    antes de cartao10.pdf).
 '''
 
 import os  # Importa o módulo para interagir com o sistema operacional.
-from PyPDF2 import PdfMerger  # Importa a classe para unir arquivos PDF.
+import re  # Importa o módulo de expressões regulares (ordem natural dos nomes).
+import hashlib  # Importa o módulo de hash (identificação de fluxos repetidos).
+from PyPDF2 import PdfMerger, PdfReader  # Importa as classes para unir e ler arquivos PDF.
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject, StreamObject
+
+# Nome do PDF gerado e do arquivo opcional com a ordem dos PDFs.
+ARQUIVO_SAIDA = 'pdf_combinado.pdf'
+ARQUIVO_ORDEM = 'ordem.txt'
+
+def chave_ordem_natural(nome):
+    '''
+    Chave de ordenação que compara os números dentro do nome pelo seu valor.
+    '''
+    return [int(parte) if parte.isdigit() else parte.lower() for parte in re.split(r'(\d+)', nome)]
+
+def listar_pdfs(pasta='.', ordem=None, ignorar=(ARQUIVO_SAIDA,)):
+    '''
+    Lista os PDFs da pasta na ordem em que serão unidos.
+    'ordem' é uma lista explícita de nomes; sem ela, usa a ordem natural.
+    Os nomes em 'ignorar' (o próprio PDF combinado) ficam de fora nos dois casos.
+    '''
+    if ordem is not None:
+        # Ordem explícita: confere se todos os arquivos existem antes de começar.
+        ordem = [nome for nome in ordem if nome not in ignorar]
+        faltando = [nome for nome in ordem if not os.path.isfile(os.path.join(pasta, nome))]
+        if faltando:
+            raise FileNotFoundError(f'Arquivos da ordem não encontrados: {faltando}')
+        return [os.path.join(pasta, nome) for nome in ordem]
+
+    # Obtém a lista de arquivos na pasta que terminam com ".pdf" (case insensitive).
+    arquivos = [arquivo for arquivo in os.listdir(pasta)
+                if arquivo.lower().endswith('.pdf') and arquivo not in ignorar]
+    return [os.path.join(pasta, arquivo) for arquivo in sorted(arquivos, key=chave_ordem_natural)]
+
+def ler_ordem(pasta='.'):
+    '''
+    Lê o arquivo ordem.txt da pasta (um nome por linha), se existir.
+    '''
+    caminho = os.path.join(pasta, ARQUIVO_ORDEM)
+    if not os.path.isfile(caminho):
+        return None
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return [linha.strip() for linha in arquivo if linha.strip()]
+
+class _EscritorHash:
+    '''Recebe o que seria gravado em arquivo e apenas atualiza um hash SHA-256.'''
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.write = self.sha256.update
+
+class GravadorPdfIncremental:
+    '''
+    Grava um PDF objeto por objeto, à medida que as páginas são adicionadas.
+
+    Os objetos de cada página (conteúdo, fontes, imagens, anotações) são copiados
+    do PDF de origem com uma nova numeração e gravados imediatamente. Só ficam em
+    memória as posições dos objetos gravados (para a tabela xref), os números das
+    páginas e os hashes dos fluxos já gravados.
+    '''
+
+    def __init__(self, caminho, deduplicar=True):
+        self.arquivo = open(caminho, 'wb')  # Arquivo final, gravado aos poucos.
+        self.deduplicar = deduplicar
+        self.posicoes = [None, None, None]  # Posição de cada objeto (0 = livre; 1 = catálogo; 2 = páginas).
+        self.paginas = []  # Número do objeto de cada página, na ordem.
+        self.fluxos = {}  # Hash do conteúdo -> número do fluxo já gravado.
+        self.fluxos_repetidos = 0  # Fluxos que não precisaram ser gravados de novo.
+        self.bytes_economizados = 0  # Tamanho dos fluxos repetidos.
+        self.arquivo.write(b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n')
+
+    def _novo_numero(self):
+        '''Reserva o próximo número de objeto.'''
+        self.posicoes.append(None)
+        return len(self.posicoes) - 1
+
+    def _hash_fluxo(self, fluxo):
+        '''
+        Hash do fluxo: dicionário e dados ainda codificados, com os objetos
+        apontados pelo dicionário (ex.: espaço de cores) incluídos pelo conteúdo.
+        Retorna None se houver referência circular (fluxo não comparável).
+        '''
+        escritor = _EscritorHash()
+        if not self._serializar(fluxo, escritor, frozenset()):
+            return None
+        return escritor.sha256.digest()
+
+    def _serializar(self, objeto, escritor, caminho):
+        '''
+        Escreve o conteúdo de um objeto no hash, resolvendo as referências.
+        'caminho' guarda as referências em resolução, para detectar ciclos.
+        '''
+        if isinstance(objeto, IndirectObject):
+            chave = (objeto.idnum, objeto.generation)
+            if chave in caminho:
+                return False
+            return self._serializar(objeto.get_object(), escritor, caminho | {chave})
+        if isinstance(objeto, DictionaryObject):
+            escritor.write(b'<<')
+            for chave, valor in sorted(objeto.items()):
+                if isinstance(objeto, StreamObject) and chave == '/Length':
+                    continue
+                escritor.write(chave.encode('latin-1') + b' ')
+                if not self._serializar(valor, escritor, caminho):
+                    return False
+            escritor.write(b'>>')
+            if isinstance(objeto, StreamObject):
+                escritor.write(f'stream {len(objeto._data)}'.encode('ascii'))
+                escritor.write(objeto._data)
+            return True
+        if isinstance(objeto, ArrayObject):
+            escritor.write(b'[')
+            for valor in objeto:
+                if not self._serializar(valor, escritor, caminho):
+                    return False
+            escritor.write(b']')
+            return True
+        objeto.write_to_stream(escritor, None)
+        escritor.write(b' ')
+        return True
+
+    def _numero_destino(self, referencia, estado):
+        '''
+        Número, no PDF final, do objeto apontado por uma referência do PDF de origem.
+        O objeto entra na fila de gravação na primeira vez em que aparece.
+        '''
+        chave = (referencia.idnum, referencia.generation)
+        if chave in estado['mapa']:
+            return estado['mapa'][chave]
+
+        objeto = referencia.get_object()
+        hash_fluxo = None
+        if self.deduplicar and isinstance(objeto, StreamObject):
+            hash_fluxo = self._hash_fluxo(objeto)
+            if hash_fluxo is not None and hash_fluxo in self.fluxos:
+                # Fluxo idêntico já gravado: reaproveita.
+                self.fluxos_repetidos += 1
+                self.bytes_economizados += len(objeto._data)
+                estado['mapa'][chave] = self.fluxos[hash_fluxo]
+                return estado['mapa'][chave]
+
+        numero = self._novo_numero()
+        estado['mapa'][chave] = numero
+        if hash_fluxo is not None:
+            self.fluxos[hash_fluxo] = numero
+        estado['pendentes'].append((numero, objeto))
+        return numero
 
-# Obtém a lista de arquivos na pasta atual que terminam com ".pdf" (case insensitive).
-arquivos_pdf = [arquivo for arquivo in os.listdir('.') if arquivo.lower().endswith('.pdf')]
+    def _copiar(self, objeto, estado):
+        '''
+        Copia um objeto do PDF de origem trocando as referências pela nova numeração.
+        '''
+        if isinstance(objeto, IndirectObject):
+            return IndirectObject(self._numero_destino(objeto, estado), 0, None)
+        if isinstance(objeto, DictionaryObject):
+            copia = DictionaryObject()
+            for chave, valor in objeto.items():
+                if isinstance(objeto, StreamObject) and chave == '/Length':
+                    continue  # O tamanho é regravado a partir dos dados.
+                copia[NameObject(chave)] = self._copiar(valor, estado)
+            return copia
+        if isinstance(objeto, ArrayObject):
+            return ArrayObject(self._copiar(valor, estado) for valor in objeto)
+        return objeto
 
-# Verifica se há pelo menos dois arquivos PDF para unir.
-if len(arquivos_pdf) < 2:
-    print('Não há arquivos suficientes para unir.')  # Informa que não há PDFs suficientes.
-else:
+    def _gravar(self, numero, objeto, dados=None):
+        '''Grava um objeto (e os dados, se for um fluxo) no arquivo final.'''
+        self.posicoes[numero] = self.arquivo.tell()
+        self.arquivo.write(f'{numero} 0 obj\n'.encode('ascii'))
+        if dados is not None:
+            objeto[NameObject('/Length')] = NumberObject(len(dados))
+        objeto.write_to_stream(self.arquivo, None)
+        if dados is not None:
+            self.arquivo.write(b'\nstream\n')
+            self.arquivo.write(dados)
+            self.arquivo.write(b'\nendstream')
+        self.arquivo.write(b'\nendobj\n')
+
+    def _gravar_pendentes(self, estado):
+        '''Grava os objetos na fila (que pode crescer enquanto eles são copiados).'''
+        while estado['pendentes']:
+            numero, objeto = estado['pendentes'].pop()
+            copia = self._copiar(objeto, estado)
+            self._gravar(numero, copia, objeto._data if isinstance(objeto, StreamObject) else None)
+
+    def adicionar_pdf(self, caminho):
+        '''
+        Copia todas as páginas de um PDF para o arquivo final.
+        Retorna a quantidade de páginas adicionadas.
+        '''
+        with open(caminho, 'rb') as arquivo:
+            leitor = PdfReader(arquivo)
+            if leitor.is_encrypted:
+                raise ValueError('PDF protegido por senha')
+
+            # Numeração das páginas reservada antes: links entre páginas apontam
+            # para as novas páginas, e não para a árvore de páginas de origem.
+            estado = {'mapa': {}, 'pendentes': []}
+            paginas = list(leitor.pages)
+            numeros = []
+            for pagina in paginas:
+                numero = self._novo_numero()
+                referencia = pagina.indirect_reference
+                if referencia is not None:
+                    estado['mapa'][(referencia.idnum, referencia.generation)] = numero
+                numeros.append(numero)
+
+            try:
+                for numero, pagina in zip(numeros, paginas):
+                    # Página sem o '/Parent' de origem (atributos herdados já vêm na página).
+                    copia = self._copiar(DictionaryObject(
+                        (chave, valor) for chave, valor in pagina.items() if chave != '/Parent'), estado)
+                    copia[NameObject('/Parent')] = IndirectObject(2, 0, None)
+                    self._gravar(numero, copia)
+                    self._gravar_pendentes(estado)
+            except Exception:
+                # PDF descartado: esquece os fluxos que ficaram na fila sem ser gravados.
+                self.fluxos = {h: n for h, n in self.fluxos.items() if self.posicoes[n] is not None}
+                raise
+
+            self.paginas.extend(numeros)
+            return len(numeros)
+
+    def fechar(self):
+        '''Grava a árvore de páginas, o catálogo e a tabela xref, e fecha o arquivo.'''
+        paginas = DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): ArrayObject(IndirectObject(numero, 0, None) for numero in self.paginas),
+            NameObject('/Count'): NumberObject(len(self.paginas)),
+        })
+        self._gravar(2, paginas)
+        catalogo = DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): IndirectObject(2, 0, None),
+        })
+        self._gravar(1, catalogo)
+
+        # Números reservados e não gravados (PDF com erro no meio da cópia) são
+        # objetos livres: cada entrada livre aponta para a próxima, a partir do 0.
+        livres = [numero for numero, posicao in enumerate(self.posicoes) if numero and posicao is None]
+        proximo_livre = dict(zip([0] + livres, livres + [0]))
+
+        inicio_xref = self.arquivo.tell()
+        self.arquivo.write(f'xref\n0 {len(self.posicoes)}\n'.encode('ascii'))
+        self.arquivo.write(f'{proximo_livre[0]:010d} 65535 f \n'.encode('ascii'))
+        for numero, posicao in enumerate(self.posicoes[1:], start=1):
+            if posicao is None:
+                self.arquivo.write(f'{proximo_livre[numero]:010d} 00001 f \n'.encode('ascii'))
+            else:
+                self.arquivo.write(f'{posicao:010d} 00000 n \n'.encode('ascii'))
+        self.arquivo.write(f'trailer\n<< /Size {len(self.posicoes)} /Root 1 0 R >>\n'
+                           f'startxref\n{inicio_xref}\n%%EOF\n'.encode('ascii'))
+        self.arquivo.close()
+
+def incluir_formulario(caminho):
+    '''
+    Acrescenta ao PDF o formulário do documento (/AcroForm) com os campos das
+    páginas, em uma atualização incremental (o arquivo não é regravado).
+    Retorna a quantidade de campos; sem campos, ou se o formulário já existir,
+    o arquivo não é alterado.
+    '''
+    with open(caminho, 'rb') as arquivo:
+        leitor = PdfReader(arquivo)
+        referencia_catalogo = leitor.trailer.raw_get('/Root')
+        catalogo = leitor.trailer['/Root']
+        if '/AcroForm' in catalogo:
+            return 0
+
+        # Campos do formulário: o campo raiz de cada anotação de widget.
+        campos = ArrayObject()
+        vistos = set()
+        for pagina in leitor.pages:
+            for referencia in pagina.get('/Annots') or []:
+                anotacao = referencia.get_object()
+                if anotacao.get('/Subtype') != '/Widget' or not isinstance(referencia, IndirectObject):
+                    continue
+                # Sobe pelos '/Parent' até o campo raiz (com proteção contra ciclos).
+                percorridos = {referencia.idnum}
+                pai = anotacao.raw_get('/Parent') if '/Parent' in anotacao else None
+                while isinstance(pai, IndirectObject) and pai.idnum not in percorridos:
+                    referencia = pai
+                    percorridos.add(referencia.idnum)
+                    anotacao = referencia.get_object()
+                    pai = anotacao.raw_get('/Parent') if '/Parent' in anotacao else None
+                if referencia.idnum not in vistos:
+                    vistos.add(referencia.idnum)
+                    campos.append(IndirectObject(referencia.idnum, referencia.generation, None))
+        if not campos:
+            return 0
+
+        novo_catalogo = DictionaryObject(catalogo)
+        novo_catalogo[NameObject('/AcroForm')] = DictionaryObject({NameObject('/Fields'): campos})
+        # O novo trailer repete o atual (/Size, /Root, /Info, /ID).
+        trailer = DictionaryObject({NameObject(chave): leitor.trailer.raw_get(chave)
+                                    for chave in leitor.trailer if chave != '/Prev'})
+
+        # Posição da tabela xref atual, que a nova passa a apontar com /Prev.
+        arquivo.seek(max(0, os.path.getsize(caminho) - 1024))
+        trailer[NameObject('/Prev')] = NumberObject(re.findall(rb'startxref\s+(\d+)', arquivo.read())[-1])
+
+    # Nova versão do catálogo, com a sua tabela xref e o trailer no final do arquivo.
+    with open(caminho, 'ab') as arquivo:
+        arquivo.write(b'\n')
+        posicao = arquivo.tell()
+        arquivo.write(f'{referencia_catalogo.idnum} {referencia_catalogo.generation} obj\n'.encode('ascii'))
+        novo_catalogo.write_to_stream(arquivo, None)
+        arquivo.write(b'\nendobj\n')
+        inicio_xref = arquivo.tell()
+        arquivo.write(f'xref\n0 1\n0000000000 65535 f \n{referencia_catalogo.idnum} 1\n'
+                      f'{posicao:010d} {referencia_catalogo.generation:05d} n \n'.encode('ascii'))
+        arquivo.write(b'trailer\n')
+        trailer.write_to_stream(arquivo, None)
+        arquivo.write(f'\nstartxref\n{inicio_xref}\n%%EOF\n'.encode('ascii'))
+    return len(campos)
+
+def unir_pdfs(arquivos_pdf, arquivo_saida=ARQUIVO_SAIDA):
+    '''
+    Une os PDFs, na ordem recebida, com o PdfMerger (mantém marcadores e formulários).
+    Retorna a quantidade de páginas do PDF combinado.
+    '''
     merger = PdfMerger()  # Cria um objeto PdfMerger para gerenciar a união dos arquivos.
+    try:
+        for arquivo in arquivos_pdf:
+            try:
+                merger.append(arquivo)  # Adiciona o arquivo ao PDF combinado.
+            except Exception as e:
+                print(f'Erro ao unir {arquivo}: {e}')
+        merger.write(arquivo_saida)  # Escreve o arquivo final.
+        total_paginas = len(merger.pages)
+    finally:
+        merger.close()  # Fecha o objeto PdfMerger para liberar recursos.
+
+    # O PdfMerger copia os campos das páginas, mas não o formulário do documento.
+    incluir_formulario(arquivo_saida)
+    return total_paginas
+
+def unir_pdfs_incremental(arquivos_pdf, arquivo_saida=ARQUIVO_SAIDA, deduplicar=True):
+    '''
+    Une os PDFs, na ordem recebida, em um único arquivo gravado aos poucos
+    (só as páginas: marcadores e formulários não são copiados).
+    Retorna o gravador (com as contagens de páginas e de fluxos repetidos).
+    '''
+    gravador = GravadorPdfIncremental(arquivo_saida, deduplicar)
+    try:
+        for arquivo in arquivos_pdf:
+            try:
+                gravador.adicionar_pdf(arquivo)  # Adiciona o arquivo ao PDF combinado.
+            except Exception as e:
+                print(f'Erro ao unir {arquivo}: {e}')
+    finally:
+        gravador.fechar()  # Escreve o final do arquivo e o fecha.
+    return gravador
+
+if __name__ == "__main__":
+    # True usa o modo incremental (memória constante e fluxos repetidos gravados
+    # uma vez, sem marcadores e formulários); False usa o PdfMerger.
+    INCREMENTAL = False
+
+    # Obtém a lista de PDFs da pasta atual, na ordem de ordem.txt ou na ordem natural.
+    arquivos_pdf = listar_pdfs('.', ler_ordem('.'))
 
-    # Itera sobre a lista de PDFs e adiciona cada um ao objeto merger.
-    for arquivo in arquivos_pdf:
-        merger.append(arquivo)  # Adiciona o arquivo ao PDF combinado.
+    # Verifica se há pelo menos dois arquivos PDF para unir.
+    if len(arquivos_pdf) < 2:
+        print('Não há arquivos suficientes para unir.')  # Informa que não há PDFs suficientes.
+    elif INCREMENTAL:
+        gravador = unir_pdfs_incremental(arquivos_pdf, ARQUIVO_SAIDA)
 
-    # Salva o PDF combinado com o nome 'pdf_combinado.pdf'.
-    merger.write('pdf_combinado.pdf')  # Escreve o arquivo final.
-    merger.close()  # Fecha o objeto PdfMerger para liberar recursos.
+        print(f'Os arquivos PDF foram unidos com sucesso no arquivo "{ARQUIVO_SAIDA}".')  # Mensagem de sucesso.
+        print(f'{len(gravador.paginas)} páginas de {len(arquivos_pdf)} arquivos; '
+              f'{gravador.fluxos_repetidos} fluxos repetidos reaproveitados '
+              f'({gravador.bytes_economizados / 1024:.0f} KB a menos).')
+    else:
+        total_paginas = unir_pdfs(arquivos_pdf, ARQUIVO_SAIDA)
 
-    print(f'Os arquivos PDF foram unidos com sucesso no arquivo "pdf_combinado.pdf".')  # Mensagem de sucesso.
+        print(f'Os arquivos PDF foram unidos com sucesso no arquivo "{ARQUIVO_SAIDA}".')  # Mensagem de sucesso.
+        print(f'{total_paginas} páginas de {len(arquivos_pdf)} arquivos.')
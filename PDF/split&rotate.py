@@ -1,31 +1,223 @@
-import PyPDF2
+'''
+Objetivo: Este script divide um PDF em vários arquivos menores seguindo um
+plano de páginas, girando as páginas conforme o plano.
+
+Funcionamento:
+    O plano é um dicionário que descreve o resultado, sem código novo para cada
+    layout (ver PLANO_PADRAO):
+        paginas_por_arquivo: páginas em cada arquivo gerado (None = um arquivo
+                             por intervalo)
+        intervalos: páginas usadas, numeradas a partir de 1 ('1-10, 15, 20-',
+                    onde '20-' vai até a última página); None = todas
+        rotacoes: giro em graus (múltiplos de 90), por posição dentro de cada
+                  arquivo ([90, 270] = 1ª página 90°, 2ª 270°, repetindo) ou
+                  por página do PDF ({3: 180})
+        nome: nome dos arquivos gerados, com os campos {base} (nome do PDF),
+              {n} (número do arquivo), {inicio} e {fim} (primeira e última
+              página de origem)
+
+    A função planejar confere o plano inteiro (intervalos fora do PDF, giros
+    inválidos, nomes repetidos) antes de qualquer arquivo ser gravado.
+
+    A função executar_plano lê o PDF uma única vez, com um só PdfReader, monta
+    cada arquivo na ordem do plano e entrega a gravação a várias threads, que
+    gravam os arquivos ao mesmo tempo enquanto os próximos são montados.
+'''
+
+import os  # Biblioteca para interagir com o sistema operacional.
+import re  # Biblioteca para interpretar os intervalos de páginas.
+import PyPDF2  # Biblioteca para manipulação de arquivos PDF.
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED  # Gravação em paralelo.
+
+# Plano original do script: pares de páginas, sem giro, em saida_1.pdf, saida_2.pdf, ...
+PLANO_PADRAO = {
+    'paginas_por_arquivo': 2,
+    'intervalos': None,
+    'rotacoes': [0, 0],
+    'nome': 'saida_{n}.pdf',
+}
+
+# Arquivos gravados ao mesmo tempo (e montados à frente, no máximo o dobro).
+THREADS_GRAVACAO = 4
+
+# Um intervalo: '7', '1-10' ou '20-' (até a última página).
+PADRAO_INTERVALO = re.compile(r'^(\d+)\s*(?:(-)\s*(\d*))?$')
+
+def interpretar_intervalos(intervalos, total_paginas):
+    """
+    Função que converte os intervalos do plano em listas de páginas (a partir
+    de zero), uma lista por intervalo, na ordem informada.
+    Aceita texto ('1-10, 15, 20-') ou lista de números e pares (1, 10).
+    """
+    # Sem intervalos: todas as páginas.
+    if intervalos is None:
+        return [list(range(total_paginas))]
+
+    partes = intervalos.split(',') if isinstance(intervalos, str) else intervalos
+    resultado = []
+    for parte in partes:
+        # Converte a parte em (primeira, última), numeradas a partir de 1.
+        if isinstance(parte, int):
+            primeira, ultima = parte, parte
+        elif isinstance(parte, (tuple, list)) and len(parte) == 2:
+            primeira, ultima = parte
+        else:
+            encontrado = PADRAO_INTERVALO.match(str(parte).strip())
+            if not encontrado:
+                raise ValueError(f'Intervalo inválido: {parte!r}')
+            primeira = int(encontrado.group(1))
+            if encontrado.group(2) is None:
+                ultima = primeira
+            else:
+                ultima = int(encontrado.group(3)) if encontrado.group(3) else total_paginas
+
+        # Confere os limites do intervalo.
+        if not 1 <= primeira <= ultima:
+            raise ValueError(f'Intervalo inválido: {parte!r}')
+        if ultima > total_paginas:
+            raise ValueError(f'Intervalo {parte!r} passa da última página ({total_paginas})')
+        resultado.append(list(range(primeira - 1, ultima)))
+    return resultado
+
+def rotacao_da_pagina(rotacoes, posicao, indice):
+    """
+    Função que retorna o giro de uma página: por posição dentro do arquivo
+    (lista, repetida) ou pelo número da página no PDF (dicionário).
+    """
+    if not rotacoes:
+        return 0
+    if isinstance(rotacoes, dict):
+        return rotacoes.get(indice + 1, 0)
+    return rotacoes[posicao % len(rotacoes)]
+
+def planejar(plano, total_paginas, nome_base, pasta_saida='.'):
+    """
+    Função que transforma o plano na lista de arquivos a gravar, no formato
+    (caminho, [(página a partir de zero, giro), ...]), sem gravar nada.
+    Gera ValueError se o plano não puder ser cumprido.
+    """
+    # Chaves desconhecidas costumam ser erro de digitação no plano.
+    desconhecidas = set(plano) - set(PLANO_PADRAO)
+    if desconhecidas:
+        raise ValueError(f'Opções desconhecidas no plano: {sorted(desconhecidas)}')
+    plano = {**PLANO_PADRAO, **plano}
+
+    paginas_por_arquivo = plano['paginas_por_arquivo']
+    if paginas_por_arquivo is not None and (not isinstance(paginas_por_arquivo, int) or paginas_por_arquivo < 1):
+        raise ValueError(f'paginas_por_arquivo inválido: {paginas_por_arquivo!r}')
+
+    # Giros: múltiplos de 90 e, por página, só de páginas existentes.
+    rotacoes = plano['rotacoes']
+    angulos = rotacoes.values() if isinstance(rotacoes, dict) else (rotacoes or [])
+    if any(not isinstance(angulo, int) or angulo % 90 for angulo in angulos):
+        raise ValueError(f'Giros devem ser múltiplos de 90: {rotacoes!r}')
+    if isinstance(rotacoes, dict):
+        fora = [pagina for pagina in rotacoes if not 1 <= pagina <= total_paginas]
+        if fora:
+            raise ValueError(f'Giro de páginas inexistentes: {fora}')
+
+    # Páginas de cada arquivo: blocos da sequência de páginas ou um arquivo por intervalo.
+    grupos = interpretar_intervalos(plano['intervalos'], total_paginas)
+    if paginas_por_arquivo is not None:
+        sequencia = [indice for grupo in grupos for indice in grupo]
+        grupos = [sequencia[i:i + paginas_por_arquivo] for i in range(0, len(sequencia), paginas_por_arquivo)]
+    if not grupos or not any(grupos):
+        raise ValueError('O plano não seleciona nenhuma página')
+
+    arquivos = []
+    nomes = set()
+    for numero, grupo in enumerate(grupos, start=1):
+        # Nome do arquivo a partir do modelo do plano.
+        try:
+            nome = plano['nome'].format(base=nome_base, n=numero, inicio=grupo[0] + 1, fim=grupo[-1] + 1)
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f'Modelo de nome inválido {plano["nome"]!r}: {e}')
+        caminho = os.path.join(pasta_saida, nome)
+
+        # Dois arquivos com o mesmo nome: o segundo apagaria o primeiro.
+        if os.path.normcase(os.path.abspath(caminho)) in nomes:
+            raise ValueError(f'O modelo de nome {plano["nome"]!r} repete o arquivo {nome}')
+        nomes.add(os.path.normcase(os.path.abspath(caminho)))
+
+        paginas = [(indice, rotacao_da_pagina(rotacoes, posicao, indice)) for posicao, indice in enumerate(grupo)]
+        arquivos.append((caminho, paginas))
+    return arquivos
+
+def gravar_pdf(escritor, caminho):
+    """
+    Função que grava um PDF já montado (executada nas threads de gravação).
+    """
+    with open(caminho, 'wb') as novo_pdf:
+        escritor.write(novo_pdf)
+    return caminho
+
+def executar_plano(input_pdf, plano=PLANO_PADRAO, pasta_saida='.', threads=THREADS_GRAVACAO):
+    """
+    Função que divide o PDF conforme o plano, lendo o arquivo uma única vez.
+    Retorna a lista de arquivos gravados.
+    """
+    nome_base = os.path.splitext(os.path.basename(input_pdf))[0]
+    gravados = set()
 
-def dividir_pdf_rodar_pagina(input_pdf):
     with open(input_pdf, 'rb') as arquivo:
         leitor = PyPDF2.PdfReader(arquivo)
-        total_paginas = len(leitor.pages)
-
-        # Processa a cada duas páginas
-        for i in range(0, total_paginas, 2):
-            escritor = PyPDF2.PdfWriter()
-
-            # Primeira página - Rotaciona para paisagem (90°)
-            pagina1 = leitor.pages[i]
-            pagina1.rotate(0)
-            escritor.add_page(pagina1)
-
-            # Segunda página - Rotaciona para paisagem + 180° (inverso)
-            if i + 1 < total_paginas:
-                pagina2 = leitor.pages[i + 1]
-                pagina2.rotate(0)  # Coloca em paisagem
-                pagina2.rotate(0)  # Inverte o conteúdo
-                escritor.add_page(pagina2)
-
-            # Salva o novo PDF
-            nome_arquivo = f'saida_{i // 2 + 1}.pdf'
-            with open(nome_arquivo, 'wb') as novo_pdf:
-                escritor.write(novo_pdf)
-                print(f'{nome_arquivo} criado com sucesso.')
+
+        # Plano conferido antes de gravar qualquer arquivo.
+        arquivos = planejar(plano, len(leitor.pages), nome_base, pasta_saida)
+        entrada = os.path.normcase(os.path.abspath(input_pdf))
+        if any(os.path.normcase(os.path.abspath(caminho)) == entrada for caminho, _ in arquivos):
+            raise ValueError(f'O plano sobrescreveria o próprio {input_pdf}')
+        os.makedirs(pasta_saida, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            pendentes = {}
+            for caminho, paginas in arquivos:
+                # Limita os arquivos montados à espera de gravação (memória).
+                while len(pendentes) >= 2 * threads:
+                    concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        gravados |= concluir_gravacao(futuro, pendentes.pop(futuro))
+
+                # Monta o arquivo: cada página é copiada para o escritor e girada
+                # lá, sem alterar a página do leitor (que pode se repetir no plano).
+                escritor = PyPDF2.PdfWriter()
+                for indice, angulo in paginas:
+                    pagina = escritor.add_page(leitor.pages[indice])
+                    if angulo:
+                        pagina.rotate(angulo)
+                pendentes[executor.submit(gravar_pdf, escritor, caminho)] = caminho
+
+            for futuro in list(pendentes):
+                gravados |= concluir_gravacao(futuro, pendentes.pop(futuro))
+
+    # Arquivos gravados, na ordem do plano.
+    return [caminho for caminho, _ in arquivos if caminho in gravados]
+
+def concluir_gravacao(futuro, caminho):
+    """
+    Função que informa o resultado da gravação de um arquivo.
+    Retorna {caminho} se o arquivo foi gravado, ou um conjunto vazio em caso de erro.
+    """
+    try:
+        futuro.result()
+    except Exception as e:
+        print(f'Erro ao gravar {caminho}: {e}')
+        return set()
+    print(f'{os.path.basename(caminho)} criado com sucesso.')
+    return {caminho}
+
+def dividir_pdf_rodar_pagina(input_pdf):
+    """
+    Função que divide o PDF em pares de páginas (plano original do script).
+    """
+    return executar_plano(input_pdf, PLANO_PADRAO)
 
 # Exemplo de uso
-dividir_pdf_rodar_pagina('seu_arquivo.pdf')
+if __name__ == "__main__":
+    # Ex.: blocos de 10 páginas das páginas 1 a 200, girando as pares em 180°:
+    # plano = {'paginas_por_arquivo': 10, 'intervalos': '1-200',
+    #          'rotacoes': [0, 180], 'nome': '{base}_{inicio:04d}-{fim:04d}.pdf'}
+    try:
+        dividir_pdf_rodar_pagina('seu_arquivo.pdf')
+    except ValueError as e:
+        print(f'Erro no plano: {e}')
@@ -4,67 +4,143 @@ cada uma de suas páginas em arquivos PDF individuais.
 
 Funcionamento:
     A função separar_paginas_pdf lê cada página de um PDF e cria um novo arquivo
-    para cada uma delas.
+    para cada uma delas, com o nome do PDF de origem e o número da página
+    (ex.: relatorio.pdf -> relatorio_p0001.pdf, relatorio_p0002.pdf, ...), para
+    que PDFs diferentes nunca sobrescrevam as páginas uns dos outros. As páginas
+    ficam na subpasta 'paginas', e não ao lado dos PDFs, para que nunca sejam
+    confundidas com os PDFs de entrada numa próxima execução.
 
     A função processar_pdfs_na_pasta busca todos os arquivos PDF na pasta atual
-    e aplica a função de separação para cada um.
+    e divide o trabalho em blocos de páginas, separados em paralelo por vários
+    processos. Cada bloco abre o seu próprio leitor e grava as páginas uma a uma,
+    então a memória usada não cresce com o tamanho do PDF. Ao final, informa a
+    velocidade em páginas por segundo.
 
 '''
 
 import PyPDF2  # Biblioteca para manipulação de arquivos PDF.
 import os  # Biblioteca para interagir com o sistema operacional.
+import time  # Biblioteca para medir a velocidade da separação.
+from concurrent.futures import ProcessPoolExecutor, as_completed  # Processos em paralelo.
 
-def separar_paginas_pdf(nome_arquivo):
+# Quantidade de páginas que cada processo separa por vez (cada bloco reabre o PDF
+# e relê a árvore de páginas, então blocos muito pequenos custam caro).
+PAGINAS_POR_TAREFA = 250
+
+# Subpasta (ao lado dos PDFs) onde as páginas separadas são gravadas.
+PASTA_PAGINAS = 'paginas'
+
+def nome_pagina(nome_arquivo, numero_pagina, total_paginas, pasta_saida):
     """
-    Função que separa cada página de um arquivo PDF em arquivos PDF individuais.
+    Função que define o nome do arquivo de uma página separada.
     """
-    # Abrir o arquivo PDF em modo leitura binária.
-    arquivo_pdf = open(nome_arquivo, 'rb')
+    # Nome do PDF de origem, sem a extensão.
+    nome_base = os.path.splitext(os.path.basename(nome_arquivo))[0]
+
+    # Pelo menos 4 dígitos, para que os arquivos fiquem em ordem alfabética.
+    digitos = max(4, len(str(total_paginas)))
 
-    # Criar um objeto PdfReader para ler o conteúdo do PDF.
-    leitor_pdf = PyPDF2.PdfReader(arquivo_pdf)
+    return os.path.join(pasta_saida, f'{nome_base}_p{numero_pagina:0{digitos}d}.pdf')
+
+def separar_intervalo(nome_arquivo, inicio, fim, total_paginas, pasta_saida):
+    """
+    Função que separa as páginas de 'inicio' até 'fim' (sem incluir 'fim', a
+    partir de zero) de um arquivo PDF, gravando cada uma em um arquivo individual.
+    Retorna a quantidade de páginas gravadas.
+    """
+    # Abrir o arquivo PDF em modo leitura binária (o arquivo é fechado ao final).
+    with open(nome_arquivo, 'rb') as arquivo_pdf:
+        # Criar um objeto PdfReader para ler o conteúdo do PDF.
+        leitor_pdf = PyPDF2.PdfReader(arquivo_pdf)
 
-    # Obter o número total de páginas no PDF.
-    total_paginas = len(leitor_pdf.pages)
+        # Iterar pelas páginas do intervalo.
+        for numero_pagina in range(inicio, fim):
+            # Criar um objeto PdfWriter para escrever uma nova página.
+            escritor_pdf = PyPDF2.PdfWriter()
 
-    # Iterar por cada página do PDF.
-    for numero_pagina in range(total_paginas):
-        # Criar um objeto PdfWriter para escrever uma nova página.
-        escritor_pdf = PyPDF2.PdfWriter()
+            # Adicionar a página atual ao escritor.
+            escritor_pdf.add_page(leitor_pdf.pages[numero_pagina])
 
-        # Obter a página atual do PDF.
-        pagina_atual = leitor_pdf.pages[numero_pagina]
+            # Definir o nome do novo arquivo PDF para a página separada.
+            nome_novo_arquivo = nome_pagina(nome_arquivo, numero_pagina + 1, total_paginas, pasta_saida)
 
-        # Adicionar a página atual ao escritor.
-        escritor_pdf.add_page(pagina_atual)
+            # Criar e abrir o novo arquivo PDF em modo escrita binária.
+            with open(nome_novo_arquivo, 'wb') as novo_arquivo:
+                # Escrever a página atual no novo arquivo.
+                escritor_pdf.write(novo_arquivo)
 
-        # Definir o nome do novo arquivo PDF para a página separada.
-        nome_novo_arquivo = f'pagina_{numero_pagina + 1}.pdf'
+    return fim - inicio
 
-        # Criar e abrir o novo arquivo PDF em modo escrita binária.
-        with open(nome_novo_arquivo, 'wb') as novo_arquivo:
-            # Escrever a página atual no novo arquivo.
-            escritor_pdf.write(novo_arquivo)
+def contar_paginas(nome_arquivo):
+    """
+    Função que retorna o número de páginas de um arquivo PDF.
+    """
+    with open(nome_arquivo, 'rb') as arquivo_pdf:
+        return len(PyPDF2.PdfReader(arquivo_pdf).pages)
+
+def separar_paginas_pdf(nome_arquivo, pasta_saida=None):
+    """
+    Função que separa cada página de um arquivo PDF em arquivos PDF individuais.
+    Sem 'pasta_saida', as páginas são gravadas na subpasta 'paginas' da pasta do PDF.
+    """
+    # Pasta onde as páginas serão gravadas.
+    pasta_saida = pasta_saida or os.path.join(os.path.dirname(os.path.abspath(nome_arquivo)), PASTA_PAGINAS)
+    os.makedirs(pasta_saida, exist_ok=True)
 
-    # Fechar o arquivo PDF original.
-    arquivo_pdf.close()
+    # Obter o número total de páginas no PDF e separar todas elas.
+    total_paginas = contar_paginas(nome_arquivo)
+    return separar_intervalo(nome_arquivo, 0, total_paginas, total_paginas, pasta_saida)
 
-def processar_pdfs_na_pasta():
+def processar_pdfs_na_pasta(pasta=None, pasta_saida=None, processos=None, paginas_por_tarefa=PAGINAS_POR_TAREFA):
     """
-    Função que percorre todos os arquivos da pasta atual e separa as páginas dos PDFs
-    encontrados.
+    Função que percorre todos os arquivos da pasta (a atual, se não informada) e
+    separa as páginas dos PDFs encontrados, em paralelo, na subpasta 'paginas'
+    (ou em 'pasta_saida', que não pode ser a própria pasta dos PDFs).
+    Retorna o total de páginas separadas.
     """
-    # Obtém o diretório atual.
-    pasta_atual = os.getcwd()
-
-    # Itera sobre todos os arquivos na pasta atual.
-    for arquivo in os.listdir(pasta_atual):
-        # Verifica se o arquivo tem a extensão .pdf.
-        if arquivo.endswith('.pdf'):
-            # Obtém o caminho completo do arquivo.
-            caminho_completo = os.path.join(pasta_atual, arquivo)
-            # Chama a função para separar as páginas do PDF.
-            separar_paginas_pdf(caminho_completo)
+    # Obtém o diretório a processar e o de saída.
+    pasta = pasta or os.getcwd()
+    pasta_saida = pasta_saida or os.path.join(pasta, PASTA_PAGINAS)
+    if os.path.normcase(os.path.abspath(pasta_saida)) == os.path.normcase(os.path.abspath(pasta)):
+        # As páginas gravadas seriam lidas como PDFs de entrada na próxima execução.
+        raise ValueError('A pasta de saída deve ser diferente da pasta dos PDFs')
+    os.makedirs(pasta_saida, exist_ok=True)
+
+    # PDFs da pasta (a subpasta das páginas não entra na listagem).
+    arquivos = sorted(arquivo for arquivo in os.listdir(pasta)
+                      if arquivo.lower().endswith('.pdf') and os.path.isfile(os.path.join(pasta, arquivo)))
+
+    # Divide cada PDF em blocos de páginas (tarefas independentes).
+    tarefas = []
+    for arquivo in arquivos:
+        caminho_completo = os.path.join(pasta, arquivo)
+        try:
+            total_paginas = contar_paginas(caminho_completo)
+        except Exception as e:
+            print(f'Erro ao abrir {arquivo}: {e}')
+            continue
+        for inicio in range(0, total_paginas, paginas_por_tarefa):
+            fim = min(inicio + paginas_por_tarefa, total_paginas)
+            tarefas.append((caminho_completo, inicio, fim, total_paginas, pasta_saida))
+
+    # Separa os blocos em paralelo e mede a velocidade.
+    inicio_execucao = time.perf_counter()
+    total_separadas = 0
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {executor.submit(separar_intervalo, *tarefa): tarefa for tarefa in tarefas}
+        for futuro in as_completed(futuros):
+            caminho_completo, inicio, fim = futuros[futuro][:3]
+            try:
+                total_separadas += futuro.result()
+            except Exception as e:
+                print(f'Erro ao separar {os.path.basename(caminho_completo)} (páginas {inicio + 1} a {fim}): {e}')
+    duracao = time.perf_counter() - inicio_execucao
+
+    velocidade = total_separadas / duracao if duracao > 0 else 0.0
+    print(f'{total_separadas} páginas de {len(arquivos)} arquivo(s) separadas em {duracao:.1f} s '
+          f'({velocidade:.1f} páginas/s).')
+    return total_separadas
 
 # Exemplo de uso: Processar os PDFs na pasta atual.
-processar_pdfs_na_pasta()
+if __name__ == "__main__":
+    processar_pdfs_na_pasta()
@@ -0,0 +1,441 @@
+"""
+TIME-benchmark-extrator-QR.py - Corpus sintético e benchmark do extrator de QR codes
+
+Gera PDFs de cartões de time no layout esperado pelo TIME-extrator-cartao-QR.py.py,
+sem dados pessoais, e mede o extrator sobre eles.
+
+Funcionalidades principais:
+- Gera páginas digitalizadas com dois cartões por página, cada um com um QR code
+  de conteúdo base36 no formato XXXX-YYYY e a área do time na posição recortada
+  pelo extrator
+- Simula inclinação, ruído e páginas sem QR code ou com apenas um QR code
+- Grava um gabarito (gabarito.json) com o conteúdo esperado de cada página
+- Executa processar_todos_pdfs sobre o corpus e informa páginas por segundo,
+  pico de memória, nomes corretos e o deslocamento dos recortes
+- Salva o resultado em JSON e compara com uma execução anterior
+
+Uso:
+Ajuste as constantes no final do script e execute-o diretamente.
+Requer o pacote qrcode para gerar o corpus.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import importlib.util
+from contextlib import redirect_stdout
+
+import fitz
+import numpy as np
+from PIL import Image, ImageChops, ImageDraw
+
+try:
+    import qrcode
+except ImportError:
+    qrcode = None
+
+NOME_GABARITO = "gabarito.json"
+ALFABETO_BASE36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Página A4 em pontos
+LARGURA_PAGINA_PT = 595
+ALTURA_PAGINA_PT = 842
+# Centros dos QR codes como fração da página (um cartão na metade de cima e outro na de baixo)
+POSICOES_QR = ((0.577, 0.114), (0.577, 0.614))
+# Lado do marcador desenhado no centro da área do time, em pixels
+LADO_MARCADOR = 60
+# Distância máxima do centro do recorte em que o marcador é procurado, em pixels
+RAIO_BUSCA_MARCADOR = 150
+
+
+def carregar_extrator():
+    """
+    Carrega o TIME-extrator-cartao-QR.py.py como módulo.
+    
+    O nome do arquivo não é um nome de módulo válido, então ele é carregado pelo
+    caminho. O módulo é registrado em sys.modules para que os processos do modo
+    paralelo consigam localizar as funções do extrator.
+    
+    Returns:
+        module: Módulo do extrator
+    """
+    if "extrator_qr" in sys.modules:
+        return sys.modules["extrator_qr"]
+    caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TIME-extrator-cartao-QR.py.py")
+    spec = importlib.util.spec_from_file_location("extrator_qr", caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules["extrator_qr"] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+# Carregado no import para que os processos do pool também o registrem
+extrator = carregar_extrator()
+
+
+def gerar_conteudo_qr(rng, usados):
+    """
+    Sorteia um conteúdo de QR code inédito no formato XXXX-YYYY em base36.
+    
+    Args:
+        rng (random.Random): Gerador de números aleatórios
+        usados (set): Conteúdos já sorteados, atualizado com o novo conteúdo
+    
+    Returns:
+        str: Conteúdo do QR code
+    """
+    while True:
+        parte1 = "".join(rng.choice(ALFABETO_BASE36) for _ in range(4))
+        parte2 = "".join(rng.choice(ALFABETO_BASE36) for _ in range(rng.randint(1, 4)))
+        conteudo = f"{parte1}-{parte2}"
+        if conteudo not in usados:
+            usados.add(conteudo)
+            return conteudo
+
+
+def gerar_imagem_qr(conteudo, lado):
+    """
+    Gera a imagem de um QR code.
+    
+    Args:
+        conteudo (str): Texto codificado
+        lado (int): Lado da imagem em pixels
+    
+    Returns:
+        PIL.Image: QR code em tons de cinza
+    """
+    if qrcode is None:
+        raise ImportError("O pacote qrcode é necessário para gerar o corpus (pip install qrcode).")
+    qr = qrcode.QRCode(border=2)
+    qr.add_data(conteudo)
+    qr.make(fit=True)
+    return qr.make_image().convert("L").resize((lado, lado), Image.NEAREST)
+
+
+def caixa_esperada(centro_qr, dpi=300):
+    """
+    Calcula a área do time que o extrator recorta a partir de um QR code.
+    
+    Usa o próprio calcular_caixa_recorte do extrator sobre um QR code sem
+    inclinação centrado no ponto informado.
+    
+    Args:
+        centro_qr (tuple): Centro (x, y) do QR code em pixels
+        dpi (int): Resolução em DPI (default 300)
+    
+    Returns:
+        tuple: Caixa (x0, y0, x1, y1) em pixels
+    """
+    x, y = centro_qr
+    cantos = [(x - 1, y - 1), (x + 1, y - 1), (x + 1, y + 1), (x - 1, y + 1)]
+    return extrator.calcular_caixa_recorte({'conteudo': "", 'cantos': cantos}, dpi)
+
+
+def gerar_pagina(conteudos, largura, altura, angulo=0.0, ruido=0.0, dpi=300):
+    """
+    Desenha uma página digitalizada com até dois cartões.
+    
+    Cada cartão tem o QR code e, na área do time, a moldura da caixa recortada
+    pelo extrator com um marcador quadrado no centro, usado para medir o
+    deslocamento do recorte.
+    
+    Args:
+        conteudos (list): Conteúdos dos QR codes presentes na página (0 a 2)
+        largura (int): Largura da página em pixels
+        altura (int): Altura da página em pixels
+        angulo (float): Inclinação da digitalização em graus (default 0.0)
+        ruido (float): Desvio padrão do ruído gaussiano em tons de cinza (default 0.0)
+        dpi (int): Resolução em DPI (default 300)
+    
+    Returns:
+        PIL.Image: Página em tons de cinza
+    """
+    img = Image.new("L", (largura, altura), 255)
+    desenho = ImageDraw.Draw(img)
+    lado_qr = extrator.mm_to_pixels(17, dpi)
+
+    for conteudo, (fx, fy) in zip(conteudos, POSICOES_QR):
+        centro = (round(largura * fx), round(altura * fy))
+        img.paste(gerar_imagem_qr(conteudo, lado_qr), (centro[0] - lado_qr // 2, centro[1] - lado_qr // 2))
+
+        x0, y0, x1, y1 = caixa_esperada(centro, dpi)
+        desenho.rectangle([x0, y0, x1 - 1, y1 - 1], outline=0, width=4)
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        meio = LADO_MARCADOR / 2
+        desenho.rectangle([cx - meio, cy - meio, cx + meio - 1, cy + meio - 1], fill=0)
+
+    if angulo:
+        img = img.rotate(angulo, resample=Image.BICUBIC, fillcolor=255)
+    if ruido:
+        # effect_noise gera ruído centrado em 128
+        img = ImageChops.add(img, Image.effect_noise(img.size, ruido), scale=1.0, offset=-128)
+    return img
+
+
+def gerar_corpus(pasta, arquivos=4, paginas=25, inclinacao_max=2.0, ruido=8.0, fracao_sem_qr=0.05,
+                 fracao_um_qr=0.05, dpi=300, qualidade_jpeg=85, semente=0):
+    """
+    Gera PDFs sintéticos de cartões de time e o gabarito correspondente.
+    
+    Cada página é uma única imagem JPEG ocupando a página inteira, como nas
+    digitalizações reais, no tamanho em que o extrator renderiza a página.
+    
+    Args:
+        pasta (str): Pasta onde os PDFs e o gabarito serão gravados
+        arquivos (int): Quantidade de PDFs (default 4)
+        paginas (int): Páginas por PDF (default 25)
+        inclinacao_max (float): Inclinação máxima sorteada por página, em graus (default 2.0)
+        ruido (float): Desvio padrão do ruído gaussiano (default 8.0, 0 = sem ruído)
+        fracao_sem_qr (float): Fração das páginas sem QR code (default 0.05)
+        fracao_um_qr (float): Fração das páginas com apenas um QR code (default 0.05)
+        dpi (int): Resolução em DPI usada pelo extrator (default 300)
+        qualidade_jpeg (int): Qualidade das imagens embutidas (default 85)
+        semente (int): Semente do sorteio, para corpus reproduzíveis (default 0)
+    
+    Returns:
+        dict: Gabarito com a lista de páginas de cada PDF
+    """
+    rng = random.Random(semente)
+    usados = set()
+    os.makedirs(pasta, exist_ok=True)
+    gabarito = {'dpi': dpi, 'arquivos': {}}
+
+    for n in range(1, arquivos + 1):
+        nome_pdf = f"corpus_{n:03d}.pdf"
+        doc = fitz.open()
+        paginas_gabarito = []
+
+        for _ in range(paginas):
+            sorteio = rng.random()
+            if sorteio < fracao_sem_qr:
+                quantidade = 0
+            elif sorteio < fracao_sem_qr + fracao_um_qr:
+                quantidade = 1
+            else:
+                quantidade = 2
+            conteudos = [gerar_conteudo_qr(rng, usados) for _ in range(quantidade)]
+            angulo = round(rng.uniform(-inclinacao_max, inclinacao_max), 2)
+
+            page = doc.new_page(width=LARGURA_PAGINA_PT, height=ALTURA_PAGINA_PT)
+            largura, altura = extrator.tamanho_pagina_renderizada(page, dpi)
+            img = gerar_pagina(conteudos, largura, altura, angulo, ruido, dpi)
+            buffer = io.BytesIO()
+            img.save(buffer, "JPEG", quality=qualidade_jpeg)
+            page.insert_image(page.rect, stream=buffer.getvalue())
+            paginas_gabarito.append({'conteudos': conteudos, 'angulo': angulo})
+
+        doc.save(os.path.join(pasta, nome_pdf), deflate=True)
+        doc.close()
+        gabarito['arquivos'][nome_pdf] = paginas_gabarito
+        print(f"Gerado: {nome_pdf} ({paginas} páginas)")
+
+    with open(os.path.join(pasta, NOME_GABARITO), 'w', encoding='utf-8') as arquivo:
+        json.dump(gabarito, arquivo, indent=2)
+    return gabarito
+
+
+def saidas_esperadas(gabarito):
+    """
+    Lista os arquivos que o extrator deve gerar para o corpus.
+    
+    Args:
+        gabarito (dict): Gabarito gerado por gerar_corpus
+    
+    Returns:
+        tuple: (recortes, sequenciais) com os caminhos relativos dos recortes
+               nomeados pelo QR code e das páginas salvas com nome sequencial
+    """
+    recortes = []
+    sequenciais = set()
+    for paginas in gabarito['arquivos'].values():
+        # O contador sequencial é compartilhado por sem_qr e um_qr e reinicia a cada PDF
+        contador = 0
+        for pagina in paginas:
+            conteudos = pagina['conteudos']
+            if len(conteudos) >= 2:
+                for conteudo in conteudos:
+                    nome = extrator.converter_nome_qr(extrator.sanitize_filename(conteudo))
+                    recortes.append(os.path.join(nome.split('_')[0], f"{nome}.jpg"))
+            else:
+                contador += 1
+                prefixo = "sem_qr" if not conteudos else "um_qr"
+                nome = f"{prefixo}_{contador:04d}"
+                sequenciais.add(os.path.join(nome.split('_')[0], f"{nome}.jpg"))
+    return recortes, sorted(sequenciais)
+
+
+def medir_deslocamento_recorte(caminho):
+    """
+    Mede o deslocamento do marcador em relação ao centro de um recorte.
+    
+    O marcador é localizado pelo centroide dos pixels escuros em uma janela
+    ao redor do centro do recorte, longe da moldura e do QR code.
+    
+    Args:
+        caminho (str): Caminho do recorte gerado pelo extrator
+    
+    Returns:
+        float: Distância em pixels entre o marcador e o centro do recorte,
+               ou None se o marcador não for encontrado
+    """
+    with Image.open(caminho) as img:
+        pixels = np.asarray(img.convert("L"))
+    altura, largura = pixels.shape
+    margem_x = max(largura // 2 - RAIO_BUSCA_MARCADOR, 0)
+    margem_y = max(altura // 2 - RAIO_BUSCA_MARCADOR, 0)
+    regiao = pixels[margem_y:altura - margem_y, margem_x:largura - margem_x]
+    ys, xs = np.nonzero(regiao < 96)
+    if len(xs) < LADO_MARCADOR * LADO_MARCADOR // 4:
+        return None
+    dx = xs.mean() + margem_x - (largura - 1) / 2
+    dy = ys.mean() + margem_y - (altura - 1) / 2
+    return float(np.hypot(dx, dy))
+
+
+def executar_benchmark(pasta_corpus, pasta_saida, tolerancia_px=15, silencioso=True, **opcoes_extrator):
+    """
+    Executa o extrator sobre o corpus e confere o resultado com o gabarito.
+    
+    A pasta de saída é apagada antes da execução e o manifesto do extrator é
+    desativado, para que todas as páginas sejam processadas.
+    
+    Args:
+        pasta_corpus (str): Pasta com os PDFs e o gabarito
+        pasta_saida (str): Pasta de saída temporária do extrator
+        tolerancia_px (float): Deslocamento máximo do marcador para considerar
+                               o recorte correto (default 15)
+        silencioso (bool): Suprime as mensagens do extrator no processo principal (default True)
+        **opcoes_extrator: Opções repassadas a processar_todos_pdfs (processos,
+                           dpi_deteccao, cinza, etc.)
+    
+    Returns:
+        dict: Resultado do benchmark
+    """
+    with open(os.path.join(pasta_corpus, NOME_GABARITO), encoding='utf-8') as arquivo:
+        gabarito = json.load(arquivo)
+    total_paginas = sum(len(paginas) for paginas in gabarito['arquivos'].values())
+
+    if os.path.exists(pasta_saida):
+        shutil.rmtree(pasta_saida)
+
+    saida_extrator = io.StringIO() if silencioso else sys.stdout
+    inicio = time.perf_counter()
+    with redirect_stdout(saida_extrator):
+        extrator.processar_todos_pdfs(pasta_corpus, pasta_saida, dpi=gabarito['dpi'], usar_manifesto=False,
+                                      **opcoes_extrator)
+    tempo = time.perf_counter() - inicio
+
+    recortes, sequenciais = saidas_esperadas(gabarito)
+    nomes_corretos = 0
+    recortes_corretos = 0
+    deslocamentos = []
+    for relativo in recortes:
+        caminho = os.path.join(pasta_saida, relativo)
+        if not os.path.exists(caminho):
+            continue
+        nomes_corretos += 1
+        deslocamento = medir_deslocamento_recorte(caminho)
+        if deslocamento is not None:
+            deslocamentos.append(deslocamento)
+            if deslocamento <= tolerancia_px:
+                recortes_corretos += 1
+    sequenciais_corretos = sum(os.path.exists(os.path.join(pasta_saida, relativo)) for relativo in sequenciais)
+
+    gerados = set()
+    for raiz, _, arquivos in os.walk(pasta_saida):
+        for nome in arquivos:
+            if nome.endswith(".jpg"):
+                gerados.add(os.path.relpath(os.path.join(raiz, nome), pasta_saida))
+    inesperados = len(gerados - set(recortes) - set(sequenciais))
+
+    return {
+        'opcoes': opcoes_extrator,
+        'paginas': total_paginas,
+        'tempo_s': tempo,
+        'paginas_por_segundo': total_paginas / tempo if tempo else None,
+        'pico_memoria_mb': extrator.pico_memoria_mb(),
+        'recortes_esperados': len(recortes),
+        'nomes_corretos': nomes_corretos,
+        'recortes_corretos': recortes_corretos,
+        'deslocamento_medio_px': float(np.mean(deslocamentos)) if deslocamentos else None,
+        'deslocamento_maximo_px': float(np.max(deslocamentos)) if deslocamentos else None,
+        'sequenciais_esperados': len(sequenciais),
+        'sequenciais_corretos': sequenciais_corretos,
+        'arquivos_inesperados': inesperados
+    }
+
+
+def imprimir_resultado(resultado, base=None):
+    """
+    Exibe o resultado do benchmark, com a variação em relação a uma execução anterior.
+    
+    Args:
+        resultado (dict): Resultado de executar_benchmark
+        base (dict): Resultado anterior para comparação (default None)
+    """
+    def formatar(valor):
+        if valor is None:
+            return "-"
+        return f"{valor:.2f}" if isinstance(valor, float) else str(valor)
+
+    linhas = [
+        ("Páginas", 'paginas'),
+        ("Tempo (s)", 'tempo_s'),
+        ("Páginas por segundo", 'paginas_por_segundo'),
+        ("Pico de memória (MB)", 'pico_memoria_mb'),
+        ("Recortes esperados", 'recortes_esperados'),
+        ("Nomes corretos", 'nomes_corretos'),
+        ("Recortes na posição", 'recortes_corretos'),
+        ("Deslocamento médio (px)", 'deslocamento_medio_px'),
+        ("Deslocamento máximo (px)", 'deslocamento_maximo_px'),
+        ("Páginas sequenciais esperadas", 'sequenciais_esperados'),
+        ("Páginas sequenciais corretas", 'sequenciais_corretos'),
+        ("Arquivos inesperados", 'arquivos_inesperados')
+    ]
+
+    print(f"\nOpções do extrator: {resultado['opcoes'] or 'padrão'}")
+    print(f"{'Métrica':<32}{'Atual':>12}" + (f"{'Base':>12}{'Variação':>12}" if base else ""))
+    print("-" * (44 + (24 if base else 0)))
+    for rotulo, chave in linhas:
+        atual = resultado.get(chave)
+        linha = f"{rotulo:<32}{formatar(atual):>12}"
+        if base:
+            anterior = base.get(chave)
+            variacao = "-"
+            if isinstance(atual, (int, float)) and isinstance(anterior, (int, float)) and anterior:
+                variacao = f"{(atual - anterior) / anterior * 100:+.1f}%"
+            linha += f"{formatar(anterior):>12}{variacao:>12}"
+        print(linha)
+
+
+# Execução principal
+if __name__ == "__main__":
+    # Configuração dos caminhos (ajustar conforme necessidade)
+    PASTA_CORPUS = r"C:\Users\rodrigo.zambianco\Desktop\TIME-QR-benchmark"
+    PASTA_SAIDA = r"C:\Users\rodrigo.zambianco\Desktop\TIME-QR-benchmark\saida"
+    # True gera (ou regera) o corpus antes de medir
+    GERAR_CORPUS = True
+    # Resultado desta execução e de uma execução anterior para comparação (None = não compara)
+    ARQUIVO_RESULTADO = os.path.join(PASTA_CORPUS, "resultado.json")
+    ARQUIVO_BASE = None
+    # Opções repassadas a processar_todos_pdfs
+    OPCOES_EXTRATOR = {'processos': 1}
+
+    if GERAR_CORPUS:
+        gerar_corpus(PASTA_CORPUS, arquivos=4, paginas=25, inclinacao_max=2.0, ruido=8.0,
+                     fracao_sem_qr=0.05, fracao_um_qr=0.05)
+
+    resultado = executar_benchmark(PASTA_CORPUS, PASTA_SAIDA, **OPCOES_EXTRATOR)
+
+    base = None
+    if ARQUIVO_BASE:
+        with open(ARQUIVO_BASE, encoding='utf-8') as arquivo:
+            base = json.load(arquivo)
+    imprimir_resultado(resultado, base)
+
+    with open(ARQUIVO_RESULTADO, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, indent=2)
+    print(f"\nResultado salvo em: {ARQUIVO_RESULTADO}")
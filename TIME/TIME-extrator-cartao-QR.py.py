@@ -19,13 +19,41 @@ Data: [DATA DE CRIAÇÃO]
 
 import os
 import re
+import copy
+import json
+import hashlib
 import fitz
 from PIL import Image
 from pyzbar.pyzbar import decode
+import io
 import math
+import time
+import threading
+import csv
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-# Variável global para contar páginas sem QR codes
-contador_paginas_sem_qr = 0
+try:
+    # Opcional: notificações do kernel no modo de monitoramento (somente Linux)
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+# Manifesto de arquivos já processados, gravado na pasta de saída
+NOME_MANIFESTO = "manifesto.json"
+VERSAO_MANIFESTO = 1
+# No modo sequencial, o manifesto é gravado a cada quantas páginas concluídas
+PAGINAS_POR_GRAVACAO_MANIFESTO = 10
+
+# Documento aberto por cada processo do modo paralelo (reaproveitado entre tarefas)
+_documento_worker = None
+
+# Gravador em segundo plano ativo (None = gravação síncrona) e subpastas já criadas
+_gravador = None
+_pastas_existentes = set()
+
+# Perfil de execução ativo (None = instrumentação desligada)
+_perfil = None
 
 
 def sanitize_filename(text):
@@ -41,31 +69,194 @@ def sanitize_filename(text):
     return re.sub(r'[\\/*?:"<>|]', "_", text)
 
 
-def pdf_page_to_image(page, dpi=300):
+def pdf_page_to_image(page, dpi=300, cinza=False, clip=None):
     """
     Renderiza uma página do PDF em alta resolução como imagem PIL.
     
     Args:
         page (fitz.Page): Página do PDF a ser renderizada
         dpi (int): Resolução desejada (default 300)
+        cinza (bool): Renderiza em tons de cinza, com um único canal (default False)
+        clip (tuple): Região (x0, y0, x1, y1) em pixels da página renderizada no
+                      mesmo DPI; apenas essa região é rasterizada (default None)
         
     Returns:
-        PIL.Image: Imagem renderizada da página
+        PIL.Image: Imagem renderizada da página (ou da região pedida)
     """
     zoom = dpi / 96  # 72 is the default PDF DPI
     mat = fitz.Matrix(zoom, zoom)
-    pix = page.get_pixmap(matrix=mat)
-    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    if clip is not None:
+        clip = fitz.Rect(clip) * ~mat
+    colorspace = fitz.csGRAY if cinza else fitz.csRGB
+    with medir_etapa('renderizacao') as etapa:
+        pix = page.get_pixmap(matrix=mat, colorspace=colorspace, clip=clip)
+        img = Image.frombytes("L" if cinza else "RGB", [pix.width, pix.height], pix.samples)
+        etapa.bytes = len(pix.samples)
     return img
 
 
-def read_qrcodes_from_image(img, max_qrcodes=2):
+def _matriz_imagem_no_conteudo(page, nome_imagem):
+    """
+    Lê a posição da imagem diretamente do fluxo de conteúdo de páginas simples.
+    
+    Páginas de scanner normalmente contêm apenas "q <matriz> cm /Im Do Q". Ler
+    esses operadores é muito mais rápido que interpretar a página inteira com
+    get_image_info, que decodifica a imagem.
+    
+    Args:
+        page (fitz.Page): Página do PDF
+        nome_imagem (str): Nome do recurso da imagem na página
+        
+    Returns:
+        fitz.Matrix: Transformação do quadrado unitário da imagem (linhas de cima
+                     para baixo) para as coordenadas da página sem rotação, ou
+                     None se o conteúdo tiver outros operadores
+    """
+    try:
+        tokens = page.read_contents().split()
+    except Exception:
+        return None
+    
+    ctm = fitz.Matrix(1, 0, 0, 1, 0, 0)
+    pilha = []
+    operandos = []
+    matriz = None
+    for token in tokens:
+        token = token.decode('latin-1')
+        if token[0] in '/+-.0123456789':
+            operandos.append(token)
+            continue
+        if token == 'q':
+            pilha.append(ctm)
+        elif token == 'Q' and pilha:
+            ctm = pilha.pop()
+        elif token == 'cm' and len(operandos) == 6:
+            try:
+                ctm = fitz.Matrix(*map(float, operandos)) * ctm
+            except ValueError:
+                return None
+        elif token == 'Do' and operandos == ['/' + nome_imagem] and matriz is None:
+            matriz = ctm
+        else:
+            return None
+        operandos = []
+    
+    if matriz is None:
+        return None
+    # O espaço da imagem no PDF tem o eixo y para cima; a primeira linha fica em cima
+    return fitz.Matrix(1, 0, 0, -1, 0, 1) * matriz * page.transformation_matrix
+
+
+def extrair_imagem_embutida(page, tolerancia=0.01, cinza=False):
+    """
+    Obtém diretamente a imagem digitalizada de uma página formada por uma única imagem.
+    
+    PDFs de scanner costumam ter, em cada página, apenas uma imagem JPEG ou
+    CCITT ocupando a página inteira. Nesse caso a imagem é decodificada na sua
+    resolução original, sem rasterizar a página, e orientada conforme o
+    posicionamento na página e a rotação da página.
+    
+    Args:
+        page (fitz.Page): Página do PDF
+        tolerancia (float): Diferença relativa aceita entre a área da imagem e a
+                            página e entre as escalas horizontal e vertical (default 0.01)
+        cinza (bool): Decodifica em tons de cinza; em JPEGs, só o canal de
+                      luminância é decodificado (default False)
+        
+    Returns:
+        tuple: (imagem, dpi) com a imagem PIL em RGB (ou "L" se cinza) e o DPI inteiro equivalente ao
+               usado em pdf_page_to_image, ou None se a página não for uma imagem única
+               simples (nesse caso a página deve ser renderizada)
+    """
+    imagens = page.get_images(full=True)
+    if len(imagens) != 1:
+        return None
+    xref, smask, nome = imagens[0][0], imagens[0][1], imagens[0][7]
+    doc = page.parent
+    if smask or doc.xref_get_key(xref, "ImageMask")[1] == "true" or doc.xref_get_key(xref, "Decode")[0] != "null":
+        return None
+    m = _matriz_imagem_no_conteudo(page, nome)
+    if m is None:
+        # Conteúdo mais complexo: deixa o MuPDF localizar a imagem
+        posicoes = page.get_image_info(xrefs=True)
+        if len(posicoes) != 1:
+            return None
+        m = fitz.Matrix(posicoes[0]['transform'])
+    
+    # Transformação da imagem (quadrado unitário) até a página como é renderizada
+    m = m * page.rotation_matrix
+    if abs(m.b) < 1e-6 and abs(m.c) < 1e-6:
+        transposicoes = {(True, True): None, (False, False): Image.ROTATE_180,
+                         (False, True): Image.FLIP_LEFT_RIGHT, (True, False): Image.FLIP_TOP_BOTTOM}
+        transposicao = transposicoes[(m.a > 0, m.d > 0)]
+    elif abs(m.a) < 1e-6 and abs(m.d) < 1e-6:
+        transposicoes = {(False, True): Image.ROTATE_90, (True, False): Image.ROTATE_270,
+                         (True, True): Image.TRANSPOSE, (False, False): Image.TRANSVERSE}
+        transposicao = transposicoes[(m.b > 0, m.c > 0)]
+    else:
+        return None  # Imagem inclinada na página
+    
+    # A imagem precisa cobrir a página inteira
+    area = fitz.Rect(0, 0, 1, 1) * m
+    pagina = page.rect
+    limite = tolerancia * max(pagina.width, pagina.height)
+    if any(abs(a - b) > limite for a, b in zip(area, pagina)):
+        return None
+    
+    try:
+        dados = doc.extract_image(xref)
+        if dados['colorspace'] == 4:
+            return None  # CMYK: a conversão do Pillow não equivale à renderização
+        img = Image.open(io.BytesIO(dados['image']))
+        if cinza and img.format == "JPEG":
+            img.draft("L", img.size)
+        img.load()
+    except Exception:
+        return None
+    if transposicao is not None:
+        img = img.transpose(transposicao)
+    modo = "L" if cinza else "RGB"
+    if img.mode != modo:
+        img = img.convert(modo)
+    
+    zoom_x = img.width / pagina.width
+    zoom_y = img.height / pagina.height
+    if abs(zoom_x - zoom_y) > tolerancia * zoom_x:
+        return None
+    # Mesma relação entre DPI e zoom usada em pdf_page_to_image, arredondada como
+    # o DPI inteiro da renderização: o tamanho da página em pixels não é exato e
+    # um DPI fracionário (ex.: 300.1) mudaria em 1 pixel o tamanho dos recortes
+    return img, round(zoom_x * 96)
+
+
+def tamanho_pagina_renderizada(page, dpi=300):
+    """
+    Calcula o tamanho em pixels que a página teria se renderizada por inteiro.
+    
+    Args:
+        page (fitz.Page): Página do PDF
+        dpi (int): Resolução desejada (default 300)
+        
+    Returns:
+        tuple: (largura, altura) em pixels
+    """
+    zoom = dpi / 96
+    irect = (page.rect * fitz.Matrix(zoom, zoom)).irect
+    return irect.width, irect.height
+
+
+def read_qrcodes_from_image(img, max_qrcodes=2, limiar=None):
     """
     Detecta QR codes em uma imagem e retorna seus conteúdos e coordenadas.
     
+    A leitura é sempre feita em tons de cinza: imagens já em um único canal
+    ("L") são lidas sem conversão e as coloridas são convertidas antes.
+    
     Args:
         img (PIL.Image): Imagem a ser analisada
         max_qrcodes (int): Número máximo de QR codes a serem detectados (default 2)
+        limiar (int): Se informado, a leitura é feita em uma versão binarizada
+                      (preto e branco) da imagem com esse limiar de 0 a 255 (default None)
         
     Returns:
         list: Lista de dicionários com informações dos QR codes detectados
@@ -73,7 +264,14 @@ def read_qrcodes_from_image(img, max_qrcodes=2):
               - 'conteudo': texto decodificado do QR code
               - 'cantos': coordenadas dos cantos do QR code
     """
-    detected = decode(img)
+    with medir_etapa('leitura_qr') as etapa:
+        if limiar is not None:
+            img = binarizar_imagem(img, limiar)
+        elif img.mode != "L":
+            img = img.convert("L")
+        detected = decode(img)
+        if etapa.ativa:
+            etapa.bytes = tamanho_imagem(img)
     qrcodes = []
     for qr in detected[:max_qrcodes]:
         data = qr.data.decode('utf-8')
@@ -85,6 +283,22 @@ def read_qrcodes_from_image(img, max_qrcodes=2):
     return qrcodes
 
 
+def binarizar_imagem(img, limiar=128):
+    """
+    Gera uma versão preto e branco da imagem, em um único canal.
+    
+    Args:
+        img (PIL.Image): Imagem original
+        limiar (int): Tons abaixo do limiar viram preto, os demais branco (default 128)
+        
+    Returns:
+        PIL.Image: Imagem em modo "L" contendo apenas 0 e 255
+    """
+    if img.mode != "L":
+        img = img.convert("L")
+    return img.point([0] * limiar + [255] * (256 - limiar))
+
+
 def calcular_angulo_entre_pontos(p1, p2):
     """
     Calcula o ângulo entre dois pontos para alinhamento vertical.
@@ -143,17 +357,16 @@ def mm_to_pixels(mm, dpi=300):
     return int(inches * dpi)
 
 
-def processar_qr_code(img_rotacionada, qr_info, dpi=300):
+def calcular_caixa_recorte(qr_info, dpi=300):
     """
-    Processa um QR code individualmente e retorna o recorte da área do time.
+    Calcula a caixa da área do time na imagem rotacionada a partir de um QR code.
     
     Args:
-        img_rotacionada (PIL.Image): Imagem já rotacionada
         qr_info (dict): Informações do QR code (conteúdo e cantos)
         dpi (int): Resolução em DPI (default 300)
         
     Returns:
-        PIL.Image: Imagem recortada contendo o time ou None em caso de erro
+        tuple: Caixa (x0, y0, x1, y1) em pixels da imagem rotacionada
     """
     # Tamanhos em mm
     qr_size_mm = 17
@@ -176,88 +389,370 @@ def processar_qr_code(img_rotacionada, qr_info, dpi=300):
     crop_x = qr_center_x + crop_center_x_px - (crop_width_px // 2)
     crop_y = qr_center_y + crop_center_y_px - (crop_height_px // 2)
 
-    # Fazer o recorte
-    box = (
+    return (
         int(crop_x),
         int(crop_y),
         int(crop_x + crop_width_px),
         int(crop_y + crop_height_px)
     )
+
+
+def processar_qr_code(img, qr_info, matriz, dpi=300):
+    """
+    Processa um QR code individualmente e retorna o recorte alinhado da área do time.
+    
+    A página não é rotacionada por inteiro: a caixa do recorte, definida na
+    página rotacionada, é levada de volta à página original pela matriz de
+    rotação e somente essa região é desrotacionada.
+    
+    Args:
+        img (PIL.Image): Imagem da página, sem rotação
+        qr_info (dict): Informações do QR code (conteúdo e cantos)
+        matriz (tuple): Transformação retornada por calcular_matriz_rotacao
+        dpi (int): Resolução em DPI (default 300)
+        
+    Returns:
+        PIL.Image: Imagem recortada contendo o time ou None em caso de erro
+    """
+    # Fazer o recorte
+    box = calcular_caixa_recorte(qr_info, dpi)
     
     try:
-        recorte = img_rotacionada.crop(box)
+        recorte = recortar_com_rotacao(img, (0, 0), matriz, box)
         return recorte
     except Exception as e:
         print(f"Erro ao recortar imagem: {e}")
         return None
 
 
-def processar_pagina_e_alinhar(pdf_path, pagina, pasta_saida, dpi=300):
+def processar_pagina_e_alinhar(page, pasta_saida, dpi=300, dpi_deteccao=None, usar_imagem_embutida=True, cinza=False,
+                               limiar_qr=None, sufixo_provisorio=None):
     """
     Processa uma página individual do PDF, detecta QR codes e realiza os recortes.
     
+    A página é renderizada uma única vez e a mesma imagem é usada para a
+    leitura dos QR codes, para o alinhamento e para os recortes.
+    
+    Páginas com menos de dois QR codes não são salvas aqui: o nome sequencial
+    (sem_qr_####/um_qr_####) depende da ordem das páginas no PDF e é atribuído
+    por quem chama, o que permite processar as páginas em paralelo.
+    
     Args:
-        pdf_path (str): Caminho do arquivo PDF
-        pagina (int): Índice da página a ser processada
+        page (fitz.Page): Página do PDF já carregada
         pasta_saida (str): Pasta de destino para os recortes
         dpi (int): Resolução em DPI (default 300)
+        dpi_deteccao (int): Se informado, localiza os QR codes em uma renderização
+                            nesse DPI e renderiza no DPI completo só as regiões
+                            dos recortes (default None = renderização única)
+        usar_imagem_embutida (bool): Em páginas formadas por uma única imagem
+                                     digitalizada, usa essa imagem na resolução
+                                     original em vez de renderizar (default True)
+        cinza (bool): Grava os recortes em tons de cinza (default False). Os QR
+                      codes são sempre lidos em tons de cinza; com a saída
+                      colorida, páginas renderizadas só têm em cores as
+                      regiões dos recortes (ou a página inteira, se ela for
+                      salva com nome sequencial)
+        limiar_qr (int): Se informado, os QR codes são lidos em uma versão
+                         binarizada da imagem com esse limiar (default None)
+        sufixo_provisorio (str): Se informado, os recortes são gravados com esse
+                                 sufixo no nome e quem chama atribui o nome
+                                 definitivo (default None)
+        
+    Returns:
+        dict: Resultado do processamento da página com:
+              - 'total_qr': quantidade de QR codes detectados
+              - 'prefixo_sequencial': 'sem_qr' ou 'um_qr' quando a página inteira
+                deve ser salva com nome sequencial, None caso contrário
+              - 'imagem': imagem da página inteira a ser salva (ou None)
+              - 'arquivos': caminhos dos recortes salvos
     """
-    global contador_paginas_sem_qr
+    img = None
+    if usar_imagem_embutida:
+        with medir_etapa('imagem_embutida') as etapa:
+            embutida = extrair_imagem_embutida(page, cinza=cinza)
+            if embutida is not None and etapa.ativa:
+                etapa.bytes = tamanho_imagem(embutida[0])
+        if embutida is not None:
+            # Os recortes passam a usar a resolução original da digitalização
+            img, dpi = embutida
     
-    doc = fitz.open(pdf_path)
-    page = doc.load_page(pagina)
-    img = pdf_page_to_image(page, dpi)
-    qrcodes = read_qrcodes_from_image(img, max_qrcodes=2)
+    if img is None and dpi_deteccao:
+        resultado = processar_pagina_em_dois_estagios(page, pasta_saida, dpi, dpi_deteccao, cinza, limiar_qr,
+                                                      sufixo_provisorio)
+        if resultado is not None:
+            return resultado
+        # Menos de dois QR codes na busca reduzida: confirma na resolução completa
+    
+    # Página renderizada: a leitura usa um único canal e a cor, se pedida, é
+    # renderizada depois apenas onde vai para a saída
+    cor_por_regiao = img is None and not cinza
+    if img is None:
+        img = pdf_page_to_image(page, dpi, cinza=True)
+    qrcodes = read_qrcodes_from_image(img, max_qrcodes=2, limiar=limiar_qr)
+    resultado = {
+        'total_qr': len(qrcodes),
+        'prefixo_sequencial': None,
+        'imagem': None,
+        'arquivos': []
+    }
     
     if len(qrcodes) < 1:
         print("Nenhum QR code detectado na página.")
-        # Salva a página inteira com nome sequencial
-        contador_paginas_sem_qr += 1
-        nome_arquivo = f"sem_qr_{contador_paginas_sem_qr:04d}"
-        criar_pasta_e_salvar(pasta_saida, nome_arquivo, img)
-        return
+        # A página inteira será salva com nome sequencial
+        resultado['prefixo_sequencial'] = "sem_qr"
+        resultado['imagem'] = pdf_page_to_image(page, dpi) if cor_por_regiao else img
+        return resultado
     
     # Se houver 2 QR codes, usamos para alinhar a página
-    if len(qrcodes) >= 2:
+    if len(qrcodes) < 2:
+        # Se só tiver 1 QR code, a página será salva com nome sequencial
+        resultado['prefixo_sequencial'] = "um_qr"
+        resultado['imagem'] = pdf_page_to_image(page, dpi) if cor_por_regiao else img
+        return resultado
+    
+    with medir_etapa('alinhamento'):
         p1 = calcular_centro_qr(qrcodes[0]['cantos'])
         p2 = calcular_centro_qr(qrcodes[1]['cantos'])
         angulo = calcular_angulo_entre_pontos(p1, p2)
-    else:
-        # Se só tiver 1 QR code, salva com nome sequencial
-        contador_paginas_sem_qr += 1
-        nome_arquivo = f"um_qr_{contador_paginas_sem_qr:04d}"
-        criar_pasta_e_salvar(pasta_saida, nome_arquivo, img)
-        return
-    
-    img_rotacionada = extrair_e_rotacionar_pagina_pdf(pdf_path, pagina, angulo, dpi)
+        matriz, _ = calcular_matriz_rotacao(img.width, img.height, angulo)
     
     # Processar cada QR code individualmente
     for idx, qr in enumerate(qrcodes):
-        recorte = processar_qr_code(img_rotacionada, qr, dpi)
+        if cor_por_regiao:
+            recorte = renderizar_recorte(page, qr, matriz, dpi)
+        else:
+            recorte = processar_qr_code(img, qr, matriz, dpi)
         if recorte:
-            nome_qr = sanitize_filename(qr['conteudo'])
-            novo_nome = converter_nome_qr(nome_qr)
-            criar_pasta_e_salvar(pasta_saida, novo_nome, recorte)
+            resultado['arquivos'].append(salvar_recorte_qr(pasta_saida, qr, recorte, sufixo_provisorio))
+    
+    return resultado
 
 
-def extrair_e_rotacionar_pagina_pdf(pdf_path, pagina, angulo, dpi=300):
+def salvar_recorte_qr(pasta_saida, qr, recorte, sufixo_provisorio=None):
     """
-    Extrai uma página do PDF e aplica rotação conforme ângulo calculado.
+    Salva o recorte de um QR code com o nome derivado do seu conteúdo.
     
     Args:
-        pdf_path (str): Caminho do arquivo PDF
-        pagina (int): Índice da página
-        angulo (float): Ângulo de rotação a ser aplicado
-        dpi (int): Resolução em DPI (default 300)
+        pasta_saida (str): Pasta de destino para os recortes
+        qr (dict): QR code detectado por read_qrcodes_from_image
+        recorte (PIL.Image): Recorte alinhado do QR code
+        sufixo_provisorio (str): Sufixo acrescentado ao nome, substituído depois
+                                 pelo nome definitivo (default None)
+        
+    Returns:
+        str: Caminho completo do arquivo salvo
+    """
+    nome_qr = sanitize_filename(qr['conteudo'])
+    novo_nome = converter_nome_qr(nome_qr)
+    # Nomes provisórios não são informados: quem renomeia informa o definitivo
+    return criar_pasta_e_salvar(pasta_saida, novo_nome + (sufixo_provisorio or ""), recorte,
+                                informar=sufixo_provisorio is None)
+
+
+def nome_definitivo(caminho, sufixo_provisorio):
+    """
+    Retorna o caminho de um arquivo salvo com sufixo provisório, sem o sufixo.
+    
+    Args:
+        caminho (str): Caminho do arquivo com o sufixo provisório
+        sufixo_provisorio (str): Sufixo usado ao salvar o arquivo
         
     Returns:
-        PIL.Image: Imagem da página extraída e rotacionada
+        str: Caminho com o nome definitivo do arquivo
     """
-    doc = fitz.open(pdf_path)
-    page = doc.load_page(pagina)
-    img = pdf_page_to_image(page, dpi)
-    img_rotacionada = img.rotate(angulo, expand=True)
-    return img_rotacionada
+    base, extensao = os.path.splitext(caminho)
+    return base[:-len(sufixo_provisorio)] + extensao
+
+
+def calcular_matriz_rotacao(largura, altura, angulo):
+    """
+    Calcula a transformação afim usada no alinhamento da página.
+    
+    Reproduz o cálculo de Image.rotate(angulo, expand=True) do Pillow. A matriz
+    leva um ponto da imagem rotacionada de volta à imagem original, o que
+    permite obter qualquer região da página rotacionada sem rotacioná-la inteira.
+    
+    Args:
+        largura (int): Largura da imagem original em pixels
+        altura (int): Altura da imagem original em pixels
+        angulo (float): Ângulo de rotação calculado pelos QR codes
+        
+    Returns:
+        tuple: (matriz, tamanho) com os coeficientes (a, b, c, d, e, f) da
+               transformação e o tamanho (largura, altura) da imagem rotacionada
+    """
+    rad = -math.radians(angulo % 360.0)
+    matriz = [
+        round(math.cos(rad), 15),
+        round(math.sin(rad), 15),
+        0.0,
+        round(-math.sin(rad), 15),
+        round(math.cos(rad), 15),
+        0.0
+    ]
+    
+    # Rotação em torno do centro da imagem original
+    centro_x, centro_y = largura / 2, altura / 2
+    matriz[2], matriz[5] = aplicar_matriz(matriz, -centro_x, -centro_y)
+    matriz[2] += centro_x
+    matriz[5] += centro_y
+    
+    # Expansão da tela para caber a imagem rotacionada inteira
+    cantos = [aplicar_matriz(matriz, x, y) for x, y in ((0, 0), (largura, 0), (largura, altura), (0, altura))]
+    nova_largura = math.ceil(max(x for x, _ in cantos)) - math.floor(min(x for x, _ in cantos))
+    nova_altura = math.ceil(max(y for _, y in cantos)) - math.floor(min(y for _, y in cantos))
+    matriz[2], matriz[5] = aplicar_matriz(matriz, -(nova_largura - largura) / 2, -(nova_altura - altura) / 2)
+    
+    return tuple(matriz), (nova_largura, nova_altura)
+
+
+def aplicar_matriz(matriz, x, y):
+    """
+    Aplica uma transformação afim (a, b, c, d, e, f) a um ponto.
+    
+    Args:
+        matriz (tuple): Coeficientes da transformação
+        x (float): Coordenada x do ponto
+        y (float): Coordenada y do ponto
+        
+    Returns:
+        tuple: Coordenadas (x, y) transformadas
+    """
+    a, b, c, d, e, f = matriz
+    return a * x + b * y + c, d * x + e * y + f
+
+
+def regiao_origem_da_caixa(matriz, caixa, largura, altura, margem=2):
+    """
+    Calcula a região da imagem original necessária para gerar uma caixa da imagem rotacionada.
+    
+    Args:
+        matriz (tuple): Transformação retornada por calcular_matriz_rotacao
+        caixa (tuple): Caixa (x0, y0, x1, y1) na imagem rotacionada
+        largura (int): Largura da imagem original em pixels
+        altura (int): Altura da imagem original em pixels
+        margem (int): Pixels extras em volta da região (default 2)
+        
+    Returns:
+        tuple: Região (x0, y0, x1, y1) na imagem original, limitada à página,
+               ou None se a caixa estiver totalmente fora da página
+    """
+    x0, y0, x1, y1 = caixa
+    cantos = [aplicar_matriz(matriz, x, y) for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))]
+    regiao = (
+        max(0, math.floor(min(x for x, _ in cantos)) - margem),
+        max(0, math.floor(min(y for _, y in cantos)) - margem),
+        min(largura, math.ceil(max(x for x, _ in cantos)) + margem),
+        min(altura, math.ceil(max(y for _, y in cantos)) + margem)
+    )
+    if regiao[0] >= regiao[2] or regiao[1] >= regiao[3]:
+        return None
+    return regiao
+
+
+def recortar_com_rotacao(janela, origem, matriz, caixa):
+    """
+    Gera o recorte de uma caixa da imagem rotacionada a partir de uma janela da imagem original.
+    
+    O resultado coincide com rotacionar a página inteira e recortar a caixa (a
+    menos de arredondamentos pontuais da interpolação), mas só os pixels da
+    caixa são calculados e apenas a região correspondente da janela é lida.
+    
+    Args:
+        janela (PIL.Image): Região da imagem original que contém a caixa
+        origem (tuple): Posição (x, y) da janela na imagem original
+        matriz (tuple): Transformação retornada por calcular_matriz_rotacao
+        caixa (tuple): Caixa (x0, y0, x1, y1) na imagem rotacionada
+        
+    Returns:
+        PIL.Image: Recorte alinhado da caixa
+    """
+    a, b, c, d, e, f = matriz
+    x0, y0, x1, y1 = caixa
+    # Desloca a transformação para a origem da caixa e para a origem da janela
+    matriz_caixa = (
+        a, b, a * x0 + b * y0 + c - origem[0],
+        d, e, d * x0 + e * y0 + f - origem[1]
+    )
+    with medir_etapa('recorte') as etapa:
+        recorte = janela.transform((x1 - x0, y1 - y0), Image.AFFINE, matriz_caixa, resample=Image.NEAREST)
+        if etapa.ativa:
+            etapa.bytes = tamanho_imagem(recorte)
+    return recorte
+
+
+def renderizar_recorte(page, qr_info, matriz, dpi=300, cinza=False):
+    """
+    Gera o recorte alinhado de um QR code renderizando apenas a região da página que ele usa.
+    
+    Args:
+        page (fitz.Page): Página do PDF já carregada
+        qr_info (dict): Informações do QR code, com os cantos na escala do DPI informado
+        matriz (tuple): Transformação retornada por calcular_matriz_rotacao
+        dpi (int): Resolução em DPI do recorte (default 300)
+        cinza (bool): Renderiza o recorte em tons de cinza (default False)
+        
+    Returns:
+        PIL.Image: Recorte alinhado da área do time
+    """
+    caixa = calcular_caixa_recorte(qr_info, dpi)
+    largura, altura = tamanho_pagina_renderizada(page, dpi)
+    regiao = regiao_origem_da_caixa(matriz, caixa, largura, altura)
+    if regiao is None:
+        # Caixa fora da página: o recorte da página rotacionada seria todo preto
+        return Image.new("L" if cinza else "RGB", (caixa[2] - caixa[0], caixa[3] - caixa[1]))
+    janela = pdf_page_to_image(page, dpi, cinza=cinza, clip=regiao)
+    return recortar_com_rotacao(janela, regiao[:2], matriz, caixa)
+
+
+def processar_pagina_em_dois_estagios(page, pasta_saida, dpi=300, dpi_deteccao=100, cinza=False, limiar_qr=None,
+                                      sufixo_provisorio=None):
+    """
+    Processa a página localizando os QR codes em baixa resolução e renderizando em
+    alta resolução apenas as regiões dos recortes.
+    
+    Args:
+        page (fitz.Page): Página do PDF já carregada
+        pasta_saida (str): Pasta de destino para os recortes
+        dpi (int): Resolução em DPI dos recortes (default 300)
+        dpi_deteccao (int): Resolução em DPI da busca pelos QR codes (default 100)
+        cinza (bool): Renderiza os recortes em tons de cinza; a busca é sempre em
+                      tons de cinza (default False)
+        limiar_qr (int): Limiar de binarização para a leitura dos QR codes (default None)
+        sufixo_provisorio (str): Sufixo provisório dos nomes dos recortes (default None)
+        
+    Returns:
+        dict: Mesmo resultado de processar_pagina_e_alinhar, ou None se a
+              renderização reduzida não encontrar dois QR codes
+    """
+    img_reduzida = pdf_page_to_image(page, dpi_deteccao, cinza=True)
+    qrcodes = read_qrcodes_from_image(img_reduzida, max_qrcodes=2, limiar=limiar_qr)
+    if len(qrcodes) < 2:
+        return None
+    
+    # Leva os cantos dos QR codes para a escala dos recortes
+    escala = dpi / dpi_deteccao
+    for qr in qrcodes:
+        qr['cantos'] = [(x * escala, y * escala) for x, y in qr['cantos']]
+    
+    with medir_etapa('alinhamento'):
+        p1 = calcular_centro_qr(qrcodes[0]['cantos'])
+        p2 = calcular_centro_qr(qrcodes[1]['cantos'])
+        angulo = calcular_angulo_entre_pontos(p1, p2)
+        largura, altura = tamanho_pagina_renderizada(page, dpi)
+        matriz, _ = calcular_matriz_rotacao(largura, altura, angulo)
+    
+    resultado = {
+        'total_qr': len(qrcodes),
+        'prefixo_sequencial': None,
+        'imagem': None,
+        'arquivos': []
+    }
+    for qr in qrcodes:
+        recorte = renderizar_recorte(page, qr, matriz, dpi, cinza)
+        resultado['arquivos'].append(salvar_recorte_qr(pasta_saida, qr, recorte, sufixo_provisorio))
+    
+    return resultado
 
 
 def base36_to_base10_padded(s, length=8):
@@ -308,72 +803,1147 @@ def converter_nome_qr(nome_qr):
     return f"{parte1_decimal}_{parte2_decimal}"
 
 
-def processar_pdf_completo(pdf_path, pasta_saida, dpi=300):
+def calcular_hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+    
+    Args:
+        caminho (str): Caminho do arquivo
+        tamanho_bloco (int): Quantidade de bytes lida por vez (default 1 MB)
+        
+    Returns:
+        str: Hash em hexadecimal
+    """
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def carregar_manifesto(pasta_saida):
+    """
+    Carrega o manifesto de arquivos processados da pasta de saída.
+    
+    Args:
+        pasta_saida (str): Pasta de destino dos recortes, onde fica o manifesto
+        
+    Returns:
+        dict: Manifesto com a chave 'arquivos' (um registro por PDF de entrada);
+              um manifesto vazio se o arquivo não existir ou estiver inválido
+    """
+    caminho = os.path.join(pasta_saida, NOME_MANIFESTO)
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            manifesto = json.load(arquivo)
+        if manifesto.get('versao') == VERSAO_MANIFESTO:
+            return manifesto
+        print("Manifesto em versão diferente, será recriado.")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Manifesto inválido, será recriado: {e}")
+    return {'versao': VERSAO_MANIFESTO, 'arquivos': {}}
+
+
+def salvar_manifesto(pasta_saida, manifesto):
+    """
+    Grava o manifesto na pasta de saída de forma atômica.
+    
+    Args:
+        pasta_saida (str): Pasta de destino dos recortes
+        manifesto (dict): Manifesto a ser gravado
+    """
+    caminho = os.path.join(pasta_saida, NOME_MANIFESTO)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=1)
+    os.replace(temporario, caminho)
+
+
+def obter_registro_manifesto(manifesto, pdf_path):
+    """
+    Obtém o registro de um PDF no manifesto, reiniciando-o se o arquivo mudou.
+    
+    Tamanho e data de modificação iguais aos registrados bastam para considerar
+    o arquivo inalterado, sem ler o conteúdo. Se algum deles mudou, o hash do
+    conteúdo decide: igual mantém o progresso, diferente reinicia o registro.
+    
+    Args:
+        manifesto (dict): Manifesto carregado por carregar_manifesto
+        pdf_path (str): Caminho do arquivo PDF
+        
+    Returns:
+        dict: Registro do PDF (alterado diretamente dentro do manifesto) com
+              'tamanho', 'mtime_ns', 'sha256', 'total_paginas',
+              'paginas_concluidas', 'contador_sem_qr' e 'saidas'
+    """
+    arquivo = os.path.basename(pdf_path)
+    info = os.stat(pdf_path)
+    registro = manifesto['arquivos'].get(arquivo)
+    if registro and registro['tamanho'] == info.st_size and registro['mtime_ns'] == info.st_mtime_ns:
+        return registro
+    
+    sha256 = calcular_hash_arquivo(pdf_path)
+    if registro and registro['sha256'] == sha256:
+        # Mesmo conteúdo (arquivo copiado ou apenas tocado): mantém o progresso
+        registro['tamanho'] = info.st_size
+        registro['mtime_ns'] = info.st_mtime_ns
+        return registro
+    
+    registro = {
+        'tamanho': info.st_size,
+        'mtime_ns': info.st_mtime_ns,
+        'sha256': sha256,
+        'total_paginas': None,
+        'paginas_concluidas': 0,
+        'contador_sem_qr': 0,
+        'saidas': []
+    }
+    manifesto['arquivos'][arquivo] = registro
+    return registro
+
+
+def registro_concluido(registro):
+    """
+    Indica se todas as páginas de um PDF já foram processadas.
+    
+    Args:
+        registro (dict): Registro do PDF no manifesto
+        
+    Returns:
+        bool: True se o PDF está completo
+    """
+    return registro['total_paginas'] is not None and registro['paginas_concluidas'] >= registro['total_paginas']
+
+
+def registrar_pagina_manifesto(registro, pasta_saida, arquivos, contador_paginas_sem_qr):
+    """
+    Registra no manifesto a conclusão da próxima página de um PDF.
+    
+    Args:
+        registro (dict): Registro do PDF no manifesto
+        pasta_saida (str): Pasta de destino dos recortes
+        arquivos (list): Caminhos dos arquivos gravados para a página
+        contador_paginas_sem_qr (int): Valor do contador de nomes sequenciais após a página
+    """
+    registro['paginas_concluidas'] += 1
+    registro['contador_sem_qr'] = contador_paginas_sem_qr
+    registro['saidas'].extend(os.path.relpath(caminho, pasta_saida) for caminho in arquivos)
+
+
+def _confirmar_progresso(pasta_saida, manifesto, registro, confirmado):
+    """
+    Espera as gravações pendentes e grava o manifesto com o progresso do PDF.
+    
+    Se alguma gravação falhou, o registro volta ao último progresso confirmado
+    antes de o manifesto ser gravado, e o erro é repassado.
+    
+    Args:
+        pasta_saida (str): Pasta de destino dos recortes
+        manifesto (dict): Manifesto de arquivos processados
+        registro (dict): Registro do PDF no manifesto
+        confirmado (dict): Cópia do registro na última confirmação
+        
+    Returns:
+        dict: Cópia do registro agora confirmado
+    """
+    try:
+        aguardar_gravacoes()
+    except Exception:
+        registro.clear()
+        registro.update(copy.deepcopy(confirmado))
+        salvar_manifesto(pasta_saida, manifesto)
+        raise
+    salvar_manifesto(pasta_saida, manifesto)
+    return copy.deepcopy(registro)
+
+
+def processar_pdf_completo(pdf_path, pasta_saida, dpi=300, manifesto=None, **opcoes_pagina):
     """
     Processa todas as páginas de um arquivo PDF.
     
+    Com um manifesto, o processamento começa na primeira página ainda não
+    concluída e o progresso é gravado na pasta de saída durante a execução.
+    
     Args:
         pdf_path (str): Caminho do arquivo PDF
         pasta_saida (str): Pasta de destino para os recortes
         dpi (int): Resolução em DPI (default 300)
+        manifesto (dict): Manifesto de arquivos processados (default None = sem manifesto)
+        **opcoes_pagina: Opções repassadas a processar_pagina_e_alinhar
+                         (dpi_deteccao, usar_imagem_embutida, cinza, limiar_qr)
     """
-    global contador_paginas_sem_qr
-    contador_paginas_sem_qr = 0  # Reseta o contador para cada novo PDF
+    registro = obter_registro_manifesto(manifesto, pdf_path) if manifesto is not None else None
+    inicio = registro['paginas_concluidas'] if registro else 0
+    
+    # Contador das páginas salvas com nome sequencial, reiniciado a cada PDF
+    contador_paginas_sem_qr = registro['contador_sem_qr'] if registro else 0
+    # Último progresso com todas as imagens comprovadamente gravadas
+    confirmado = copy.deepcopy(registro)
     
     os.makedirs(pasta_saida, exist_ok=True)
-    doc = fitz.open(pdf_path)
-    n_paginas = len(doc)
-    for i in range(n_paginas):
-        print(f"Processando página {i+1}/{n_paginas}")
-        processar_pagina_e_alinhar(pdf_path, i, pasta_saida, dpi)
+    # O documento é aberto uma única vez e as páginas são repassadas já carregadas
+    with fitz.open(pdf_path) as doc:
+        n_paginas = len(doc)
+        if registro:
+            registro['total_paginas'] = n_paginas
+        if inicio:
+            print(f"Retomando a partir da página {inicio+1}/{n_paginas}")
+        try:
+            for i in range(inicio, n_paginas):
+                print(f"Processando página {i+1}/{n_paginas}")
+                if _perfil is not None:
+                    _perfil.iniciar_pagina(pdf_path, i)
+                resultado = processar_pagina_e_alinhar(doc.load_page(i), pasta_saida, dpi, **opcoes_pagina)
+                arquivos = resultado['arquivos']
+                if resultado['prefixo_sequencial']:
+                    contador_paginas_sem_qr += 1
+                    nome_arquivo = f"{resultado['prefixo_sequencial']}_{contador_paginas_sem_qr:04d}"
+                    arquivos = arquivos + [criar_pasta_e_salvar(pasta_saida, nome_arquivo, resultado['imagem'])]
+                if _perfil is not None:
+                    _perfil.finalizar_pagina(resultado['total_qr'])
+                if registro:
+                    registrar_pagina_manifesto(registro, pasta_saida, arquivos, contador_paginas_sem_qr)
+                    if (i + 1) % PAGINAS_POR_GRAVACAO_MANIFESTO == 0:
+                        confirmado = _confirmar_progresso(pasta_saida, manifesto, registro, confirmado)
+        finally:
+            # Erros de gravação em segundo plano aparecem aqui, atribuídos a este PDF
+            if registro:
+                _confirmar_progresso(pasta_saida, manifesto, registro, confirmado)
+            else:
+                aguardar_gravacoes()
 
 
-def processar_todos_pdfs(pasta_entrada, pasta_saida, dpi=300):
+def _abrir_documento_worker(pdf_path):
     """
-    Processa todos os arquivos PDF encontrados em uma pasta.
+    Abre o PDF no processo atual, reaproveitando o documento já aberto.
+    
+    Args:
+        pdf_path (str): Caminho do arquivo PDF
+        
+    Returns:
+        fitz.Document: Documento aberto
+    """
+    global _documento_worker
+    if _documento_worker is None or _documento_worker.name != pdf_path:
+        if _documento_worker is not None:
+            _documento_worker.close()
+        _documento_worker = fitz.open(pdf_path)
+    return _documento_worker
+
+
+def _iniciar_worker(threads_gravacao, perfil=False):
+    """
+    Prepara um processo do pool, ativando a gravação em segundo plano.
+    
+    Args:
+        threads_gravacao (int): Threads de gravação do processo (0 = síncrona)
+        perfil (bool): Ativa a instrumentação das etapas no processo (default False)
+    """
+    if threads_gravacao:
+        GravadorEmSegundoPlano(threads_gravacao).iniciar()
+    if perfil:
+        PerfilExecucao().ativar()
+
+
+def _processar_paginas_worker(pdf_path, paginas, pasta_saida, dpi, id_arquivo, opcoes_pagina):
+    """
+    Processa um bloco de páginas de um PDF dentro de um processo do pool.
+    
+    Todos os arquivos são salvos com um nome provisório, único por página; o
+    nome definitivo (sequencial ou do QR code) é atribuído pelo processo
+    principal, na ordem do documento.
+    
+    Args:
+        pdf_path (str): Caminho do arquivo PDF
+        paginas (list): Índices das páginas a serem processadas
+        pasta_saida (str): Pasta de destino para os recortes
+        dpi (int): Resolução em DPI
+        id_arquivo (int): Posição do PDF no lote, usada no nome provisório
+        opcoes_pagina (dict): Opções repassadas a processar_pagina_e_alinhar
+        
+    Returns:
+        list: Um dicionário por página com 'pagina', 'prefixo_sequencial',
+              'arquivo_provisorio', 'recortes_provisorios', 'arquivos' (nomes
+              definitivos dos recortes), 'erro' (None se não houver) e
+              'perfil' (medições da página, se a instrumentação estiver ativa)
+    """
+    doc = _abrir_documento_worker(pdf_path)
+    resultados = []
+    for pagina in paginas:
+        item = {
+            'pagina': pagina,
+            'prefixo_sequencial': None,
+            'arquivo_provisorio': None,
+            'recortes_provisorios': [],
+            'arquivos': [],
+            'erro': None,
+            'perfil': None
+        }
+        if _perfil is not None:
+            item['perfil'] = _perfil.iniciar_pagina(pdf_path, pagina)
+        sufixo = f"_parcial_{id_arquivo:04d}_{pagina:05d}"
+        try:
+            resultado = processar_pagina_e_alinhar(doc.load_page(pagina), pasta_saida, dpi, sufixo_provisorio=sufixo,
+                                                   **opcoes_pagina)
+            item['recortes_provisorios'] = resultado['arquivos']
+            item['arquivos'] = [nome_definitivo(caminho, sufixo) for caminho in resultado['arquivos']]
+            if resultado['prefixo_sequencial']:
+                item['prefixo_sequencial'] = resultado['prefixo_sequencial']
+                nome_provisorio = resultado['prefixo_sequencial'] + sufixo
+                item['arquivo_provisorio'] = criar_pasta_e_salvar(pasta_saida, nome_provisorio, resultado['imagem'],
+                                                                  informar=False)
+            if _perfil is not None:
+                _perfil.finalizar_pagina(resultado['total_qr'])
+        except Exception as e:
+            item['erro'] = str(e)
+        resultados.append(item)
+    # O processo principal renomeia os arquivos provisórios: tudo precisa estar gravado
+    aguardar_gravacoes()
+    if _perfil is not None:
+        # As medições seguem no resultado; o processo não precisa guardá-las
+        _perfil.paginas.clear()
+    return resultados
+
+
+def _finalizar_pdf_paralelo(arquivo, paginas, pasta_saida, registro=None):
+    """
+    Atribui os nomes definitivos aos arquivos de um PDF processado em paralelo.
+    
+    As páginas são percorridas na ordem do documento e os arquivos provisórios
+    renomeados nessa ordem, de modo que recortes com o mesmo nome (na mesma
+    página, em outra página ou em outro PDF) se sobrescrevem como no
+    processamento sequencial. Se alguma página falhou, os arquivos provisórios
+    das páginas seguintes são descartados, como aconteceria no modo
+    sequencial, e o erro é informado.
+    
+    Args:
+        arquivo (str): Nome do arquivo PDF
+        paginas (list): Resultados de _processar_paginas_worker ordenados por página
+        pasta_saida (str): Pasta de destino para os recortes
+        registro (dict): Registro do PDF no manifesto, atualizado a cada página (default None)
+    """
+    contador_paginas_sem_qr = registro['contador_sem_qr'] if registro else 0
+    erro = None
+    for item in paginas:
+        if erro is not None or item['erro'] is not None:
+            erro = erro or item['erro']
+            # Remove o que o modo sequencial não teria chegado a gravar: só os
+            # arquivos provisórios, que nunca coincidem com arquivos definitivos
+            for caminho in item['recortes_provisorios'] + [item['arquivo_provisorio']]:
+                if caminho and os.path.exists(caminho):
+                    os.remove(caminho)
+            continue
+        arquivos = item['arquivos']
+        for provisorio, destino in zip(item['recortes_provisorios'], arquivos):
+            os.replace(provisorio, destino)
+            print(f"Salvando em: {destino}")
+        if item['prefixo_sequencial']:
+            contador_paginas_sem_qr += 1
+            nome_arquivo = f"{item['prefixo_sequencial']}_{contador_paginas_sem_qr:04d}"
+            destino = os.path.join(os.path.dirname(item['arquivo_provisorio']), f"{nome_arquivo}.jpg")
+            os.replace(item['arquivo_provisorio'], destino)
+            print(f"Salvando em: {destino}")
+            arquivos = arquivos + [destino]
+        if registro:
+            registrar_pagina_manifesto(registro, pasta_saida, arquivos, contador_paginas_sem_qr)
+    if erro is not None:
+        print(f"Erro ao processar {arquivo}: {erro}")
+
+
+def processar_todos_pdfs_paralelo(pasta_entrada, pasta_saida, dpi=300, processos=None, paginas_por_tarefa=4,
+                                  usar_manifesto=True, threads_gravacao=4, **opcoes_pagina):
+    """
+    Processa todos os arquivos PDF de uma pasta distribuindo as páginas em um pool de processos.
+    
+    Produz os mesmos nomes de arquivo e a mesma estrutura de pastas do
+    processamento sequencial: os nomes sequenciais são atribuídos na ordem dos
+    PDFs e das páginas assim que cada PDF termina.
     
     Args:
         pasta_entrada (str): Pasta contendo os PDFs a serem processados
         pasta_saida (str): Pasta de destino para os recortes
         dpi (int): Resolução em DPI (default 300)
+        processos (int): Número de processos (default None = todos os núcleos)
+        paginas_por_tarefa (int): Páginas enviadas a cada tarefa do pool (default 4)
+        usar_manifesto (bool): Ignora PDFs inalterados e retoma os incompletos (default True)
+        threads_gravacao (int): Threads de gravação em segundo plano por processo (default 4, 0 = síncrona)
+        **opcoes_pagina: Opções repassadas a processar_pagina_e_alinhar
     """
     os.makedirs(pasta_saida, exist_ok=True)
+    arquivos = [arquivo for arquivo in os.listdir(pasta_entrada) if arquivo.lower().endswith('.pdf')]
+    manifesto = carregar_manifesto(pasta_saida) if usar_manifesto else None
+    ignorados = 0
     
-    for arquivo in os.listdir(pasta_entrada):
-        if arquivo.lower().endswith('.pdf'):
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_worker,
+                             initargs=(threads_gravacao, _perfil is not None)) as executor:
+        pendentes = {}  # futuro -> (índice do arquivo, páginas do bloco)
+        lotes = []      # por arquivo: nome, total de páginas, resultados e tarefas restantes
+        
+        for id_arquivo, arquivo in enumerate(arquivos):
             pdf_path = os.path.join(pasta_entrada, arquivo)
-            print(f"\nProcessando arquivo: {arquivo}")
             try:
-                processar_pdf_completo(pdf_path, pasta_saida, dpi)
+                registro = obter_registro_manifesto(manifesto, pdf_path) if manifesto is not None else None
+                if registro and registro_concluido(registro):
+                    ignorados += 1
+                    lotes.append(None)
+                    continue
+                print(f"\nProcessando arquivo: {arquivo}")
+                with fitz.open(pdf_path) as doc:
+                    n_paginas = len(doc)
             except Exception as e:
                 print(f"Erro ao processar {arquivo}: {str(e)}")
+                lotes.append(None)
+                continue
+            
+            inicio = 0
+            if registro:
+                registro['total_paginas'] = n_paginas
+                inicio = registro['paginas_concluidas']
+                if inicio:
+                    print(f"Retomando a partir da página {inicio+1}/{n_paginas}")
+            blocos = [list(range(i, min(i + paginas_por_tarefa, n_paginas)))
+                      for i in range(inicio, n_paginas, paginas_por_tarefa)]
+            lotes.append({'arquivo': arquivo, 'n_paginas': n_paginas, 'paginas': [], 'restantes': len(blocos),
+                          'registro': registro})
+            for bloco in blocos:
+                futuro = executor.submit(_processar_paginas_worker, pdf_path, bloco, pasta_saida, dpi,
+                                         id_arquivo, opcoes_pagina)
+                pendentes[futuro] = (id_arquivo, bloco)
+        
+        # Os PDFs são finalizados na ordem do lote, para que sobrescritas de
+        # nomes sequenciais entre arquivos aconteçam como no modo sequencial
+        proximo = 0
+        
+        def finalizar_concluidos():
+            nonlocal proximo
+            while proximo < len(lotes) and (lotes[proximo] is None or lotes[proximo]['restantes'] == 0):
+                if lotes[proximo] is not None:
+                    lote = lotes[proximo]
+                    lote['paginas'].sort(key=lambda item: item['pagina'])
+                    _finalizar_pdf_paralelo(lote['arquivo'], lote['paginas'], pasta_saida, lote['registro'])
+                    if manifesto is not None:
+                        salvar_manifesto(pasta_saida, manifesto)
+                    lotes[proximo] = None
+                proximo += 1
+        
+        finalizar_concluidos()
+        for futuro in as_completed(pendentes):
+            id_arquivo, bloco = pendentes[futuro]
+            lote = lotes[id_arquivo]
+            try:
+                resultados = futuro.result()
+            except Exception as e:
+                # Falha do processo inteiro: todas as páginas do bloco ficam com erro
+                resultados = [{'pagina': pagina, 'prefixo_sequencial': None, 'arquivo_provisorio': None,
+                               'recortes_provisorios': [], 'arquivos': [], 'erro': str(e), 'perfil': None}
+                              for pagina in bloco]
+            for item in resultados:
+                lote['paginas'].append(item)
+                if _perfil is not None and item['perfil'] is not None:
+                    _perfil.incorporar(item['perfil'])
+                print(f"[{lote['arquivo']}] Página {item['pagina']+1}/{lote['n_paginas']} concluída")
+            lote['restantes'] -= 1
+            finalizar_concluidos()
+    
+    if manifesto is not None:
+        salvar_manifesto(pasta_saida, manifesto)
+    if ignorados:
+        print(f"\n{ignorados} arquivo(s) sem alterações ignorado(s).")
+    print("\nProcessamento de todos os PDFs concluído!")
+
+
+def processar_todos_pdfs(pasta_entrada, pasta_saida, dpi=300, processos=1, usar_manifesto=True, threads_gravacao=4,
+                         relatorio_perfil=None, **opcoes_pagina):
+    """
+    Processa todos os arquivos PDF encontrados em uma pasta.
+    
+    Com o manifesto ativo, os PDFs inalterados desde a última execução são
+    ignorados e os processados parcialmente continuam da primeira página não
+    concluída. O manifesto fica na pasta de saída.
+    
+    Args:
+        pasta_entrada (str): Pasta contendo os PDFs a serem processados
+        pasta_saida (str): Pasta de destino para os recortes
+        dpi (int): Resolução em DPI (default 300)
+        processos (int): Número de processos; acima de 1 (ou None, para usar
+                         todos os núcleos) ativa o modo paralelo (default 1)
+        usar_manifesto (bool): Ignora PDFs inalterados e retoma os incompletos (default True)
+        threads_gravacao (int): Threads que codificam e gravam os JPEGs em segundo
+                                plano (default 4, 0 = gravação síncrona)
+        relatorio_perfil (str): Se informado, mede o tempo e os bytes de cada etapa
+                                por página e por arquivo, grava o relatório nesse
+                                caminho (.json ou .csv) e exibe um resumo ao final
+                                (default None = sem instrumentação)
+        **opcoes_pagina: Opções de cada página, repassadas a processar_pagina_e_alinhar:
+                         - dpi_deteccao: localiza os QR codes nesse DPI e renderiza no DPI
+                           completo só as regiões dos recortes (default None)
+                         - usar_imagem_embutida: em páginas digitalizadas, recorta a partir
+                           da imagem original em vez de renderizar (default True)
+                         - cinza: grava os recortes em tons de cinza (default False)
+                         - limiar_qr: limiar da versão binarizada usada na leitura dos
+                           QR codes (default None = sem binarização)
+    """
+    perfil = PerfilExecucao().ativar() if relatorio_perfil else None
+    try:
+        if processos is None or processos > 1:
+            processar_todos_pdfs_paralelo(pasta_entrada, pasta_saida, dpi, processos, usar_manifesto=usar_manifesto,
+                                          threads_gravacao=threads_gravacao, **opcoes_pagina)
+        else:
+            _processar_todos_pdfs_sequencial(pasta_entrada, pasta_saida, dpi, usar_manifesto, threads_gravacao,
+                                             **opcoes_pagina)
+    finally:
+        if perfil is not None:
+            perfil.desativar()
+            perfil.salvar(relatorio_perfil)
+            perfil.imprimir_resumo()
+            print(f"Relatório de perfil salvo em: {relatorio_perfil}")
+
+
+def _processar_todos_pdfs_sequencial(pasta_entrada, pasta_saida, dpi, usar_manifesto, threads_gravacao,
+                                     **opcoes_pagina):
+    """
+    Processa os PDFs de uma pasta um de cada vez, no processo atual.
     
+    Args:
+        pasta_entrada (str): Pasta contendo os PDFs a serem processados
+        pasta_saida (str): Pasta de destino para os recortes
+        dpi (int): Resolução em DPI
+        usar_manifesto (bool): Ignora PDFs inalterados e retoma os incompletos
+        threads_gravacao (int): Threads de gravação em segundo plano (0 = síncrona)
+        **opcoes_pagina: Opções repassadas a processar_pagina_e_alinhar
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    manifesto = carregar_manifesto(pasta_saida) if usar_manifesto else None
+    ignorados = 0
+    
+    with GravadorEmSegundoPlano(threads_gravacao):
+        for arquivo in os.listdir(pasta_entrada):
+            if arquivo.lower().endswith('.pdf'):
+                pdf_path = os.path.join(pasta_entrada, arquivo)
+                try:
+                    if manifesto is not None and registro_concluido(obter_registro_manifesto(manifesto, pdf_path)):
+                        ignorados += 1
+                        continue
+                    print(f"\nProcessando arquivo: {arquivo}")
+                    processar_pdf_completo(pdf_path, pasta_saida, dpi, manifesto, **opcoes_pagina)
+                except Exception as e:
+                    print(f"Erro ao processar {arquivo}: {str(e)}")
+    
+    if manifesto is not None:
+        salvar_manifesto(pasta_saida, manifesto)
+    if ignorados:
+        print(f"\n{ignorados} arquivo(s) sem alterações ignorado(s).")
     print("\nProcessamento de todos os PDFs concluído!")
 
 
-def criar_pasta_e_salvar(pasta_saida, nome_arquivo, imagem, quality=95):
+def _listar_pdfs(pasta):
+    """
+    Lista os nomes dos arquivos PDF de uma pasta.
+    
+    Args:
+        pasta (str): Pasta a ser listada
+        
+    Returns:
+        list: Nomes dos arquivos PDF
+    """
+    return [entrada.name for entrada in os.scandir(pasta)
+            if entrada.is_file() and entrada.name.lower().endswith('.pdf')]
+
+
+def _criar_observador_inotify(pasta):
+    """
+    Cria um observador inotify para a pasta, se disponível.
+    
+    Args:
+        pasta (str): Pasta a ser observada
+        
+    Returns:
+        INotify: Observador configurado, ou None para usar a varredura periódica
+    """
+    if INotify is None:
+        return None
+    try:
+        observador = INotify()
+        # ATTRIB: mudança só da data de modificação (ex.: arquivo tocado para reprocessar)
+        observador.add_watch(pasta, inotify_flags.CREATE | inotify_flags.MODIFY | inotify_flags.ATTRIB |
+                             inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+        return observador
+    except OSError:
+        return None
+
+
+def monitorar_pasta(pasta_entrada, pasta_saida, dpi=300, intervalo=1.0, tempo_estavel=2.0, threads_gravacao=4,
+                    **opcoes_pagina):
+    """
+    Monitora continuamente a pasta de entrada e processa cada PDF novo assim que ele termina de ser gravado.
+    
+    Usa inotify no Linux (pacote inotify_simple) e, na falta dele, varre a pasta
+    periodicamente. Um arquivo é considerado pronto quando tamanho e data de
+    modificação ficam inalterados por tempo_estavel segundos. Cada PDF passa por
+    processar_pdf_completo no mesmo processo, que mantém fitz e pyzbar carregados
+    entre um arquivo e outro, e o manifesto evita reprocessar arquivos já concluídos.
+    Um PDF cujo processamento falhou é tentado de novo (a partir da última página
+    confirmada) na próxima vez que tamanho ou data de modificação mudarem e
+    voltarem a ficar estáveis. Encerra com Ctrl+C.
+    
+    Args:
+        pasta_entrada (str): Pasta monitorada
+        pasta_saida (str): Pasta de destino para os recortes
+        dpi (int): Resolução em DPI (default 300)
+        intervalo (float): Segundos entre verificações (default 1.0)
+        tempo_estavel (float): Segundos sem alteração para considerar o arquivo completo (default 2.0)
+        threads_gravacao (int): Threads de gravação em segundo plano (default 4, 0 = síncrona)
+        **opcoes_pagina: Opções repassadas a processar_pagina_e_alinhar (ver processar_todos_pdfs)
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    manifesto = carregar_manifesto(pasta_saida)
+    observador = _criar_observador_inotify(pasta_entrada)
+    modo = "inotify" if observador else "varredura periódica"
+    print(f"Monitorando {pasta_entrada} ({modo}). Pressione Ctrl+C para encerrar.")
+    
+    candidatos = set(_listar_pdfs(pasta_entrada))
+    estados = {}      # nome -> (tamanho, mtime_ns, instante em que esse estado foi visto)
+    processados = {}  # nome -> (tamanho, mtime_ns) da versão processada com sucesso
+    falhas = {}       # nome -> (tamanho, mtime_ns) da versão cujo processamento falhou
+    gravador = GravadorEmSegundoPlano(threads_gravacao)
+    gravador.iniciar()
+    try:
+        while True:
+            if observador:
+                for evento in observador.read(timeout=int(intervalo * 1000)):
+                    if evento.name.lower().endswith('.pdf'):
+                        candidatos.add(evento.name)
+            else:
+                time.sleep(intervalo)
+                candidatos.update(_listar_pdfs(pasta_entrada))
+            
+            agora = time.monotonic()
+            for nome in sorted(candidatos):
+                pdf_path = os.path.join(pasta_entrada, nome)
+                try:
+                    info = os.stat(pdf_path)
+                except FileNotFoundError:
+                    candidatos.discard(nome)
+                    estados.pop(nome, None)
+                    continue
+                
+                estado = (info.st_size, info.st_mtime_ns)
+                if processados.get(nome) == estado or falhas.get(nome) == estado:
+                    # Já tratado; uma versão que falhou só volta quando o arquivo mudar
+                    candidatos.discard(nome)
+                    continue
+                if nome not in estados or estados[nome][:2] != estado:
+                    # Arquivo novo ou ainda sendo gravado: aguarda estabilizar
+                    estados[nome] = estado + (agora,)
+                    continue
+                if agora - estados[nome][2] < tempo_estavel:
+                    continue
+                
+                candidatos.discard(nome)
+                del estados[nome]
+                try:
+                    if not registro_concluido(obter_registro_manifesto(manifesto, pdf_path)):
+                        print(f"\nProcessando arquivo: {nome}")
+                        processar_pdf_completo(pdf_path, pasta_saida, dpi, manifesto, **opcoes_pagina)
+                        aguardar_gravacoes()
+                        print(f"Arquivo concluído: {nome}")
+                except Exception as e:
+                    print(f"Erro ao processar {nome}: {str(e)}")
+                    print(f"{nome} será processado de novo quando for alterado.")
+                    falhas[nome] = estado
+                    processados.pop(nome, None)
+                else:
+                    processados[nome] = estado
+                    falhas.pop(nome, None)
+    except KeyboardInterrupt:
+        print("\nMonitoramento encerrado.")
+    finally:
+        if observador:
+            observador.close()
+        gravador.encerrar()
+        salvar_manifesto(pasta_saida, manifesto)
+
+
+class PerfilExecucao:
+    """
+    Instrumentação das etapas do processamento, com medições por página e por arquivo.
+    
+    Enquanto o perfil está ativo, cada etapa medida com medir_etapa soma o tempo
+    de relógio e os bytes produzidos na página em andamento: imagem embutida,
+    renderização, leitura dos QR codes, alinhamento, recorte e gravação JPEG.
+    A gravação em segundo plano é atribuída à página que a enfileirou, e seu
+    tempo corre em paralelo com as páginas seguintes.
+    
+    Com o perfil inativo, medir_etapa devolve sempre o mesmo objeto vazio e o
+    custo da instrumentação se resume a uma comparação por etapa.
+    
+    Uso:
+        with PerfilExecucao() as perfil:
+            ...  # processamento das páginas
+        perfil.salvar("perfil.json")
+        perfil.imprimir_resumo()
+    """
+    
+    ETAPAS = ('imagem_embutida', 'renderizacao', 'leitura_qr', 'alinhamento', 'recorte', 'gravacao_jpeg')
+    
+    def __init__(self):
+        self.paginas = []
+        self.tempo_total = None
+        self._pagina_atual = None
+        self._inicio_pagina = None
+        self._inicio = None
+        self._trava = threading.Lock()
+        self._anterior = None
+    
+    def ativar(self):
+        """Ativa o perfil para as medições seguintes e retorna o próprio perfil."""
+        global _perfil
+        self._anterior, _perfil = _perfil, self
+        self._inicio = time.perf_counter()
+        return self
+    
+    def desativar(self):
+        """Desativa o perfil e registra o tempo total da execução."""
+        global _perfil
+        _perfil = self._anterior
+        self.tempo_total = time.perf_counter() - self._inicio
+    
+    def __enter__(self):
+        return self.ativar()
+    
+    def __exit__(self, tipo, valor, rastreamento):
+        self.desativar()
+        return False
+    
+    def iniciar_pagina(self, pdf_path, pagina):
+        """
+        Inicia as medições de uma página.
+        
+        Args:
+            pdf_path (str): Caminho do arquivo PDF
+            pagina (int): Índice da página (a partir de 0)
+            
+        Returns:
+            dict: Registro da página, preenchido pelas medições seguintes
+        """
+        registro = {
+            'arquivo': os.path.basename(pdf_path),
+            'pagina': pagina + 1,
+            'total_qr': None,
+            'tempo': None,
+            'etapas': {}
+        }
+        self.paginas.append(registro)
+        self._pagina_atual = registro
+        self._inicio_pagina = time.perf_counter()
+        return registro
+    
+    def finalizar_pagina(self, total_qr):
+        """
+        Conclui a página em andamento.
+        
+        Args:
+            total_qr (int): Quantidade de QR codes detectados na página
+        """
+        self._pagina_atual['total_qr'] = total_qr
+        self._pagina_atual['tempo'] = time.perf_counter() - self._inicio_pagina
+    
+    def etapa(self, nome):
+        """Cria a medição de uma etapa atribuída à página em andamento."""
+        return _MedicaoEtapa(self, nome, self._pagina_atual)
+    
+    def registrar(self, registro, nome, tempo, n_bytes):
+        """
+        Soma uma medição a uma página (chamado também pelas threads de gravação).
+        
+        Args:
+            registro (dict): Registro da página (None = medição fora de uma página)
+            nome (str): Nome da etapa
+            tempo (float): Duração em segundos
+            n_bytes (int): Bytes produzidos pela etapa
+        """
+        if registro is None:
+            return
+        with self._trava:
+            etapa = registro['etapas'].setdefault(nome, {'tempo': 0.0, 'bytes': 0, 'chamadas': 0})
+            etapa['tempo'] += tempo
+            etapa['bytes'] += n_bytes
+            etapa['chamadas'] += 1
+    
+    def incorporar(self, registro):
+        """Acrescenta uma página medida em outro processo."""
+        self.paginas.append(registro)
+    
+    def resumo(self):
+        """
+        Consolida as medições.
+        
+        Returns:
+            dict: Totais por etapa e por arquivo, páginas por quantidade de
+                  QR codes ('0', '1', '2' e 'erro'), tempo total e pico de memória
+        """
+        resumo = {
+            'tempo_total': self.tempo_total,
+            'paginas': len(self.paginas),
+            'paginas_por_qr': {'0': 0, '1': 0, '2': 0, 'erro': 0},
+            'etapas': {},
+            'arquivos': {},
+            'pico_memoria_mb': pico_memoria_mb()
+        }
+        for registro in self.paginas:
+            total_qr = registro['total_qr']
+            resumo['paginas_por_qr']['erro' if total_qr is None else str(min(total_qr, 2))] += 1
+            
+            arquivo = resumo['arquivos'].setdefault(registro['arquivo'], {'paginas': 0, 'tempo': 0.0, 'etapas': {}})
+            arquivo['paginas'] += 1
+            arquivo['tempo'] += registro['tempo'] or 0.0
+            for nome, medicao in registro['etapas'].items():
+                for destino in (resumo['etapas'], arquivo['etapas']):
+                    total = destino.setdefault(nome, {'tempo': 0.0, 'bytes': 0, 'chamadas': 0})
+                    for chave in total:
+                        total[chave] += medicao[chave]
+        return resumo
+    
+    def salvar(self, caminho):
+        """
+        Grava o relatório de perfil.
+        
+        Em .csv, cada linha é uma página com o tempo e os bytes de cada etapa;
+        nos demais casos é gravado um JSON com o resumo e as páginas.
+        
+        Args:
+            caminho (str): Caminho do relatório
+        """
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        # No modo paralelo as páginas chegam fora de ordem
+        paginas = sorted(self.paginas, key=lambda registro: (registro['arquivo'], registro['pagina']))
+        if caminho.lower().endswith('.csv'):
+            colunas = ['arquivo', 'pagina', 'total_qr', 'tempo']
+            for nome in self.ETAPAS:
+                colunas += [f"tempo_{nome}", f"bytes_{nome}"]
+            with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+                escritor = csv.writer(arquivo, delimiter=';')
+                escritor.writerow(colunas)
+                for registro in paginas:
+                    linha = [registro['arquivo'], registro['pagina'], registro['total_qr'], registro['tempo']]
+                    for nome in self.ETAPAS:
+                        medicao = registro['etapas'].get(nome, {'tempo': 0.0, 'bytes': 0})
+                        linha += [medicao['tempo'], medicao['bytes']]
+                    escritor.writerow(linha)
+        else:
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                json.dump({'resumo': self.resumo(), 'paginas': paginas}, arquivo, indent=2)
+    
+    def imprimir_resumo(self):
+        """Exibe uma tabela com o tempo e os bytes de cada etapa e os totais por arquivo."""
+        resumo = self.resumo()
+        paginas = resumo['paginas'] or 1
+        
+        print("\nPerfil de execução")
+        print(f"{'Etapa':<18}{'Chamadas':>10}{'Tempo (s)':>12}{'ms/página':>12}{'MB':>12}")
+        print("-" * 64)
+        for nome in self.ETAPAS:
+            medicao = resumo['etapas'].get(nome)
+            if medicao is None:
+                continue
+            print(f"{nome:<18}{medicao['chamadas']:>10}{medicao['tempo']:>12.2f}"
+                  f"{medicao['tempo'] / paginas * 1000:>12.1f}{medicao['bytes'] / (1024 * 1024):>12.1f}")
+        
+        print(f"\n{'Arquivo':<40}{'Páginas':>10}{'Tempo (s)':>12}")
+        print("-" * 62)
+        for nome, arquivo in resumo['arquivos'].items():
+            print(f"{nome:<40}{arquivo['paginas']:>10}{arquivo['tempo']:>12.2f}")
+        
+        por_qr = resumo['paginas_por_qr']
+        print(f"\nPáginas: {resumo['paginas']} (sem QR: {por_qr['0']}, um QR: {por_qr['1']}, "
+              f"dois QR: {por_qr['2']}, com erro: {por_qr['erro']})")
+        if resumo['tempo_total']:
+            print(f"Tempo total: {resumo['tempo_total']:.2f} s ({resumo['paginas'] / resumo['tempo_total']:.2f} páginas/s)")
+        if resumo['pico_memoria_mb'] is not None:
+            print(f"Pico de memória: {resumo['pico_memoria_mb']:.1f} MB")
+
+
+class _MedicaoEtapa:
+    """Mede a duração de uma etapa; os bytes produzidos são informados em 'bytes'."""
+    
+    ativa = True
+    
+    def __init__(self, perfil, nome, registro):
+        self.bytes = 0
+        self._perfil = perfil
+        self._nome = nome
+        self._registro = registro
+        self._inicio = None
+    
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+    
+    def __exit__(self, tipo, valor, rastreamento):
+        self._perfil.registrar(self._registro, self._nome, time.perf_counter() - self._inicio, self.bytes)
+        return False
+
+
+class _EtapaNula:
+    """Medição usada com a instrumentação desligada: não faz nada."""
+    
+    ativa = False
+    bytes = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, tipo, valor, rastreamento):
+        return False
+
+
+_ETAPA_NULA = _EtapaNula()
+
+
+def medir_etapa(nome):
+    """
+    Cria a medição de uma etapa do processamento, para uso com "with".
+    
+    Args:
+        nome (str): Nome da etapa (um dos PerfilExecucao.ETAPAS)
+        
+    Returns:
+        Medição da etapa, ou um objeto vazio se não houver perfil ativo
+    """
+    if _perfil is None:
+        return _ETAPA_NULA
+    return _perfil.etapa(nome)
+
+
+def tamanho_imagem(img):
+    """
+    Calcula o tamanho em bytes dos pixels de uma imagem.
+    
+    Args:
+        img (PIL.Image): Imagem
+        
+    Returns:
+        int: Largura x altura x número de canais
+    """
+    return img.width * img.height * len(img.getbands())
+
+
+def pico_memoria_mb():
+    """
+    Obtém o pico de memória residente do processo e dos processos filhos já encerrados.
+    
+    O pico é acumulado desde o início do processo.
+    
+    Returns:
+        float: Pico em MB, ou None se não houver como medir neste sistema
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows: pico do próprio processo, se o psutil estiver instalado
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    
+    pico = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss é informado em KB no Linux e em bytes no macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return pico / divisor
+
+
+class GravadorEmSegundoPlano:
+    """
+    Fila limitada de gravações de imagens executadas por um pool de threads.
+    
+    Enquanto o gravador está ativo, criar_pasta_e_salvar apenas enfileira a
+    imagem e retorna: a codificação JPEG e a escrita em disco ou na rede
+    acontecem enquanto as próximas páginas são renderizadas. Com a fila cheia,
+    quem grava espera uma vaga. Ao encerrar, inclusive por erro, todas as
+    gravações pendentes são concluídas.
+    
+    Uso:
+        with GravadorEmSegundoPlano(threads=4):
+            ...  # chamadas a criar_pasta_e_salvar
+    
+    Com threads=0 o gravador não faz nada e a gravação continua síncrona.
+    """
+    
+    def __init__(self, threads=4, tamanho_fila=8):
+        """
+        Args:
+            threads (int): Threads de gravação (default 4, 0 = gravação síncrona)
+            tamanho_fila (int): Máximo de imagens aguardando gravação (default 8)
+        """
+        self.threads = threads
+        self._vagas = threading.BoundedSemaphore(tamanho_fila)
+        self._pendentes = {}  # futuro -> caminho
+        self._trava = threading.Lock()
+        self._executor = None
+        self._anterior = None
+    
+    def iniciar(self):
+        """Ativa o gravador para as chamadas seguintes de criar_pasta_e_salvar."""
+        global _gravador
+        if self.threads:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads)
+            self._anterior, _gravador = _gravador, self
+    
+    def encerrar(self):
+        """Conclui todas as gravações pendentes e desativa o gravador."""
+        global _gravador
+        if self._executor is None:
+            return
+        _gravador = self._anterior
+        try:
+            self.aguardar()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def __enter__(self):
+        self.iniciar()
+        return self
+    
+    def __exit__(self, tipo, valor, rastreamento):
+        try:
+            self.encerrar()
+        except Exception:
+            if tipo is None:
+                raise
+            # Já há um erro em andamento: as falhas de gravação já foram informadas
+        return False
+    
+    def enfileirar(self, caminho, imagem, quality=95, etapa=None, informar=True):
+        """
+        Enfileira a gravação de uma imagem, esperando vaga se a fila estiver cheia.
+        
+        Args:
+            caminho (str): Caminho completo do arquivo JPEG
+            imagem (PIL.Image): Imagem a ser salva
+            quality (int): Qualidade JPEG (default 95)
+            etapa: Medição da gravação criada por medir_etapa (default None)
+            informar (bool): Informa o caminho depois de gravado (default True)
+        """
+        self._vagas.acquire()
+        try:
+            futuro = self._executor.submit(_gravar_imagem, caminho, imagem, quality, etapa, informar)
+        except Exception:
+            self._vagas.release()
+            raise
+        with self._trava:
+            self._pendentes[futuro] = caminho
+        futuro.add_done_callback(self._concluir)
+    
+    def _concluir(self, futuro):
+        """Libera a vaga da fila; gravações com erro ficam guardadas para aguardar()."""
+        self._vagas.release()
+        if futuro.exception() is None:
+            with self._trava:
+                self._pendentes.pop(futuro, None)
+    
+    def aguardar(self):
+        """
+        Espera todas as gravações enfileiradas até o momento.
+        
+        Cada gravação que falhou é informada com o seu caminho.
+        
+        Raises:
+            Exception: O primeiro erro ocorrido em alguma das gravações
+        """
+        with self._trava:
+            pendentes, self._pendentes = self._pendentes, {}
+        erro = None
+        for futuro, caminho in pendentes.items():
+            try:
+                futuro.result()
+            except Exception as e:
+                print(f"Erro ao gravar {caminho}: {e}")
+                erro = erro or e
+        if erro is not None:
+            raise erro
+
+
+def aguardar_gravacoes():
+    """
+    Espera as gravações em segundo plano pendentes, se houver um gravador ativo.
+    
+    As gravações que falharam são informadas uma a uma e o primeiro erro é
+    repassado a quem chamou.
+    """
+    if _gravador is not None:
+        _gravador.aguardar()
+
+
+def _gravar_imagem(caminho, imagem, quality=95, etapa=None, informar=True):
+    """
+    Codifica e grava a imagem em JPEG e informa o caminho depois de gravado.
+    
+    Args:
+        caminho (str): Caminho completo do arquivo
+        imagem (PIL.Image): Imagem a ser salva
+        quality (int): Qualidade JPEG (default 95)
+        etapa: Medição da gravação criada por medir_etapa; a gravação em segundo
+               plano a recebe pronta para ser atribuída à página que a
+               enfileirou (default None = medir aqui)
+        informar (bool): Informa o caminho depois de gravado (default True)
+    """
+    if etapa is None:
+        etapa = medir_etapa('gravacao_jpeg')
+    with etapa:
+        try:
+            imagem.save(caminho, "JPEG", quality=quality)
+        except FileNotFoundError:
+            # A subpasta foi removida depois de criada: recria e tenta de novo
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            imagem.save(caminho, "JPEG", quality=quality)
+        if etapa.ativa:
+            etapa.bytes = os.path.getsize(caminho)
+    if informar:
+        # Uma única escrita por linha: as threads de gravação imprimem ao mesmo tempo
+        print(f"Salvando em: {caminho}\n", end="")
+
+
+def criar_pasta_e_salvar(pasta_saida, nome_arquivo, imagem, quality=95, informar=True):
     """
     Cria subpastas organizadas e salva a imagem com qualidade especificada.
     
+    Com um GravadorEmSegundoPlano ativo, a gravação é apenas enfileirada.
+    
     Args:
         pasta_saida (str): Pasta base de destino
         nome_arquivo (str): Nome base do arquivo (sem extensão)
         imagem (PIL.Image): Imagem a ser salva
         quality (int): Qualidade JPEG (default 95)
+        informar (bool): Informa o caminho depois de gravado (default True)
+        
+    Returns:
+        str: Caminho completo do arquivo salvo
     """
     # Extrair o prefixo do nome do arquivo (antes do "_")
     prefixo = nome_arquivo.split('_')[0]
     
-    # Criar o caminho da subpasta
+    # Criar o caminho da subpasta (cada subpasta é criada uma única vez)
     subpasta = os.path.join(pasta_saida, prefixo)
-    os.makedirs(subpasta, exist_ok=True)
+    if subpasta not in _pastas_existentes:
+        os.makedirs(subpasta, exist_ok=True)
+        _pastas_existentes.add(subpasta)
     
     # Criar o caminho completo do arquivo
     arquivo_completo = os.path.join(subpasta, f"{nome_arquivo}.jpg")
     
     # Salvar a imagem
-    imagem.save(arquivo_completo, "JPEG", quality=quality)
-    print(f"Salvando em: {arquivo_completo}")
+    if _gravador is not None:
+        _gravador.enfileirar(arquivo_completo, imagem, quality, medir_etapa('gravacao_jpeg'), informar)
+    else:
+        _gravar_imagem(arquivo_completo, imagem, quality, informar=informar)
+    return arquivo_completo
 
 
 # Execução principal
@@ -381,5 +1951,19 @@ if __name__ == "__main__":
     # Configuração dos caminhos (ajustar conforme necessidade)
     PASTA_ENTRADA = r"C:\Users\rodrigo.zambianco\Desktop\TIME-QR"
     PASTA_SAIDA = r"C:\Users\rodrigo.zambianco\Desktop\TIME-QR\saida"
+    # Número de processos em paralelo (1 = sequencial, None = todos os núcleos)
+    NUM_PROCESSOS = 1
+    # DPI da busca dos QR codes em dois estágios (None = renderização única da página)
+    DPI_DETECCAO = None
+    # True grava os recortes em tons de cinza (menor); a leitura dos QR codes é sempre em cinza
+    CINZA = False
+    # Caminho do relatório de tempo por etapa (.json ou .csv; None = sem instrumentação)
+    RELATORIO_PERFIL = None
+    # True mantém o script rodando e processa cada PDF novo que chegar na pasta de entrada
+    MONITORAR = False
     
-    processar_todos_pdfs(PASTA_ENTRADA, PASTA_SAIDA, dpi=300)
\ No newline at end of file
+    if MONITORAR:
+        monitorar_pasta(PASTA_ENTRADA, PASTA_SAIDA, dpi=300, dpi_deteccao=DPI_DETECCAO, cinza=CINZA)
+    else:
+        processar_todos_pdfs(PASTA_ENTRADA, PASTA_SAIDA, dpi=300, processos=NUM_PROCESSOS, dpi_deteccao=DPI_DETECCAO,
+                             cinza=CINZA, relatorio_perfil=RELATORIO_PERFIL)
\ No newline at end of file
@@ -0,0 +1,866 @@
+"""
+TIME_dados.py - Acesso aos dados do time.xlsx com cache local
+
+Este módulo concentra a leitura das planilhas do arquivo time.xlsx usada pelos
+relatórios (TIME_pendente.py, TIME_relatorio_produtivo-pedido.py). Cada planilha
+lida é convertida para um cache colunar local (Parquet, ou pickle se o pyarrow
+não estiver disponível), com os tipos já definidos, e as próximas execuções
+leem o cache em vez de interpretar o Excel novamente.
+
+Funcionalidades principais:
+- Cache por planilha em uma pasta local, fora da unidade de rede
+- Esquema declarado de cada planilha (ESQUEMAS), validado uma única vez na
+  leitura do Excel (ou, na planilha 'Times', na ingestão de cada linha nova):
+  'Data Time' em datetime64, colunas de ID como categóricas,
+  'Ativo'/'Produtivo' como booleanos e 'Hora lançada' numérica
+- Invalidação automática quando o tamanho, a data de modificação ou o
+  conteúdo (hash) do arquivo de origem mudam
+- Leitura em blocos da planilha 'Times' (openpyxl read_only), apenas com as
+  colunas necessárias e com os filtros de período e ID aplicados durante a
+  leitura, com memória limitada pelo tamanho do bloco
+- Ingestão incremental da planilha 'Times': uma marca d'água (linhas já
+  ingeridas + checksum) permite gravar só as linhas novas e atualizar os
+  agregados (presentes por dia, horas por ID, rollup diário de horas);
+  linhas antigas alteradas provocam uma ingestão completa
+
+Uso:
+    from TIME_dados import carregar_planilhas, ler_planilha
+    df_times = ler_planilha(r"V:\\PCP\\TIME\\time.xlsx", 'Times')
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, date
+import pandas as pd
+
+# Pasta padrão do cache (local, para não depender da unidade de rede)
+PASTA_CACHE = os.path.join(os.path.expanduser("~"), ".cache_time")
+# Versão do formato do cache; ao mudar os tipos, os caches antigos são refeitos
+VERSAO_CACHE = 7
+
+# Esquema esperado de cada planilha: coluna -> tipo ('data', 'categoria', 'flag' ou 'numero').
+# As colunas listadas são obrigatórias; as demais são mantidas como o Excel as entregar.
+ESQUEMAS = {
+    'Pessoas': {'IDDV': 'categoria', 'Ativo': 'flag', 'Produtivo': 'flag'},
+    'Times': {'Data Time': 'data', 'IDProdutivo': 'categoria', 'PE/Equip': 'categoria', 'Hora lançada': 'numero'},
+}
+# Tipo de cada coluna conhecida, em qualquer planilha
+TIPOS_COLUNAS = {coluna: tipo for esquema in ESQUEMAS.values() for coluna, tipo in esquema.items()}
+COLUNAS_DATA = tuple(coluna for coluna, tipo in TIPOS_COLUNAS.items() if tipo == 'data')
+COLUNAS_CATEGORIA = tuple(coluna for coluna, tipo in TIPOS_COLUNAS.items() if tipo == 'categoria')
+# Colunas da planilha 'Times' usadas pelos relatórios
+COLUNAS_TIMES = ('Data Time', 'IDProdutivo', 'PE/Equip', 'Hora lançada')
+
+def calcular_hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+
+    Args:
+        caminho (str): Caminho do arquivo
+        tamanho_bloco (int, optional): Bytes lidos por vez. Defaults to 1 MB.
+
+    Returns:
+        str: Hash em hexadecimal
+    """
+    sha256 = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+def _caminhos_cache(file_path, pasta_cache):
+    """
+    Define os caminhos do cache de um arquivo Excel.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        pasta_cache (str): Pasta do cache
+
+    Returns:
+        tuple: (prefixo dos arquivos de cache, caminho dos metadados)
+    """
+    origem = os.path.abspath(file_path)
+    nome = os.path.splitext(os.path.basename(origem))[0]
+    # O mesmo nome de arquivo pode existir em pastas diferentes
+    chave = hashlib.sha1(origem.lower().encode('utf-8')).hexdigest()[:10]
+    prefixo = os.path.join(pasta_cache, f"{nome}_{chave}")
+    return prefixo, prefixo + ".json"
+
+def _nome_arquivo_planilha(prefixo, sheet_name, formato):
+    """Caminho do cache de uma planilha ('/' não é permitido em nomes de arquivo)."""
+    nome = "".join(c if c.isalnum() else "_" for c in sheet_name)
+    return f"{prefixo}_{nome}.{formato}"
+
+def _ler_metadados(caminho):
+    """
+    Lê os metadados do cache.
+
+    Args:
+        caminho (str): Caminho do JSON de metadados
+
+    Returns:
+        dict: Metadados, ou None se não existirem ou forem de outra versão
+    """
+    try:
+        with open(caminho, 'r', encoding='utf-8') as arquivo:
+            metadados = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    if metadados.get('versao') != VERSAO_CACHE:
+        return None
+    return metadados
+
+def _gravar_metadados(caminho, metadados):
+    """Grava os metadados de forma atômica (arquivo temporário + os.replace)."""
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(metadados, arquivo, indent=2)
+    os.replace(temporario, caminho)
+
+def _origem_inalterada(file_path, metadados):
+    """
+    Verifica se o arquivo de origem é o mesmo que gerou o cache.
+
+    Tamanho e data de modificação iguais bastam. Se algum deles mudou, o hash
+    decide: um arquivo apenas copiado ou regravado sem alterações mantém o cache
+    (e os metadados são atualizados com o novo tamanho/data).
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        metadados (dict): Metadados do cache
+
+    Returns:
+        bool: True se o cache continua válido
+    """
+    info = os.stat(file_path)
+    if info.st_size == metadados['tamanho'] and info.st_mtime_ns == metadados['mtime_ns']:
+        return True
+    if calcular_hash_arquivo(file_path) != metadados['sha256']:
+        return False
+    metadados['tamanho'] = info.st_size
+    metadados['mtime_ns'] = info.st_mtime_ns
+    return True
+
+def _metadados_validos(file_path, caminho_metadados):
+    """
+    Lê os metadados do cache, se ainda corresponderem ao arquivo de origem.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        caminho_metadados (str): Caminho do JSON de metadados
+
+    Returns:
+        dict: Metadados, ou None se não houver cache válido
+    """
+    metadados = _ler_metadados(caminho_metadados)
+    if metadados is None or not _origem_inalterada(file_path, metadados):
+        return None
+    return metadados
+
+def aplicar_tipos(df):
+    """
+    Padroniza nomes e tipos das colunas de uma planilha.
+
+    Args:
+        df (DataFrame): Planilha lida do Excel
+
+    Returns:
+        DataFrame: Mesma planilha com nomes sem espaços nas bordas e as colunas
+                   conhecidas (TIPOS_COLUNAS) convertidas: datas em datetime64,
+                   IDs como categóricas, flags como bool (1 = True) e números
+                   como float (valores inválidos viram NaT/NaN)
+    """
+    df.columns = df.columns.str.strip()
+    for coluna, tipo in TIPOS_COLUNAS.items():
+        if coluna not in df.columns:
+            continue
+        if tipo == 'data':
+            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+        elif tipo == 'categoria':
+            df[coluna] = df[coluna].astype('category')
+        elif tipo == 'flag':
+            df[coluna] = df[coluna].eq(1)
+        elif tipo == 'numero':
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+    return df
+
+def validar_esquema(df, sheet_name):
+    """
+    Confere uma planilha recém-lida do Excel com o esquema declarado em ESQUEMAS.
+
+    Chamada uma única vez por leitura do Excel; o cache gravado em seguida já
+    está no esquema e não é conferido de novo.
+
+    Args:
+        df (DataFrame): Planilha como veio do Excel (nomes de coluna já sem espaços)
+        sheet_name (str): Nome da planilha
+
+    Returns:
+        dict: Quantidade de valores que não puderam ser convertidos, por coluna
+              (datas e números inválidos viram NaT/NaN)
+
+    Raises:
+        ValueError: Se faltar alguma coluna obrigatória
+    """
+    esquema = ESQUEMAS.get(sheet_name, {})
+    faltando = [coluna for coluna in esquema if coluna not in df.columns]
+    if faltando:
+        raise ValueError(f"Planilha '{sheet_name}' sem as colunas esperadas: {faltando}")
+
+    invalidos = {}
+    for coluna, tipo in esquema.items():
+        if tipo == 'data':
+            convertidos = pd.to_datetime(df[coluna], errors='coerce')
+        elif tipo == 'numero':
+            convertidos = pd.to_numeric(df[coluna], errors='coerce')
+        else:
+            continue
+        quantidade = int((df[coluna].notna() & convertidos.isna()).sum())
+        if quantidade:
+            invalidos[coluna] = quantidade
+    return invalidos
+
+def valores_originais(serie):
+    """
+    Converte uma coluna categórica de volta ao tipo dos seus valores.
+
+    Útil em operações que não aceitam categóricas (ex.: agrupar em listas).
+
+    Args:
+        serie (pd.Series): Coluna, categórica ou não
+
+    Returns:
+        pd.Series: Coluna com o tipo das categorias (a própria coluna se não for categórica)
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(serie.cat.categories.dtype)
+    return serie
+
+def _preparar_planilha(df, sheet_name):
+    """
+    Valida e tipa uma planilha recém-lida do Excel.
+
+    Args:
+        df (DataFrame): Planilha como veio do Excel
+        sheet_name (str): Nome da planilha
+
+    Returns:
+        DataFrame: Planilha tipada por aplicar_tipos()
+    """
+    df.columns = df.columns.str.strip()
+    invalidos = validar_esquema(df, sheet_name)
+    if invalidos:
+        print(f"Aviso: valores inválidos na planilha '{sheet_name}' (ficarão vazios): {invalidos}")
+    return aplicar_tipos(df)
+
+def ler_planilhas_excel(file_path, sheet_names):
+    """
+    Lê várias planilhas do Excel, abrindo o arquivo uma única vez.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        sheet_names (list): Nomes das planilhas
+
+    Returns:
+        dict: DataFrame de cada planilha, validado e tipado (ver _preparar_planilha)
+    """
+    planilhas = pd.read_excel(file_path, sheet_name=list(sheet_names))
+    return {nome: _preparar_planilha(df, nome) for nome, df in planilhas.items()}
+
+def _gravar_planilha(df, prefixo, sheet_name):
+    """
+    Grava uma planilha no cache.
+
+    Usa Parquet quando o pyarrow está instalado e a planilha é compatível
+    (colunas de texto com tipos misturados não são); caso contrário, pickle.
+
+    Args:
+        df (DataFrame): Planilha já tipada
+        prefixo (str): Prefixo dos arquivos de cache
+        sheet_name (str): Nome da planilha
+
+    Returns:
+        str: Formato gravado ('parquet' ou 'pkl')
+    """
+    try:
+        caminho = _nome_arquivo_planilha(prefixo, sheet_name, 'parquet')
+        df.to_parquet(caminho + ".tmp", index=False)
+        os.replace(caminho + ".tmp", caminho)
+        return 'parquet'
+    except Exception:
+        caminho = _nome_arquivo_planilha(prefixo, sheet_name, 'pkl')
+        df.to_pickle(caminho + ".tmp")
+        os.replace(caminho + ".tmp", caminho)
+        return 'pkl'
+
+def _ler_planilha_cache(prefixo, sheet_name, formato, colunas=None):
+    """
+    Lê uma planilha do cache.
+
+    Args:
+        prefixo (str): Prefixo dos arquivos de cache
+        sheet_name (str): Nome da planilha
+        formato (str): 'parquet' ou 'pkl'
+        colunas (list, optional): Colunas a ler; no Parquet, as demais nem são
+                                  carregadas. Defaults to None (todas).
+
+    Returns:
+        DataFrame: Planilha, ou None se o arquivo de cache não puder ser lido
+    """
+    caminho = _nome_arquivo_planilha(prefixo, sheet_name, formato)
+    try:
+        if formato == 'parquet':
+            df = pd.read_parquet(caminho, columns=colunas)
+        else:
+            df = pd.read_pickle(caminho)
+            return df[colunas] if colunas is not None else df
+    except Exception:
+        return None
+    # O Parquet só preserva como categóricas as colunas de texto
+    for coluna in COLUNAS_CATEGORIA:
+        if coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype('category')
+    return df
+
+def carregar_planilhas(file_path, sheet_names, pasta_cache=None):
+    """
+    Lê várias planilhas do arquivo Excel, usando o cache local quando válido.
+
+    As planilhas ausentes do cache (ou todas, se o arquivo mudou) são lidas do
+    Excel (ler_planilhas_excel), validadas e gravadas no cache.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        sheet_names (list): Nomes das planilhas
+        pasta_cache (str, optional): Pasta do cache. Defaults to None (PASTA_CACHE).
+                                     Use False para ler direto do Excel, sem cache.
+
+    Returns:
+        dict: DataFrame de cada planilha, já tipado por aplicar_tipos()
+
+    Raises:
+        ValueError: Se uma planilha lida do Excel não tiver as colunas do esquema
+
+    Processo:
+        1. Confere os metadados do cache com o arquivo de origem
+        2. Lê do cache as planilhas disponíveis
+        3. Lê do Excel as que faltarem e atualiza o cache
+    """
+    if pasta_cache is False:
+        return ler_planilhas_excel(file_path, sheet_names)
+
+    pasta_cache = pasta_cache or PASTA_CACHE
+    os.makedirs(pasta_cache, exist_ok=True)
+    prefixo, caminho_metadados = _caminhos_cache(file_path, pasta_cache)
+
+    # 1. Metadados válidos apenas se a origem não mudou
+    metadados = _metadados_validos(file_path, caminho_metadados)
+    if metadados is None:
+        info = os.stat(file_path)
+        metadados = {
+            'versao': VERSAO_CACHE,
+            'origem': os.path.abspath(file_path),
+            'tamanho': info.st_size,
+            'mtime_ns': info.st_mtime_ns,
+            'sha256': calcular_hash_arquivo(file_path),
+            'planilhas': {}
+        }
+
+    # 2. Planilhas já disponíveis no cache
+    resultado = {}
+    for nome in sheet_names:
+        formato = metadados['planilhas'].get(nome)
+        if formato:
+            df = _ler_planilha_cache(prefixo, nome, formato)
+            if df is not None:
+                resultado[nome] = df
+
+    # 3. Demais planilhas: lidas do Excel
+    faltantes = [nome for nome in sheet_names if nome not in resultado]
+    if faltantes:
+        for nome, df in ler_planilhas_excel(file_path, faltantes).items():
+            metadados['planilhas'][nome] = _gravar_planilha(df, prefixo, nome)
+            resultado[nome] = df
+    _gravar_metadados(caminho_metadados, metadados)
+
+    return resultado
+
+def ler_planilha(file_path, sheet_name, pasta_cache=None):
+    """
+    Lê uma planilha do arquivo Excel, usando o cache local quando válido.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        sheet_name (str): Nome da planilha
+        pasta_cache (str, optional): Pasta do cache. Defaults to None (PASTA_CACHE).
+
+    Returns:
+        DataFrame: Planilha tipada (ver carregar_planilhas)
+    """
+    return carregar_planilhas(file_path, [sheet_name], pasta_cache)[sheet_name]
+
+def normalizar_id(valor):
+    """
+    Padroniza um ID para comparação: números e textos numéricos viram float.
+
+    Assim 100, 100.0, "100" e " 100.0 " são o mesmo ID, independentemente de
+    como a célula foi gravada no Excel.
+
+    Args:
+        valor: ID lido da planilha ou informado pelo usuário
+
+    Returns:
+        float ou str: ID padronizado (o próprio valor se não for número nem texto)
+    """
+    if isinstance(valor, str):
+        valor = valor.strip()
+        try:
+            return float(valor)
+        except ValueError:
+            return valor
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    return valor
+
+def id_inteiro(valor):
+    """
+    Devolve um ID numérico inteiro como int (100.0 -> 100).
+
+    A leitura em blocos e normalizar_id() guardam IDs numéricos como float;
+    os relatórios exibem os IDs inteiros como o Excel os entrega.
+
+    Args:
+        valor: ID lido da planilha ou dos agregados
+
+    Returns:
+        int ou o próprio valor, se não for um float inteiro
+    """
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+def _limites_periodo(data_inicio, data_fim):
+    """
+    Converte um período em limites [inicio, fim) de pd.Timestamp.
+
+    Args:
+        data_inicio (str/date, optional): Primeiro dia (None = sem limite)
+        data_fim (str/date, optional): Último dia, inclusive (None = sem limite)
+
+    Returns:
+        tuple: (inicio, fim) com None onde não houver limite
+    """
+    inicio = pd.Timestamp(data_inicio).normalize() if data_inicio is not None else None
+    fim = pd.Timestamp(data_fim).normalize() + pd.Timedelta(days=1) if data_fim is not None else None
+    return inicio, fim
+
+def _converter_data(valor):
+    """Converte o valor de uma célula de data em pd.Timestamp (NaT se inválido)."""
+    if isinstance(valor, (datetime, date)):
+        return pd.Timestamp(valor)
+    if valor is None:
+        return pd.NaT
+    return pd.to_datetime(valor, errors='coerce')
+
+def ler_times_em_blocos(file_path, colunas=COLUNAS_TIMES, data_inicio=None, data_fim=None, ids=None,
+                        tamanho_bloco=20000, sheet_name='Times'):
+    """
+    Lê a planilha 'Times' em blocos, sem carregar a planilha inteira.
+
+    As linhas são percorridas com o openpyxl em modo somente leitura. Só as
+    colunas pedidas são extraídas, e as linhas fora do período ou dos IDs
+    pedidos são descartadas antes de virarem DataFrame.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        colunas (tuple, optional): Colunas a extrair. Defaults to COLUNAS_TIMES.
+        data_inicio (str/date, optional): Primeiro dia. Defaults to None (sem limite).
+        data_fim (str/date, optional): Último dia, inclusive. Defaults to None (sem limite).
+        ids (list, optional): IDProdutivo aceitos (comparados com normalizar_id).
+                              Defaults to None (todos).
+        tamanho_bloco (int, optional): Linhas por bloco. Defaults to 20000.
+        sheet_name (str, optional): Nome da planilha. Defaults to 'Times'.
+
+    Yields:
+        DataFrame: Bloco com as colunas pedidas, com os valores como vieram do
+                   Excel (ainda não tipados por aplicar_tipos(), para que
+                   validar_esquema() conte as datas inválidas) e IDs numéricos
+                   como float
+
+    Processo:
+        1. Localiza as colunas pedidas no cabeçalho
+        2. Filtra cada linha por data e ID ainda como valores do openpyxl
+        3. Agrupa as linhas aceitas em blocos
+    """
+    from openpyxl import load_workbook
+
+    inicio, fim = _limites_periodo(data_inicio, data_fim)
+    chaves = {normalizar_id(i) for i in ids} if ids is not None else None
+    colunas = list(colunas)
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        linhas = workbook[sheet_name].iter_rows(values_only=True)
+
+        # 1. Posição de cada coluna pedida (nomes sem espaços nas bordas)
+        cabecalho = [str(nome).strip() if nome is not None else None for nome in next(linhas, ())]
+        faltando = [coluna for coluna in colunas if coluna not in cabecalho]
+        if faltando:
+            raise KeyError(f"Colunas não encontradas na planilha '{sheet_name}': {faltando}")
+        posicoes = [cabecalho.index(coluna) for coluna in colunas]
+        pos_data = cabecalho.index('Data Time') if inicio is not None or fim is not None else None
+        pos_id = cabecalho.index('IDProdutivo') if chaves is not None else None
+        ids_numericos = [coluna in COLUNAS_CATEGORIA for coluna in colunas]
+
+        # 2. Filtros aplicados linha a linha
+        bloco = []
+        for linha in linhas:
+            if pos_data is not None:
+                data = _converter_data(linha[pos_data] if pos_data < len(linha) else None)
+                if pd.isna(data) or (inicio is not None and data < inicio) or (fim is not None and data >= fim):
+                    continue
+            if pos_id is not None:
+                if pos_id >= len(linha) or normalizar_id(linha[pos_id]) not in chaves:
+                    continue
+            valores = [linha[p] if p < len(linha) else None for p in posicoes]
+            if all(valor is None for valor in valores):
+                continue  # Linha vazia (comum no fim das planilhas)
+            # IDs inteiros como float, como o pandas lê colunas numéricas com vazios
+            bloco.append([float(v) if numerico and isinstance(v, int) and not isinstance(v, bool) else v
+                          for v, numerico in zip(valores, ids_numericos)])
+
+            # 3. Bloco completo
+            if len(bloco) >= tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=colunas)
+                bloco = []
+        if bloco:
+            yield pd.DataFrame(bloco, columns=colunas)
+    finally:
+        workbook.close()
+
+def _valor_canonico(valor):
+    """Valor de uma célula em forma estável para o checksum (vazios como None, números como float, datas como pd.Timestamp)."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if isinstance(valor, (datetime, date)):
+        return pd.Timestamp(valor)
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor)
+    return valor
+
+def _hash_linhas(df):
+    """
+    Calcula um hash de 64 bits por linha de um bloco.
+
+    Os valores são padronizados antes, para que a mesma linha tenha o mesmo
+    hash em qualquer bloco, independentemente do tipo inferido para a coluna.
+
+    Args:
+        df (DataFrame): Bloco lido por ler_times_em_blocos()
+
+    Returns:
+        np.ndarray: Hash de cada linha (uint64), na ordem do bloco
+    """
+    # Cada valor vira texto (repr): map() inferiria de novo o tipo da coluna, e o
+    # hash de uma coluna float64 difere do da mesma coluna com um texto no bloco
+    canonico = pd.DataFrame({
+        coluna: df[coluna].astype(object).map(lambda valor: repr(_valor_canonico(valor))).astype(object)
+        for coluna in df.columns
+    })
+    return pd.util.hash_pandas_object(canonico, index=False).to_numpy()
+
+def _agregados_vazios():
+    """Agregados de uma ingestão que ainda não leu nenhuma linha."""
+    return {
+        'presentes_por_data': {},
+        'horas_por_id': pd.Series(dtype=float, index=pd.MultiIndex.from_tuples([], names=['IDProdutivo', 'PE/Equip'])),
+        'rollup_diario': pd.DataFrame(
+            {'horas': pd.Series(dtype=float), 'registros': pd.Series(dtype='int64')},
+            index=pd.MultiIndex.from_tuples([], names=['Data', 'IDProdutivo', 'PE/Equip'])
+        )
+    }
+
+def _acumular_agregados(agregados, bloco):
+    """
+    Soma um bloco de linhas novas aos agregados.
+
+    Args:
+        agregados (dict): Agregados atuais (alterados no próprio dicionário)
+        bloco (DataFrame): Linhas novas da planilha 'Times', tipadas por aplicar_tipos()
+    """
+    validos = bloco.dropna(subset=['IDProdutivo'])
+    # IDs categóricos voltam aos valores: agrupar por categóricas cria combinações vazias
+    ids_validos = valores_originais(validos['IDProdutivo'])
+
+    # Presentes por dia, na ordem e com as repetições da planilha
+    datas = validos['Data Time'].dt.normalize()
+    presentes = agregados['presentes_por_data']
+    for data, ids in ids_validos.groupby(datas).agg(list).items():
+        presentes.setdefault(data, []).extend(ids)
+
+    # Horas por IDProdutivo e PE/Equip ('Hora lançada' já é numérica)
+    horas = validos['Hora lançada']
+    chaves = [ids_validos.map(normalizar_id).rename('IDProdutivo'),
+              valores_originais(validos['PE/Equip']).map(lambda valor: str(valor).strip()).rename('PE/Equip')]
+    soma = horas.groupby(chaves, sort=False).sum()
+    agregados['horas_por_id'] = agregados['horas_por_id'].add(soma, fill_value=0)
+
+    # Rollup diário: horas e quantidade de registros por (dia, IDProdutivo, PE/Equip)
+    diario = horas.groupby([datas.rename('Data')] + chaves, sort=False).agg(['sum', 'size'])
+    diario.columns = ['horas', 'registros']
+    rollup = agregados['rollup_diario'].add(diario, fill_value=0)
+    rollup['registros'] = rollup['registros'].astype('int64')
+    agregados['rollup_diario'] = rollup
+
+def _caminhos_incremental(file_path, pasta_cache):
+    """
+    Define os caminhos da ingestão incremental de um arquivo Excel.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        pasta_cache (str): Pasta do cache
+
+    Returns:
+        tuple: (prefixo das partes gravadas, caminho da marca d'água, caminho dos agregados)
+    """
+    prefixo, _ = _caminhos_cache(file_path, pasta_cache)
+    prefixo += "_incremental"
+    return prefixo, prefixo + ".json", prefixo + "_agregados.pkl"
+
+def _remover_partes(prefixo, partes):
+    """Apaga as partes gravadas por ingestões anteriores."""
+    for nome, formato in partes:
+        try:
+            os.remove(_nome_arquivo_planilha(prefixo, nome, formato))
+        except OSError:
+            pass
+
+def _partes_gravadas(caminho_marca):
+    """
+    Lista as partes registradas em uma marca d'água de qualquer versão do cache.
+
+    Args:
+        caminho_marca (str): Caminho da marca d'água
+
+    Returns:
+        list: Pares [nome, formato] das partes (vazia se não houver marca legível)
+    """
+    try:
+        with open(caminho_marca, 'r', encoding='utf-8') as arquivo:
+            return json.load(arquivo).get('partes', [])
+    except (OSError, ValueError, AttributeError):
+        return []
+
+def _ingerir(file_path, marca, agregados, tamanho_bloco, prefixo):
+    """
+    Percorre a planilha 'Times' a partir da marca d'água.
+
+    As linhas já ingeridas só entram no checksum; as novas são conferidas com
+    o esquema (ESQUEMAS['Times']), tipadas, somadas aos agregados e gravadas
+    no armazenamento local bloco a bloco, sem acumular em memória.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        marca (dict): Marca d'água ('linhas' e 'checksum' das linhas já ingeridas);
+                      cada parte gravada é registrada em marca['partes']
+        agregados (dict): Agregados atuais (alterados no próprio dicionário)
+        tamanho_bloco (int): Linhas por bloco
+        prefixo (str): Prefixo das partes gravadas
+
+    Returns:
+        tuple: (total de linhas, checksum de todas as linhas),
+               ou None se as linhas já ingeridas mudaram ou foram apagadas
+    """
+    sha256 = hashlib.sha256()
+    lidas = 0
+    conferido = marca['linhas'] == 0
+    invalidos = {}
+    for bloco in ler_times_em_blocos(file_path, COLUNAS_TIMES, tamanho_bloco=tamanho_bloco):
+        hashes = _hash_linhas(bloco)
+        antigas = max(0, min(len(bloco), marca['linhas'] - lidas))
+        sha256.update(hashes[:antigas].tobytes())
+        lidas += len(bloco)
+
+        # Ao alcançar a marca, o checksum tem que ser o mesmo da última ingestão
+        if not conferido and lidas >= marca['linhas']:
+            if sha256.hexdigest() != marca['checksum']:
+                return None
+            conferido = True
+
+        if antigas < len(bloco):
+            bloco = bloco.iloc[antigas:]
+            sha256.update(hashes[antigas:].tobytes())
+            for coluna, quantidade in validar_esquema(bloco, 'Times').items():
+                invalidos[coluna] = invalidos.get(coluna, 0) + quantidade
+            bloco = aplicar_tipos(bloco)
+            _acumular_agregados(agregados, bloco)
+            # Parte gravada em ordem de data (mesmo dia na ordem da planilha; datas
+            # vazias no fim), para que ler_times_ingeridos() recorte períodos por busca binária
+            bloco = bloco.sort_values('Data Time', kind='stable')
+            nome = f"parte {len(marca['partes']) + 1:05d}"
+            marca['partes'].append([nome, _gravar_planilha(bloco, prefixo, nome)])
+
+    if not conferido:
+        return None  # A planilha tem menos linhas que na última ingestão
+    if invalidos:
+        print(f"Aviso: valores inválidos nas linhas novas da planilha 'Times' (ficarão vazios): {invalidos}")
+    return lidas, sha256.hexdigest()
+
+def atualizar_times_incremental(file_path, pasta_cache=None, tamanho_bloco=20000):
+    """
+    Ingere apenas as linhas novas da planilha 'Times' e atualiza os agregados.
+
+    Uma marca d'água guarda quantas linhas já foram ingeridas e o checksum
+    delas. A cada execução, as linhas antigas são apenas conferidas pelo
+    checksum; as novas são gravadas em partes do armazenamento local, bloco a bloco,
+    e somadas aos agregados. Se alguma linha antiga foi alterada ou apagada,
+    tudo é refeito a partir do Excel.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        pasta_cache (str, optional): Pasta do cache. Defaults to None (PASTA_CACHE).
+        tamanho_bloco (int, optional): Linhas por bloco na leitura do Excel. Defaults to 20000.
+
+    Returns:
+        dict: Resultado da ingestão:
+            - presentes_por_data: dict {dia (pd.Timestamp): lista de IDProdutivo presentes}
+            - horas_por_id: pd.Series com a soma de 'Hora lançada' por (IDProdutivo, PE/Equip),
+              com IDs padronizados por normalizar_id()
+            - rollup_diario: DataFrame com 'horas' e 'registros' por (Data, IDProdutivo, PE/Equip)
+            - linhas: total de linhas ingeridas
+            - linhas_novas: linhas ingeridas nesta execução
+            - reconstruido: True se a ingestão foi refeita do zero
+
+    Processo:
+        1. Lê a marca d'água e os agregados; arquivo inalterado não é lido
+        2. Confere as linhas antigas e ingere as novas
+        3. Se as linhas antigas mudaram, refaz tudo do zero
+        4. Grava os agregados e, por último, a nova marca d'água
+    """
+    pasta_cache = pasta_cache or PASTA_CACHE
+    os.makedirs(pasta_cache, exist_ok=True)
+    prefixo, caminho_marca, caminho_agregados = _caminhos_incremental(file_path, pasta_cache)
+    info = os.stat(file_path)
+
+    # 1. Estado da última ingestão
+    marca = _ler_metadados(caminho_marca)
+    agregados = None
+    if marca is not None:
+        try:
+            agregados = pd.read_pickle(caminho_agregados)
+        except Exception:
+            agregados = None
+    if marca is None or agregados is None:
+        # Marca de outra versão ou sem agregados: as partes antigas não serão mais lidas
+        _remover_partes(prefixo, _partes_gravadas(caminho_marca))
+        marca = {'versao': VERSAO_CACHE, 'origem': os.path.abspath(file_path), 'linhas': 0,
+                 'checksum': hashlib.sha256().hexdigest(), 'partes': []}
+        agregados = _agregados_vazios()
+    elif info.st_size == marca.get('tamanho') and info.st_mtime_ns == marca.get('mtime_ns'):
+        return dict(agregados, linhas=marca['linhas'], linhas_novas=0, reconstruido=False)
+
+    # 2. Linhas novas a partir da marca d'água
+    linhas_antes = marca['linhas']
+    reconstruido = linhas_antes == 0
+    ingestao = _ingerir(file_path, marca, agregados, tamanho_bloco, prefixo)
+
+    # 3. Linhas antigas alteradas: ingestão completa
+    if ingestao is None:
+        print("Linhas já ingeridas foram alteradas; refazendo a ingestão completa...")
+        _remover_partes(prefixo, marca['partes'])
+        marca.update(linhas=0, checksum=hashlib.sha256().hexdigest(), partes=[])
+        agregados = _agregados_vazios()
+        linhas_antes = 0
+        reconstruido = True
+        ingestao = _ingerir(file_path, marca, agregados, tamanho_bloco, prefixo)
+    linhas, checksum = ingestao
+
+    # 4. As partes novas já foram gravadas; os agregados vêm antes da marca
+    # d'água: uma execução interrompida no meio apenas repete a ingestão
+    # dessas linhas (e regrava as mesmas partes)
+    pd.to_pickle(agregados, caminho_agregados + ".tmp")
+    os.replace(caminho_agregados + ".tmp", caminho_agregados)
+    marca.update(linhas=linhas, checksum=checksum, tamanho=info.st_size, mtime_ns=info.st_mtime_ns)
+    _gravar_metadados(caminho_marca, marca)
+
+    return dict(agregados, linhas=linhas, linhas_novas=linhas - linhas_antes, reconstruido=reconstruido)
+
+def _recortar_periodo(parte, inicio, fim):
+    """
+    Seleciona as linhas de uma parte (ordenada por 'Data Time') dentro de [inicio, fim).
+
+    Args:
+        parte (DataFrame): Parte gravada pela ingestão incremental
+        inicio (pd.Timestamp): Primeiro instante (None = sem limite)
+        fim (pd.Timestamp): Instante seguinte ao período (None = sem limite)
+
+    Returns:
+        DataFrame: Linhas do período (sem as datas vazias), localizadas por busca binária nas datas
+    """
+    datas = pd.DatetimeIndex(parte['Data Time'])
+    primeira = datas.searchsorted(inicio) if inicio is not None else 0
+    # As datas vazias, no fim da parte, ficam fora de qualquer período
+    ultima = datas.searchsorted(fim) if fim is not None else len(datas) - int(datas.isna().sum())
+    return parte.iloc[primeira:ultima]
+
+def ler_times_ingeridos(file_path, colunas=COLUNAS_TIMES, data_inicio=None, data_fim=None, pasta_cache=None,
+                        tamanho_bloco=20000):
+    """
+    Lê as linhas da planilha 'Times' do armazenamento local da ingestão incremental.
+
+    Cada parte do armazenamento está em ordem de data; o período pedido é
+    recortado de cada parte por busca binária (searchsorted), sem filtrar
+    linha a linha.
+
+    Args:
+        file_path (str): Caminho do arquivo Excel
+        colunas (tuple, optional): Colunas a ler. Defaults to COLUNAS_TIMES.
+        data_inicio (str/date, optional): Primeiro dia. Defaults to None (sem limite).
+        data_fim (str/date, optional): Último dia, inclusive. Defaults to None (sem limite).
+        pasta_cache (str, optional): Pasta do cache. Defaults to None (PASTA_CACHE).
+        tamanho_bloco (int, optional): Linhas por bloco na leitura do Excel. Defaults to 20000.
+
+    Returns:
+        DataFrame: Linhas ingeridas do período, em ordem de data (o mesmo dia na
+                   ordem da planilha; sem período, as datas vazias no fim),
+                   tipadas por aplicar_tipos()
+    """
+    atualizar_times_incremental(file_path, pasta_cache, tamanho_bloco)
+    prefixo, caminho_marca, _ = _caminhos_incremental(file_path, pasta_cache or PASTA_CACHE)
+    marca = _ler_metadados(caminho_marca)
+    colunas = list(colunas)
+    inicio, fim = _limites_periodo(data_inicio, data_fim)
+    periodo = inicio is not None or fim is not None
+    # 'Data Time' é lida para o recorte e a ordenação mesmo que não tenha sido pedida
+    leitura = list(dict.fromkeys(colunas + ['Data Time']))
+    partes = [_ler_planilha_cache(prefixo, nome, formato, leitura) for nome, formato in marca['partes']]
+    if any(parte is None for parte in partes):
+        raise OSError("Parte da ingestão incremental não encontrada; apague a marca d'água para refazê-la")
+    if periodo:
+        partes = [_recortar_periodo(parte, inicio, fim) for parte in partes]
+    if not partes:
+        return aplicar_tipos(pd.DataFrame(columns=colunas))
+    # Cada parte tem suas próprias categorias; a tipagem é refeita após juntar
+    df = aplicar_tipos(pd.concat([parte.apply(valores_originais) for parte in partes], ignore_index=True))
+    if len(partes) > 1:
+        # Partes já em ordem de data: a ordenação estável mantém a ordem da planilha em cada dia
+        df = df.sort_values('Data Time', kind='stable', ignore_index=True)
+    return df[colunas]
+
+def horas_do_id(horas_por_id, id_produtivo):
+    """
+    Seleciona nos agregados as horas de um IDProdutivo, por PE/Equip.
+
+    Args:
+        horas_por_id (pd.Series): Agregado 'horas_por_id' de atualizar_times_incremental()
+        id_produtivo: ID informado (comparado com normalizar_id)
+
+    Returns:
+        DataFrame: Colunas 'PE/Equip' e 'Horas', ordenado por PE/Equip
+                   (vazio se o ID não tiver registros)
+    """
+    chave = normalizar_id(id_produtivo)
+    if chave not in horas_por_id.index.get_level_values('IDProdutivo'):
+        return pd.DataFrame(columns=['PE/Equip', 'Horas'])
+    return horas_por_id.xs(chave, level='IDProdutivo').sort_index().rename('Horas').reset_index()
@@ -0,0 +1,293 @@
+"""
+TIME_indice_presenca.py - Índice de presença por profissional e dia
+
+Este módulo monta, a partir da planilha 'Times', uma matriz booleana de presença
+(IDDV x dia) e responde às consultas de faltas com operações vetorizadas do NumPy.
+
+Funcionalidades principais:
+- Constrói o índice uma única vez a partir dos registros de presença
+- Salva e carrega o índice em disco, com os bits compactados (np.packbits)
+- Faltantes de um dia
+- Quantidade de faltas por profissional em um período, por somas de prefixo
+  (o custo não depende do tamanho do período)
+- Maior sequência de faltas consecutivas por profissional
+- Taxa de presença por equipe
+
+Uso:
+Execute o script diretamente para gerar o índice a partir do arquivo Excel,
+ou importe IndicePresenca a partir de outros scripts (ex.: TIME_pendente.py).
+"""
+
+import numpy as np
+import pandas as pd
+from TIME_dados import ler_times_ingeridos, valores_originais, id_inteiro
+
+class IndicePresenca:
+    """
+    Matriz de presença: uma linha por IDDV e uma coluna por dia corrido.
+
+    Atributos:
+        iddvs (pd.Index): IDs das linhas da matriz
+        data_inicio (pd.Timestamp): Dia da primeira coluna
+        presenca (np.ndarray): Matriz booleana (IDDV x dia), True = presente
+        dias_com_registro (np.ndarray): Dias com pelo menos um registro de
+            presença na planilha, de qualquer profissional
+    """
+
+    def __init__(self, iddvs, data_inicio, presenca, dias_com_registro):
+        self.iddvs = pd.Index(iddvs)
+        self.data_inicio = pd.Timestamp(data_inicio).normalize()
+        self.presenca = presenca
+        self.dias_com_registro = dias_com_registro
+        self._acumulados = None
+
+    @classmethod
+    def construir(cls, df_times, iddvs=None, data_inicio=None, data_fim=None):
+        """
+        Monta o índice a partir dos registros de presença.
+
+        Args:
+            df_times (DataFrame): Planilha 'Times' com 'Data Time' e 'IDProdutivo'
+            iddvs (list, optional): IDs das linhas (ex.: ativos e produtivos).
+                Defaults to None (todos os IDs presentes na planilha).
+            data_inicio (str/date, optional): Primeiro dia. Defaults to None (primeiro registro).
+            data_fim (str/date, optional): Último dia. Defaults to None (último registro).
+
+        Returns:
+            IndicePresenca: Índice montado
+
+        Processo:
+            1. Converte datas e IDs dos registros em posições da matriz
+            2. Descarta registros fora do período ou de IDs fora do índice
+            3. Marca as posições encontradas como presentes
+        """
+        datas = pd.to_datetime(df_times['Data Time']).dt.normalize()
+        registros = pd.DataFrame({'data': datas, 'id': df_times['IDProdutivo']}).dropna()
+
+        if iddvs is None:
+            iddvs = pd.Index(registros['id'].unique()).sort_values()
+        iddvs = pd.Index(iddvs).unique()
+        data_inicio = pd.Timestamp(data_inicio) if data_inicio is not None else registros['data'].min()
+        data_fim = pd.Timestamp(data_fim) if data_fim is not None else registros['data'].max()
+        n_dias = max((data_fim - data_inicio).days + 1, 0)
+
+        # 1. Posições na matriz (-1 = fora do índice)
+        colunas = ((registros['data'] - data_inicio).dt.days).to_numpy()
+        no_periodo = (colunas >= 0) & (colunas < n_dias)
+        linhas = iddvs.get_indexer(registros['id'])
+
+        dias_com_registro = np.zeros(n_dias, dtype=bool)
+        dias_com_registro[colunas[no_periodo]] = True
+
+        # 2 e 3. Marca as presenças válidas
+        validos = no_periodo & (linhas >= 0)
+        presenca = np.zeros((len(iddvs), n_dias), dtype=bool)
+        presenca[linhas[validos], colunas[validos]] = True
+
+        return cls(iddvs, data_inicio, presenca, dias_com_registro)
+
+    @property
+    def datas(self):
+        """pd.DatetimeIndex: Dia de cada coluna da matriz."""
+        return pd.date_range(self.data_inicio, periods=self.presenca.shape[1], freq='D')
+
+    def salvar(self, caminho):
+        """
+        Grava o índice em disco (formato .npz), com a matriz compactada em bits.
+
+        Args:
+            caminho (str): Caminho do arquivo
+        """
+        np.savez_compressed(
+            caminho,
+            bits=np.packbits(self.presenca, axis=1),
+            dias_com_registro=np.packbits(self.dias_com_registro),
+            n_dias=self.presenca.shape[1],
+            iddvs=self.iddvs.to_numpy(),
+            data_inicio=str(self.data_inicio.date())
+        )
+
+    @classmethod
+    def carregar(cls, caminho):
+        """
+        Lê um índice gravado por salvar().
+
+        Args:
+            caminho (str): Caminho do arquivo
+
+        Returns:
+            IndicePresenca: Índice carregado
+        """
+        with np.load(caminho, allow_pickle=True) as dados:
+            n_dias = int(dados['n_dias'])
+            presenca = np.unpackbits(dados['bits'], axis=1, count=n_dias).astype(bool)
+            dias_com_registro = np.unpackbits(dados['dias_com_registro'], count=n_dias).astype(bool)
+            return cls(dados['iddvs'], str(dados['data_inicio']), presenca, dias_com_registro)
+
+    def _colunas(self, data_inicio=None, data_fim=None):
+        """
+        Converte um período em fatia de colunas da matriz, limitada ao índice.
+
+        Args:
+            data_inicio (str/date, optional): Primeiro dia. Defaults to None (início do índice).
+            data_fim (str/date, optional): Último dia. Defaults to None (fim do índice).
+
+        Returns:
+            slice: Colunas do período
+        """
+        n_dias = self.presenca.shape[1]
+        inicio = 0 if data_inicio is None else (pd.Timestamp(data_inicio) - self.data_inicio).days
+        fim = n_dias if data_fim is None else (pd.Timestamp(data_fim) - self.data_inicio).days + 1
+        return slice(min(max(inicio, 0), n_dias), min(max(fim, 0), n_dias))
+
+    def _contagens(self, data_inicio=None, data_fim=None, apenas_dias_com_registro=False):
+        """
+        Conta, por somas de prefixo, as presenças de cada IDDV e os dias de um período.
+
+        As presenças e os dias com registro acumulados são calculados na
+        primeira consulta; as seguintes custam uma subtração por IDDV.
+
+        Args:
+            data_inicio (str/date, optional): Primeiro dia. Defaults to None.
+            data_fim (str/date, optional): Último dia. Defaults to None.
+            apenas_dias_com_registro (bool, optional): Ver _faltas(). Defaults to False.
+
+        Returns:
+            tuple: (presenças por IDDV (np.ndarray), quantidade de dias considerados)
+        """
+        if self._acumulados is None:
+            presencas = np.zeros((len(self.iddvs), self.presenca.shape[1] + 1), dtype=np.int32)
+            np.cumsum(self.presenca, axis=1, out=presencas[:, 1:])
+            dias = np.concatenate(([0], np.cumsum(self.dias_com_registro)))
+            self._acumulados = (presencas, dias)
+        presencas, dias = self._acumulados
+
+        colunas = self._colunas(data_inicio, data_fim)
+        inicio, fim = colunas.start, max(colunas.stop, colunas.start)
+        n_dias = dias[fim] - dias[inicio] if apenas_dias_com_registro else fim - inicio
+        # Só há presença em dias com registro, então as presenças valem nos dois casos
+        return presencas[:, fim] - presencas[:, inicio], n_dias
+
+    def _faltas(self, data_inicio=None, data_fim=None, apenas_dias_com_registro=False):
+        """
+        Recorta a matriz de faltas (True = ausente) de um período.
+
+        Args:
+            data_inicio (str/date, optional): Primeiro dia. Defaults to None.
+            data_fim (str/date, optional): Último dia. Defaults to None.
+            apenas_dias_com_registro (bool, optional): Desconsidera dias em que
+                ninguém registrou presença (fins de semana, feriados). Defaults to False.
+
+        Returns:
+            np.ndarray: Matriz booleana (IDDV x dia do período)
+        """
+        colunas = self._colunas(data_inicio, data_fim)
+        faltas = ~self.presenca[:, colunas]
+        if apenas_dias_com_registro:
+            faltas = faltas[:, self.dias_com_registro[colunas]]
+        return faltas
+
+    def faltantes_no_dia(self, data):
+        """
+        Lista os IDs sem presença em um dia.
+
+        Args:
+            data (str/date): Dia consultado
+
+        Returns:
+            list: IDs faltantes, na ordem do índice (todos, se o dia estiver fora do índice)
+        """
+        coluna = (pd.Timestamp(data) - self.data_inicio).days
+        if not 0 <= coluna < self.presenca.shape[1]:
+            return self.iddvs.tolist()
+        return self.iddvs[~self.presenca[:, coluna]].tolist()
+
+    def faltas_por_pessoa(self, data_inicio=None, data_fim=None, apenas_dias_com_registro=False):
+        """
+        Conta as faltas de cada profissional em um período.
+
+        Args:
+            data_inicio (str/date, optional): Primeiro dia. Defaults to None.
+            data_fim (str/date, optional): Último dia. Defaults to None.
+            apenas_dias_com_registro (bool, optional): Ver _faltas(). Defaults to False.
+
+        Returns:
+            pd.Series: Quantidade de faltas por IDDV
+        """
+        presencas, n_dias = self._contagens(data_inicio, data_fim, apenas_dias_com_registro)
+        return pd.Series(n_dias - presencas, index=self.iddvs, name='faltas')
+
+    def maior_sequencia_faltas(self, data_inicio=None, data_fim=None, apenas_dias_com_registro=False):
+        """
+        Calcula a maior sequência de faltas consecutivas de cada profissional.
+
+        Args:
+            data_inicio (str/date, optional): Primeiro dia. Defaults to None.
+            data_fim (str/date, optional): Último dia. Defaults to None.
+            apenas_dias_com_registro (bool, optional): Ver _faltas(). Defaults to False.
+
+        Returns:
+            pd.Series: Maior número de dias seguidos de falta por IDDV
+
+        Processo:
+            1. Delimita com zeros cada linha da matriz de faltas
+            2. Localiza inícios (0 -> 1) e fins (1 -> 0) de cada sequência
+            3. Mantém, por linha, a maior diferença entre fim e início
+        """
+        faltas = self._faltas(data_inicio, data_fim, apenas_dias_com_registro)
+        bordas = np.diff(np.pad(faltas.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+        linhas, inicios = np.nonzero(bordas == 1)
+        _, fins = np.nonzero(bordas == -1)
+
+        maiores = np.zeros(len(self.iddvs), dtype=np.int64)
+        np.maximum.at(maiores, linhas, fins - inicios)
+        return pd.Series(maiores, index=self.iddvs, name='maior_sequencia_faltas')
+
+    def taxa_presenca_por_equipe(self, equipes, data_inicio=None, data_fim=None, apenas_dias_com_registro=False):
+        """
+        Calcula a taxa de presença (dias presentes / dias possíveis) de cada equipe.
+
+        Args:
+            equipes (dict/pd.Series): Equipe de cada IDDV; IDs sem equipe são ignorados
+            data_inicio (str/date, optional): Primeiro dia. Defaults to None.
+            data_fim (str/date, optional): Último dia. Defaults to None.
+            apenas_dias_com_registro (bool, optional): Ver _faltas(). Defaults to False.
+
+        Returns:
+            pd.Series: Taxa de presença (0 a 1) por equipe
+        """
+        presencas, n_dias = self._contagens(data_inicio, data_fim, apenas_dias_com_registro)
+        presencas = pd.Series(presencas, index=self.iddvs)
+        equipe_por_iddv = self.iddvs.map(pd.Series(equipes))
+        agrupado = presencas.groupby(equipe_por_iddv).agg(['sum', 'count'])
+        return (agrupado['sum'] / (agrupado['count'] * n_dias)).rename('taxa_presenca')
+
+def equipes_do_cadastro(df_pessoas, coluna_equipe='Equipe'):
+    """
+    Obtém a equipe de cada IDDV a partir da planilha 'Pessoas'.
+
+    Args:
+        df_pessoas (DataFrame): Planilha 'Pessoas' com colunas já sem espaços
+        coluna_equipe (str, optional): Coluna com a equipe. Defaults to 'Equipe'.
+
+    Returns:
+        pd.Series: Equipe indexada por IDDV
+    """
+    cadastro = df_pessoas.dropna(subset=['IDDV']).drop_duplicates('IDDV')
+    return cadastro.set_index('IDDV')[coluna_equipe]
+
+# Ponto de entrada principal
+if __name__ == "__main__":
+    # Caminhos fixos do arquivo de dados e do índice gerado
+    file_path = r"V:\PCP\TIME\time.xlsx"
+    caminho_indice = r"V:\PCP\TIME\indice_presenca.npz"
+
+    # Linhas da planilha 'Times' já ingeridas (só as novas são lidas do Excel)
+    df_times = ler_times_ingeridos(file_path, ['Data Time', 'IDProdutivo'])
+    df_times['IDProdutivo'] = valores_originais(df_times['IDProdutivo']).map(id_inteiro)
+    indice = IndicePresenca.construir(df_times)
+    indice.salvar(caminho_indice)
+
+    print(f"Índice salvo em: {caminho_indice}")
+    print(f"   Profissionais: {len(indice.iddvs)}")
+    print(f"   Dias: {indice.presenca.shape[1]} (de {indice.datas[0].date()} a {indice.datas[-1].date()})")
@@ -16,6 +16,8 @@ Execute o script diretamente e siga as instruções para informar o período des
 
 import pandas as pd
 from datetime import datetime
+from TIME_dados import carregar_planilhas, atualizar_times_incremental, valores_originais, id_inteiro
+from TIME_indice_presenca import IndicePresenca
 
 def obter_iddvs_ativos_produtivos(file_path, sheet_name='Pessoas'):
     """
@@ -29,17 +31,103 @@ def obter_iddvs_ativos_produtivos(file_path, sheet_name='Pessoas'):
         list: Lista de IDs (IDDV) dos profissionais ativos e produtivos
     
     Processo:
-        1. Lê a planilha especificada
-        2. Filtra registros onde 'Ativo' = 1.0 e 'Produtivo' = 1.0
+        1. Lê a planilha do cache local (ou do Excel, se ele mudou), já
+           validada e tipada conforme TIME_dados.ESQUEMAS
+        2. Filtra registros com 'Ativo' e 'Produtivo' verdadeiros
         3. Retorna lista dos IDs encontrados
     """
-    df = pd.read_excel(file_path, sheet_name=sheet_name)
-    df.columns = df.columns.str.strip()  # Remove espaços em branco dos nomes das colunas
+    df = carregar_planilhas(file_path, [sheet_name])[sheet_name]
     
-    # Filtra por ativos e produtivos, remove valores nulos e converte para lista
-    lista_iddv = df[(df['Ativo'] == 1.0) & (df['Produtivo'] == 1.0)]['IDDV'].dropna().tolist()
+    # 'Ativo' e 'Produtivo' já vêm como booleanos; IDDV volta de categórica ao valor original
+    return valores_originais(df.loc[df['Ativo'] & df['Produtivo'], 'IDDV']).dropna().tolist()
+
+def carregar_dados_relatorios(file_path):
+    """
+    Lê o cadastro da planilha 'Pessoas' e os agregados da planilha 'Times'.
+    
+    Base comum dos relatórios e do servidor (TIME_servidor_relatorios.py):
+    a ingestão incremental da planilha 'Times' é feita uma única vez.
+    
+    Args:
+        file_path (str): Caminho do arquivo Excel
+    
+    Returns:
+        tuple: (iddvs_ativos_produtivos, agregados), onde:
+            - iddvs_ativos_produtivos: lista de IDs (IDDV) ativos e produtivos
+            - agregados: resultado de TIME_dados.atualizar_times_incremental()
+    
+    Processo:
+        1. Obtém os ativos e produtivos da planilha 'Pessoas' tipada
+        2. Atualiza os agregados com as linhas novas da planilha 'Times',
+           conferidas e tipadas pelo mesmo esquema
+    """
+    return obter_iddvs_ativos_produtivos(file_path), atualizar_times_incremental(file_path)
+
+def carregar_dados_presenca(file_path):
+    """
+    Lê o cadastro da planilha 'Pessoas' e os presentes por dia da planilha 'Times'.
+    
+    Args:
+        file_path (str): Caminho do arquivo Excel
+    
+    Returns:
+        tuple: (iddvs_ativos_produtivos, presentes_por_data), onde:
+            - iddvs_ativos_produtivos: lista de IDs (IDDV) ativos e produtivos
+            - presentes_por_data: dict {dia (pd.Timestamp): lista de IDs presentes}
+    """
+    iddvs_ativos_produtivos, agregados = carregar_dados_relatorios(file_path)
+    return iddvs_ativos_produtivos, agregados['presentes_por_data']
+
+def calcular_faltantes_periodo(iddvs_ativos_produtivos, presentes_por_data, data_inicio, data_fim):
+    """
+    Calcula presentes e faltantes de todos os dias de um período em uma única passada.
+    
+    Args:
+        iddvs_ativos_produtivos (list): IDs ativos e produtivos (cadastro)
+        presentes_por_data (dict): Presentes por dia retornados por carregar_dados_presenca()
+        data_inicio (datetime.date): Data inicial
+        data_fim (datetime.date): Data final
+    
+    Returns:
+        dict: Relatório por data ('YYYY-MM-DD'), com a mesma estrutura
+              retornada por obter_produtivos_faltantes()
+    
+    Processo:
+        1. Seleciona os presentes dos dias do período
+        2. Monta o índice de presença (IDDV x dia) do cadastro no período
+        3. Marca como faltante cada posição do índice sem presença
+    """
+    datas = pd.date_range(data_inicio, data_fim, freq='D')
+    
+    # 1. Presentes do período, um registro por presença
+    df_periodo = pd.DataFrame(
+        [(data, iddv) for data in datas for iddv in presentes_por_data.get(data, [])],
+        columns=['Data Time', 'IDProdutivo']
+    )
+    
+    # 2. Índice de presença; cada IDDV do cadastro aponta para sua linha
+    # (mantém a ordem e as repetições do cadastro)
+    indice = IndicePresenca.construir(df_periodo, iddvs_ativos_produtivos, datas[0], datas[-1])
+    linhas = indice.iddvs.get_indexer(iddvs_ativos_produtivos)
+    
+    # 3. Faltantes: posições sem presença, por dia
+    faltantes = ~indice.presenca[linhas]
+    cadastro = pd.Series(iddvs_ativos_produtivos, dtype=object)
+    relatorio = {}
+    for i, data in enumerate(datas):
+        # IDs inteiros como o Excel os entrega (a ingestão os guarda como float)
+        iddvs_presentes = [id_inteiro(iddv) for iddv in presentes_por_data.get(data, [])]
+        iddvs_faltantes = cadastro[faltantes[:, i]].tolist()
+        relatorio[data.strftime('%Y-%m-%d')] = {
+            'data_consulta': data.date(),
+            'total_produtivos': len(iddvs_ativos_produtivos),
+            'presentes': iddvs_presentes,
+            'faltantes': iddvs_faltantes,
+            'total_presentes': len(iddvs_presentes),
+            'total_faltantes': len(iddvs_faltantes)
+        }
     
-    return lista_iddv
+    return relatorio
 
 def obter_produtivos_faltantes(file_path, data_consulta, formato_data='%Y-%m-%d'):
     """
@@ -60,61 +148,50 @@ def obter_produtivos_faltantes(file_path, data_consulta, formato_data='%Y-%m-%d'
             - erro (opcional): Mensagem de erro se ocorrer
     
     Processo:
-        1. Obtém lista de ativos+produtivos
-        2. Busca registros de presença na data especificada
-        3. Compara listas para identificar faltantes
+        1. Lê o cadastro e os registros de presença
+        2. Calcula o período de um único dia com calcular_faltantes_periodo()
     """
     try:
         # Converte string para objeto date se necessário
         if isinstance(data_consulta, str):
             data_consulta = datetime.strptime(data_consulta, formato_data).date()
         
-        # 1. Obtém profissionais ativos e produtivos
-        df_pessoas = pd.read_excel(file_path, sheet_name='Pessoas')
-        df_pessoas.columns = df_pessoas.columns.str.strip()
-        
-        iddvs_ativos_produtivos = df_pessoas[
-            (df_pessoas['Ativo'] == 1.0) & 
-            (df_pessoas['Produtivo'] == 1.0)
-        ]['IDDV'].dropna().tolist()
-        
-        # 2. Obtém presentes na data especificada
-        df_times = pd.read_excel(file_path, sheet_name='Times')
-        df_times.columns = df_times.columns.str.strip()
-        
-        # Converte e filtra por data
-        df_times['Data Time'] = pd.to_datetime(df_times['Data Time']).dt.date
-        df_data_filtrada = df_times[df_times['Data Time'] == data_consulta]
-        iddvs_presentes = df_data_filtrada['IDProdutivo'].dropna().tolist()
-        
-        # 3. Identifica faltantes (ativos+produtivos não presentes)
-        iddvs_faltantes = [iddv for iddv in iddvs_ativos_produtivos if iddv not in iddvs_presentes]
-        
-        return {
-            'data_consulta': data_consulta,
-            'total_produtivos': len(iddvs_ativos_produtivos),
-            'presentes': iddvs_presentes,
-            'faltantes': iddvs_faltantes,
-            'total_presentes': len(iddvs_presentes),
-            'total_faltantes': len(iddvs_faltantes)
-        }
+        iddvs_ativos_produtivos, presentes_por_data = carregar_dados_presenca(file_path)
+        relatorio = calcular_faltantes_periodo(iddvs_ativos_produtivos, presentes_por_data, data_consulta, data_consulta)
+        return relatorio[data_consulta.strftime('%Y-%m-%d')]
         
     except Exception as e:
         print(f"Erro: {str(e)}")
-        return {
-            'data_consulta': data_consulta,
-            'total_produtivos': 0,
-            'presentes': [],
-            'faltantes': [],
-            'total_presentes': 0,
-            'total_faltantes': 0,
-            'erro': str(e)
-        }
+        return resultado_com_erro(data_consulta, e)
+
+def resultado_com_erro(data_consulta, erro):
+    """
+    Monta o resultado de um dia que não pôde ser calculado.
+    
+    Args:
+        data_consulta (datetime.date): Data analisada
+        erro (Exception): Erro ocorrido
+    
+    Returns:
+        dict: Mesma estrutura de obter_produtivos_faltantes(), zerada e com 'erro'
+    """
+    return {
+        'data_consulta': data_consulta,
+        'total_produtivos': 0,
+        'presentes': [],
+        'faltantes': [],
+        'total_presentes': 0,
+        'total_faltantes': 0,
+        'erro': str(erro)
+    }
 
 def obter_faltantes_periodo(file_path, data_inicio, data_fim):
     """
     Gera relatório de faltantes para um intervalo de datas.
     
+    As planilhas são lidas uma única vez para o período inteiro; da planilha
+    'Times' só são lidas as linhas novas desde a última execução.
+    
     Args:
         file_path (str): Caminho do arquivo Excel
         data_inicio (str): Data inicial no formato 'YYYY-MM-DD'
@@ -128,21 +205,19 @@ def obter_faltantes_periodo(file_path, data_inicio, data_fim):
         # Converte strings para objetos date
         data_inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
         data_fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
-        
-        relatorio = {}
-        data_atual = data_inicio
-        
-        # Processa cada dia do período
-        while data_atual <= data_fim:
-            resultado = obter_produtivos_faltantes(file_path, data_atual.strftime('%Y-%m-%d'))
-            relatorio[data_atual.strftime('%Y-%m-%d')] = resultado
-            data_atual += pd.Timedelta(days=1)  # Avança um dia
-        
-        return relatorio
-        
     except Exception as e:
         print(f"Erro: {str(e)}")
         return {}
+    
+    try:
+        iddvs_ativos_produtivos, presentes_por_data = carregar_dados_presenca(file_path)
+        return calcular_faltantes_periodo(iddvs_ativos_produtivos, presentes_por_data, data_inicio, data_fim)
+        
+    except Exception as e:
+        # Sem os dados, todos os dias do período ficam com o erro
+        print(f"Erro: {str(e)}")
+        return {data.strftime('%Y-%m-%d'): resultado_com_erro(data.date(), e)
+                for data in pd.date_range(data_inicio, data_fim, freq='D')}
 
 def validar_data(data_str):
     """
@@ -1,69 +1,165 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
+from datetime import datetime
+from TIME_dados import atualizar_times_incremental, horas_do_id, normalizar_id
+from TIME_rollup_horas import RollupHoras
 
-def main():
+def solicitar_data(mensagem, data_minima=None):
     """
-    Script para importar um arquivo Excel com atividades produtivas,
-    filtrar por um IDProdutivo informado pelo usuário, somar as horas
-    diárias agrupadas por PE/Equipamento, e exibir os resultados
-    alinhando os decimais na saída de texto. Também permite customizar
-    o filtro via input.
+    Solicita uma data opcional ao usuário, repetindo a pergunta até ser válida.
 
-    Requer:
-        - pandas
-        - numpy
-        - matplotlib (opcional, só é usado se quiser gerar gráficos)
+    Args:
+        mensagem (str): Texto da pergunta
+        data_minima (date, optional): Menor data aceita. Defaults to None.
 
-    Autor: Seu nome
-    Data: 2025-07-16
+    Returns:
+        date: Data informada, ou None se o usuário só apertar Enter
     """
-
-    # Caminho do arquivo Excel
-    file_path = r"V:\PCP\TIME\time.xlsx"
-
-    # Leitura da planilha e limpeza dos nomes das colunas
-    df = pd.read_excel(file_path, sheet_name='Times')
-    df.columns = df.columns.str.strip()
-
-    # Função para limpar strings (remove espaços extras)
-    def clean_string(s):
+    while True:
+        resposta = input(mensagem).strip()
+        if not resposta:
+            return None
         try:
-            return str(s).strip()
-        except Exception:
-            return s
-
-    # Limpar e preparar as colunas de texto e datas
-    df['PE/Equip'] = df['PE/Equip'].apply(clean_string)
-    df['IDProdutivo'] = df['IDProdutivo'].apply(clean_string)
-    df['Data Time'] = pd.to_datetime(df['Data Time'], errors='coerce')
+            data = datetime.strptime(resposta, '%Y-%m-%d').date()
+        except ValueError:
+            print("❌ Data inválida! Use o formato YYYY-MM-DD (exemplo: 2025-01-15)")
+            continue
+        if data_minima is not None and data < data_minima:
+            print("❌ A data final deve ser maior ou igual à data inicial!")
+            continue
+        return data
+
+def ordenar_ids(ids):
+    """Ordena IDs numéricos e, depois deles, os de texto."""
+    return sorted(ids, key=lambda valor: (isinstance(valor, str), valor))
+
+def rotulo_id(valor):
+    """Texto de um ID padronizado (100.0 -> '100')."""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+def tabela_horas(horas, ids):
+    """
+    Monta a tabela IDProdutivo x PE/Equip com as horas somadas.
 
-    # Renomear coluna de horas lançadas para 'Horas' para facilitar manipulação
-    df.rename(columns={'Hora lançada': 'Horas'}, inplace=True)
+    Args:
+        horas (pd.Series): Horas por (IDProdutivo, PE/Equip)
+        ids (list): IDs padronizados a incluir, na ordem desejada
 
-    # Solicitar ao usuário o IDProdutivo a ser filtrado
-    id_filtrado = input("Informe o IDProdutivo desejado: ").strip()
+    Returns:
+        DataFrame: Uma linha por ID e uma coluna por PE/Equip, mais a coluna
+                   e a linha 'TOTAL'
+    """
+    selecionadas = horas[horas.index.get_level_values('IDProdutivo').isin(ids)]
+    tabela = selecionadas.unstack('PE/Equip', fill_value=0.0)
+    tabela = tabela.reindex(index=[i for i in ids if i in tabela.index], columns=sorted(tabela.columns))
+    tabela.index = [rotulo_id(i) for i in tabela.index]
+    tabela.index.name = 'IDProdutivo'
+    tabela['TOTAL'] = tabela.sum(axis=1)
+    tabela.loc['TOTAL'] = tabela.sum(axis=0)
+    return tabela
+
+def formatar_horas_id(rotulo, horas_por_item):
+    """
+    Formata as horas de um ID alinhando os decimais.
 
-    # Filtrar DataFrame pelo IDProdutivo informado
-    df_filtrado = df[df['IDProdutivo'] == id_filtrado]
+    Args:
+        rotulo (str): ID exibido no cabeçalho
+        horas_por_item (DataFrame): Colunas 'PE/Equip' e 'Horas' (ver horas_do_id)
 
-    # Agrupar pelo PE/Equip e somar as horas
-    horas_por_item = df_filtrado.groupby('PE/Equip')['Horas'].sum().reset_index()
+    Returns:
+        list: Linhas de texto do relatório do ID
+    """
+    if horas_por_item.empty:
+        return ["", f"IDProdutivo: {rotulo}", "Nenhuma hora lançada."]
 
     # Calcular o total geral de horas
     total_horas = horas_por_item['Horas'].sum()
 
     # Determina o tamanho do maior código para alinhar corretamente
-    tamanho_codigo = max(horas_por_item['PE/Equip'].astype(str).apply(len).max(), 6) + 2
+    tamanho_codigo = max(horas_por_item['PE/Equip'].astype(str).str.len().max(), 6) + 2
 
-    # Exibir resultados alinhando os decimais
-    print(f"\nIDProdutivo: {id_filtrado}")
-    for _, row in horas_por_item.iterrows():
-        codigo_formatado = f"{row['PE/Equip']}:".ljust(tamanho_codigo)
-        horas_formatadas = f"{row['Horas']:>7.2f}"
-        print(f"{codigo_formatado}{horas_formatadas}")
+    linhas = ["", f"IDProdutivo: {rotulo}"]
+    for codigo, horas in zip(horas_por_item['PE/Equip'], horas_por_item['Horas']):
+        linhas.append(f"{f'{codigo}:'.ljust(tamanho_codigo)}{horas:>7.2f}")
+    linhas.append(f"{'TOTAL:'.ljust(tamanho_codigo)}{total_horas:>7.2f}")
+    return linhas
+
+def exportar_relatorio(tabela, linhas_texto, caminho_base):
+    """
+    Grava o relatório em texto (.txt) e a tabela em CSV e XLSX.
 
-    print(f"{'TOTAL:'.ljust(tamanho_codigo)}{total_horas:>7.2f}")
+    Args:
+        tabela (DataFrame): Tabela montada por tabela_horas()
+        linhas_texto (list): Linhas do relatório em texto
+        caminho_base (str): Caminho sem extensão dos arquivos gerados
+
+    Returns:
+        list: Caminhos gravados
+    """
+    caminhos = [caminho_base + ".txt", caminho_base + ".csv", caminho_base + ".xlsx"]
+    with open(caminhos[0], 'w', encoding='utf-8') as arquivo:
+        arquivo.write("\n".join(linhas_texto).lstrip("\n") + "\n")
+    # ';' e vírgula decimal para abrir direto no Excel em português
+    tabela.round(2).to_csv(caminhos[1], sep=';', decimal=',', encoding='utf-8-sig')
+    tabela.round(2).to_excel(caminhos[2], sheet_name='Horas')
+    return caminhos
+
+def main():
+    """
+    Script para importar um arquivo Excel com atividades produtivas,
+    filtrar por um ou vários IDProdutivo informados pelo usuário (ou
+    todos), somar as horas agrupadas por PE/Equipamento, e exibir os
+    resultados alinhando os decimais na saída de texto. Também permite
+    customizar o filtro e o período via input.
+
+    Com mais de um ID, a tabela IDProdutivo x PE/Equip é exportada em
+    CSV e XLSX, junto com o relatório em texto.
+
+    Requer:
+        - pandas
+        - openpyxl (exportação XLSX)
+
+    Autor: Seu nome
+    Data: 2025-07-16
+    """
+
+    # Caminho do arquivo Excel e dos arquivos exportados (sem extensão)
+    file_path = r"V:\PCP\TIME\time.xlsx"
+    caminho_exportacao = r"V:\PCP\TIME\horas_produtivas"
+
+    # Solicitar ao usuário os IDProdutivo a serem filtrados
+    resposta = input("Informe o IDProdutivo desejado (vários separados por vírgula, ou 'todos'): ").strip()
+    data_inicio = solicitar_data("Data inicial (YYYY-MM-DD, Enter para todo o histórico): ")
+    data_fim = solicitar_data("Data final (YYYY-MM-DD, Enter para todo o histórico): ", data_inicio)
+
+    # Horas por IDProdutivo e PE/Equip, dos agregados atualizados só com as
+    # linhas novas da planilha: sem período, o total; com período, pelo rollup diário
+    agregados = atualizar_times_incremental(file_path)
+    if data_inicio is None and data_fim is None:
+        horas_por_id = agregados['horas_por_id']
+    else:
+        horas_por_id = RollupHoras.construir(agregados['rollup_diario']).horas_no_periodo(data_inicio, data_fim)
+
+    # IDs pedidos, com o texto digitado como rótulo
+    if resposta.lower() == 'todos':
+        ids = ordenar_ids(horas_por_id.index.get_level_values('IDProdutivo').unique())
+        rotulos = [rotulo_id(i) for i in ids]
+    else:
+        rotulos = [parte.strip() for parte in resposta.split(',') if parte.strip()]
+        ids = [normalizar_id(rotulo) for rotulo in rotulos]
+
+    # Exibir resultados alinhando os decimais
+    linhas_texto = []
+    for rotulo, chave in zip(rotulos, ids):
+        linhas_texto += formatar_horas_id(rotulo, horas_do_id(horas_por_id, chave))
+    print("\n".join(linhas_texto))
+
+    # Vários IDs: tabela IDProdutivo x PE/Equip exportada
+    if len(ids) > 1:
+        tabela = tabela_horas(horas_por_id, ids)
+        for caminho in exportar_relatorio(tabela, linhas_texto, caminho_exportacao):
+            print(f"Arquivo gerado: {caminho}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,127 @@
+"""
+TIME_rollup_horas.py - Somas de horas por período a partir do rollup diário
+
+Este módulo transforma o rollup diário da planilha 'Times' (horas e registros
+por dia, IDProdutivo e PE/Equip, mantido por TIME_dados.atualizar_times_incremental)
+em somas acumuladas (prefixos) por par IDProdutivo/PE/Equip. Só os dias com
+registros são guardados, ordenados por par e dia; a soma de qualquer período
+é a diferença entre dois prefixos de cada par, localizados por busca binária
+nas datas: um relatório de um ano custa o mesmo que o de uma semana.
+
+Funcionalidades principais:
+- Ordena o rollup diário e acumula as somas de cada par uma única vez
+- Horas por IDProdutivo e PE/Equip em qualquer período, sem percorrer linhas
+
+Uso:
+    from TIME_rollup_horas import RollupHoras
+    rollup = RollupHoras.construir(atualizar_times_incremental(file_path)['rollup_diario'])
+    horas = rollup.horas_no_periodo('2025-01-01', '2025-12-31')
+"""
+
+import numpy as np
+import pandas as pd
+
+# Dias reservados a cada par na chave de ordenação (par * DIAS_POR_PAR + dia)
+DIAS_POR_PAR = 1 << 32
+
+class RollupHoras:
+    """
+    Horas e registros acumulados de cada par (IDProdutivo, PE/Equip), dia a dia.
+
+    As linhas (um dia com registros de um par) ficam ordenadas por par e dia;
+    a linha i guarda a soma do par até o seu dia, inclusive. A memória cresce
+    com a quantidade de dias com registros, não com pares x dias do histórico.
+
+    Atributos:
+        chaves (pd.MultiIndex): Pares (IDProdutivo, PE/Equip), na ordem das linhas
+        data_inicio (pd.Timestamp): Primeiro dia com registros
+        ordem (np.ndarray): Chave ordenada de cada linha (par * DIAS_POR_PAR + dias desde data_inicio)
+        inicios (np.ndarray): Primeira linha de cada par
+        horas_acumuladas (np.ndarray): Horas acumuladas do par até o dia da linha
+        registros_acumulados (np.ndarray): Registros acumulados do par até o dia da linha
+    """
+
+    def __init__(self, chaves, data_inicio, ordem, inicios, horas_acumuladas, registros_acumulados):
+        self.chaves = chaves
+        self.data_inicio = pd.Timestamp(data_inicio).normalize()
+        self.ordem = ordem
+        self.inicios = inicios
+        self.horas_acumuladas = horas_acumuladas
+        self.registros_acumulados = registros_acumulados
+
+    @classmethod
+    def construir(cls, rollup_diario):
+        """
+        Ordena o rollup diário e acumula as somas de cada par.
+
+        Args:
+            rollup_diario (DataFrame): 'horas' e 'registros' por (Data, IDProdutivo, PE/Equip)
+
+        Returns:
+            RollupHoras: Rollup pronto para consultas
+
+        Processo:
+            1. Ordena as linhas por par e dia
+            2. Numera os pares e os dias de cada linha
+            3. Acumula horas e registros dentro de cada par
+        """
+        # 1. Ordem por (IDProdutivo, PE/Equip, Data)
+        diario = rollup_diario.reorder_levels(['IDProdutivo', 'PE/Equip', 'Data']).sort_index()
+        datas = diario.index.get_level_values('Data')
+        data_inicio = datas.min() if len(datas) else pd.Timestamp('today').normalize()
+
+        # 2. Par e dia de cada linha
+        pares = diario.index.droplevel('Data')
+        chaves = pares.unique()
+        numero_par = chaves.get_indexer(pares).astype(np.int64)
+        dias = np.asarray((datas - data_inicio).days, dtype=np.int64)
+        inicios = np.searchsorted(numero_par, np.arange(len(chaves)))
+
+        # 3. Somas acumuladas reiniciadas a cada par
+        horas = diario['horas'].groupby(numero_par).cumsum().to_numpy(dtype=float)
+        registros = diario['registros'].groupby(numero_par).cumsum().to_numpy(dtype=np.int64)
+        return cls(chaves, data_inicio, numero_par * DIAS_POR_PAR + dias, inicios, horas, registros)
+
+    def _posicoes(self, data_inicio=None, data_fim=None):
+        """
+        Localiza, em cada par, as linhas que delimitam um período.
+
+        Args:
+            data_inicio (str/date, optional): Primeiro dia. Defaults to None (sem limite).
+            data_fim (str/date, optional): Último dia, inclusive. Defaults to None (sem limite).
+
+        Returns:
+            tuple: (primeira linha do período, linha seguinte à última) de cada par
+        """
+        inicio = 0 if data_inicio is None else (pd.Timestamp(data_inicio).normalize() - self.data_inicio).days
+        fim = DIAS_POR_PAR if data_fim is None else (pd.Timestamp(data_fim).normalize() - self.data_inicio).days + 1
+        inicio = min(max(inicio, 0), DIAS_POR_PAR)
+        fim = min(max(fim, inicio), DIAS_POR_PAR)
+        # A chave ordenada permite buscar o período em todos os pares de uma vez
+        base = np.arange(len(self.chaves), dtype=np.int64) * DIAS_POR_PAR
+        return np.searchsorted(self.ordem, base + inicio), np.searchsorted(self.ordem, base + fim)
+
+    def _acumulado_antes(self, acumulados, posicoes):
+        """Soma de cada par nas linhas anteriores à posição (zero no início do par)."""
+        if not len(acumulados):
+            return np.zeros(len(posicoes), dtype=acumulados.dtype)
+        return np.where(posicoes > self.inicios, acumulados[posicoes - 1], 0)
+
+    def horas_no_periodo(self, data_inicio=None, data_fim=None):
+        """
+        Soma as horas de cada par (IDProdutivo, PE/Equip) em um período.
+
+        Args:
+            data_inicio (str/date, optional): Primeiro dia. Defaults to None.
+            data_fim (str/date, optional): Último dia, inclusive. Defaults to None.
+
+        Returns:
+            pd.Series: Horas por (IDProdutivo, PE/Equip), só dos pares com
+                       registros no período (mesmo formato de 'horas_por_id')
+        """
+        inicio, fim = self._posicoes(data_inicio, data_fim)
+        registros = (self._acumulado_antes(self.registros_acumulados, fim)
+                     - self._acumulado_antes(self.registros_acumulados, inicio))
+        horas = self._acumulado_antes(self.horas_acumuladas, fim) - self._acumulado_antes(self.horas_acumuladas, inicio)
+        com_registro = registros > 0
+        return pd.Series(horas[com_registro], index=self.chaves[com_registro])
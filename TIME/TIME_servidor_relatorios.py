@@ -0,0 +1,228 @@
+"""
+TIME_servidor_relatorios.py - Servidor local dos relatórios do TIME
+
+Este script mantém os dados do time.xlsx carregados em memória e responde,
+em JSON, às mesmas consultas dos relatórios interativos, sem reimportar as
+bibliotecas nem reler o Excel a cada pergunta.
+
+Funcionalidades principais:
+- Carrega o cadastro e os agregados da planilha 'Times' uma única vez
+- Recarrega automaticamente quando o arquivo Excel muda (só as linhas novas
+  da planilha 'Times' são lidas, ver TIME_dados.atualizar_times_incremental)
+- Faltantes por período (mesmo resultado de TIME_pendente.obter_faltantes_periodo)
+- Horas por PE/Equip de um IDProdutivo, no histórico todo ou em um período
+  (mesmo resultado de TIME_relatorio_produtivo-pedido.py)
+
+Consultas (HTTP GET, apenas na máquina local):
+    /status
+    /faltantes?inicio=2025-01-13&fim=2025-01-17
+    /horas?id=123
+    /horas?id=123&inicio=2025-01-01&fim=2025-12-31
+
+Uso:
+Execute o script diretamente; ele fica aguardando consultas até Ctrl+C.
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from TIME_dados import horas_do_id
+from TIME_pendente import carregar_dados_relatorios, calcular_faltantes_periodo
+from TIME_rollup_horas import RollupHoras
+
+class DadosTime:
+    """
+    Retrato dos dados do time.xlsx usado para responder às consultas.
+
+    Atributos:
+        iddvs_ativos_produtivos (list): IDs ativos e produtivos do cadastro
+        presentes_por_data (dict): Presentes por dia (ver carregar_dados_relatorios)
+        horas_por_id (pd.Series): Horas por (IDProdutivo, PE/Equip)
+        rollup (RollupHoras): Horas acumuladas por dia, para consultas por período
+        assinatura (tuple): (tamanho, data de modificação) do arquivo lido
+        carregado_em (datetime): Momento da carga
+        segundos_carga (float): Duração da carga
+    """
+
+    def __init__(self, file_path):
+        inicio = time.perf_counter()
+        info = os.stat(file_path)
+        self.assinatura = (info.st_size, info.st_mtime_ns)
+        # Cadastro e agregados em uma única ingestão da planilha 'Times'
+        self.iddvs_ativos_produtivos, agregados = carregar_dados_relatorios(file_path)
+        self.presentes_por_data = agregados['presentes_por_data']
+        self.horas_por_id = agregados['horas_por_id']
+        self.rollup = RollupHoras.construir(agregados['rollup_diario'])
+        self.carregado_em = datetime.now()
+        self.segundos_carga = time.perf_counter() - inicio
+
+class ServidorRelatorios(ThreadingHTTPServer):
+    """
+    Servidor HTTP que guarda os dados carregados e os recarrega quando o Excel muda.
+
+    As consultas leem sempre o retrato atual (self.dados); a recarga monta um
+    retrato novo e só então o substitui, sem bloquear as consultas em andamento.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, file_path, endereco=('127.0.0.1', 8765), intervalo=5):
+        self.file_path = file_path
+        self.intervalo = intervalo
+        self.dados = DadosTime(file_path)
+        self._parar = threading.Event()
+        super().__init__(endereco, ManipuladorConsultas)
+
+    def assinatura_arquivo(self):
+        """tuple: (tamanho, data de modificação) atuais do arquivo Excel."""
+        info = os.stat(self.file_path)
+        return info.st_size, info.st_mtime_ns
+
+    def recarregar_se_alterado(self):
+        """
+        Recarrega os dados se o arquivo Excel mudou desde a última carga.
+
+        Returns:
+            bool: True se os dados foram recarregados
+        """
+        try:
+            if self.assinatura_arquivo() == self.dados.assinatura:
+                return False
+            dados = DadosTime(self.file_path)
+        except Exception as e:
+            # Arquivo em gravação ou indisponível: mantém os dados atuais
+            print(f"Erro ao recarregar {self.file_path}: {str(e)}")
+            return False
+        self.dados = dados
+        print(f"🔄 Dados recarregados em {dados.segundos_carga:.2f} s")
+        return True
+
+    def _monitorar(self):
+        """Verifica o arquivo Excel a cada 'intervalo' segundos."""
+        while not self._parar.wait(self.intervalo):
+            self.recarregar_se_alterado()
+
+    def serve_forever(self, poll_interval=0.5):
+        monitor = threading.Thread(target=self._monitorar, daemon=True)
+        monitor.start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._parar.set()
+
+class ManipuladorConsultas(BaseHTTPRequestHandler):
+    """Responde às consultas GET com JSON."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parametros = {nome: valores[0] for nome, valores in parse_qs(url.query).items()}
+        consultas = {
+            '/status': consultar_status,
+            '/faltantes': consultar_faltantes,
+            '/horas': consultar_horas,
+        }
+        consulta = consultas.get(url.path.rstrip('/') or '/')
+        if consulta is None:
+            self.responder(404, {'erro': f"Consulta desconhecida: {url.path}", 'consultas': sorted(consultas)})
+            return
+        try:
+            self.responder(200, consulta(self.server.dados, parametros))
+        except (KeyError, ValueError) as e:
+            self.responder(400, {'erro': f"Parâmetro inválido: {str(e)}"})
+        except Exception as e:
+            self.responder(500, {'erro': str(e)})
+
+    def responder(self, codigo, conteudo):
+        """Envia 'conteudo' como JSON (datas e demais tipos não JSON viram texto)."""
+        corpo = json.dumps(conteudo, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        # Uma linha curta por consulta, em vez do log completo do http.server
+        print(f"{self.address_string()} {formato % args}")
+
+def consultar_status(dados, parametros):
+    """
+    Informa quando e em quanto tempo os dados foram carregados.
+
+    Args:
+        dados (DadosTime): Dados atuais
+        parametros (dict): Parâmetros da consulta (não usados)
+
+    Returns:
+        dict: Resumo dos dados carregados
+    """
+    return {
+        'carregado_em': dados.carregado_em.isoformat(timespec='seconds'),
+        'segundos_carga': round(dados.segundos_carga, 3),
+        'total_produtivos': len(dados.iddvs_ativos_produtivos),
+        'dias_com_registro': len(dados.presentes_por_data),
+    }
+
+def consultar_faltantes(dados, parametros):
+    """
+    Faltantes de cada dia de um período.
+
+    Args:
+        dados (DadosTime): Dados atuais
+        parametros (dict): 'inicio' e 'fim' (opcional, padrão = inicio) no formato 'YYYY-MM-DD'
+
+    Returns:
+        dict: Relatório por data, como em TIME_pendente.obter_faltantes_periodo()
+    """
+    data_inicio = datetime.strptime(parametros['inicio'], '%Y-%m-%d').date()
+    data_fim = datetime.strptime(parametros.get('fim', parametros['inicio']), '%Y-%m-%d').date()
+    if data_fim < data_inicio:
+        raise ValueError("a data final deve ser maior ou igual à data inicial")
+    return calcular_faltantes_periodo(dados.iddvs_ativos_produtivos, dados.presentes_por_data, data_inicio, data_fim)
+
+def consultar_horas(dados, parametros):
+    """
+    Horas de um IDProdutivo por PE/Equip.
+
+    Args:
+        dados (DadosTime): Dados atuais
+        parametros (dict): 'id' com o IDProdutivo; 'inicio' e 'fim' (opcionais,
+            formato 'YYYY-MM-DD') limitam o período
+
+    Returns:
+        dict: IDProdutivo, horas por PE/Equip e total
+    """
+    if 'inicio' in parametros or 'fim' in parametros:
+        datas = [datetime.strptime(parametros[nome], '%Y-%m-%d') if nome in parametros else None
+                 for nome in ('inicio', 'fim')]
+        horas_por_id = dados.rollup.horas_no_periodo(*datas)
+    else:
+        horas_por_id = dados.horas_por_id
+    horas_por_item = horas_do_id(horas_por_id, parametros['id'])
+    return {
+        'IDProdutivo': parametros['id'],
+        'horas': dict(zip(horas_por_item['PE/Equip'], horas_por_item['Horas'].astype(float))),
+        'total': float(horas_por_item['Horas'].sum()),
+    }
+
+# Ponto de entrada principal
+if __name__ == "__main__":
+    # Caminho fixo do arquivo de dados e endereço do servidor (somente local)
+    file_path = r"V:\PCP\TIME\time.xlsx"
+    ENDERECO = ('127.0.0.1', 8765)
+    INTERVALO_VERIFICACAO = 5  # segundos entre verificações do arquivo
+
+    print(f"Carregando {file_path}...")
+    servidor = ServidorRelatorios(file_path, ENDERECO, INTERVALO_VERIFICACAO)
+    print(f"✅ Dados carregados em {servidor.dados.segundos_carga:.2f} s")
+    print(f"Aguardando consultas em http://{ENDERECO[0]}:{ENDERECO[1]} (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️ Servidor encerrado.")
+    finally:
+        servidor.server_close()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os scripts do TIME ficam na pasta acima, fora de um pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+import pytest
+from openpyxl import Workbook
+
+from TIME_dados import (COLUNAS_TIMES, atualizar_times_incremental, ler_times_em_blocos,
+                        ler_times_ingeridos, validar_esquema)
+
+@pytest.fixture
+def planilha_times(tmp_path):
+    """time.xlsx mínimo, com um texto que não é data em 'Data Time'."""
+    caminho = tmp_path / "time.xlsx"
+    workbook = Workbook()
+    times = workbook.active
+    times.title = 'Times'
+    times.append(list(COLUNAS_TIMES))
+    times.append([datetime(2025, 1, 2), 100, 'PE1', 8])
+    times.append(['não é data', 101, 'PE1', 4])
+    times.append([datetime(2025, 1, 3), 100, 'PE2', 2])
+    workbook.save(caminho)
+    return str(caminho)
+
+def test_blocos_mantem_datas_invalidas_para_validacao(planilha_times):
+    bloco = next(ler_times_em_blocos(planilha_times))
+    assert validar_esquema(bloco, 'Times') == {'Data Time': 1}
+
+def test_ingestao_informa_datas_invalidas(planilha_times, tmp_path, capsys):
+    resultado = atualizar_times_incremental(planilha_times, pasta_cache=str(tmp_path / "cache"))
+    assert "{'Data Time': 1}" in capsys.readouterr().out
+    assert resultado['linhas'] == 3
+
+    df = ler_times_ingeridos(planilha_times, pasta_cache=str(tmp_path / "cache"))
+    assert df['Data Time'].isna().tolist() == [False, False, True]
+    assert len(ler_times_ingeridos(planilha_times, data_inicio='2025-01-01', pasta_cache=str(tmp_path / "cache"))) == 2
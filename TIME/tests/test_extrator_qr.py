@@ -0,0 +1,47 @@
+import importlib.util
+import io
+import os
+
+import pytest
+
+fitz = pytest.importorskip('fitz')
+pytest.importorskip('pyzbar')
+from PIL import Image
+
+def _carregar_extrator():
+    """Importa TIME-extrator-cartao-QR.py.py (nome fora do padrão de módulos)."""
+    caminho = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'TIME-extrator-cartao-QR.py.py')
+    spec = importlib.util.spec_from_file_location('extrator_cartao_qr', caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+extrator = _carregar_extrator()
+
+@pytest.fixture
+def pagina_digitalizada():
+    """Página A4 formada por uma única imagem, como a de um scanner a 300 DPI."""
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    # 595 x 842 pontos a 300/96 dariam 1859.4 x 2631.3 pixels; o scanner grava inteiros
+    buffer = io.BytesIO()
+    Image.new('RGB', (1860, 2631), 'white').save(buffer, format='JPEG')
+    page.insert_image(page.rect, stream=buffer.getvalue())
+    yield page
+    doc.close()
+
+def test_recortes_da_imagem_embutida_com_tamanho_da_renderizacao(pagina_digitalizada):
+    img, dpi_embutida = extrator.extrair_imagem_embutida(pagina_digitalizada)
+    assert dpi_embutida == 300
+
+    qr = {'conteudo': 'TESTE', 'cantos': [(1200, 300), (1400, 300), (1400, 500), (1200, 500)]}
+    for angulo in (0, 1.5):
+        matriz_embutida, _ = extrator.calcular_matriz_rotacao(img.width, img.height, angulo)
+        recorte_embutido = extrator.processar_qr_code(img, qr, matriz_embutida, dpi_embutida)
+
+        largura, altura = extrator.tamanho_pagina_renderizada(pagina_digitalizada, 300)
+        matriz_renderizada, _ = extrator.calcular_matriz_rotacao(largura, altura, angulo)
+        recorte_renderizado = extrator.renderizar_recorte(pagina_digitalizada, qr, matriz_renderizada, 300)
+
+        assert recorte_embutido.size == recorte_renderizado.size == (826, 885)